@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Measures how the benchmark-report tool scales with the size of a benchmark. Synthetic benchmarks are generated with
+# the files the workers and agents write: performance.csv, performance-<test id>.csv, the .hdr latency logs, gc.log
+# and the _dstat.csv files. The report is made for every benchmark with --profile, and the time per phase and the peak
+# memory usage are printed and appended to a results file, so the results of different versions can be compared.
+#
+# Generating a single benchmark:
+#   benchmark-report-perf.py session --workers 8 --duration 3600 my-benchmark
+# Running the benchmark suite:
+#   benchmark-report-perf.py run --workers 4 16 --duration 600 3600
+
+import argparse
+import base64
+import datetime
+import itertools
+import math
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+parser = argparse.ArgumentParser(description='Measuring the benchmark-report tool with synthetic benchmarks.')
+subparsers = parser.add_subparsers(dest='command')
+
+session_parser = subparsers.add_parser('session', help='Generate a synthetic benchmark.')
+session_parser.add_argument('directory', nargs=1, help='The directory of the benchmark.')
+
+run_parser = subparsers.add_parser('run', help='Generate synthetic benchmarks and measure the report for each of them.')
+run_parser.add_argument('--work-dir', nargs=1, default=['benchmark-report-perf'],
+                        help='The directory for the benchmarks and the reports. A benchmark that already exists is '
+                             'reused.')
+run_parser.add_argument('--results', nargs=1, default=['benchmark-report-perf.csv'],
+                        help='The csv file the results are appended to.')
+run_parser.add_argument('-j', '--jobs', nargs='+', default=[1], type=int,
+                        help='The number of processes of the report; one run per value.')
+run_parser.add_argument('--repeat', nargs=1, default=[1], type=int,
+                        help='The number of times the report is made for every benchmark.')
+run_parser.add_argument('--cache', help='Use the cache of the report, so every run after the first measures a warm '
+                                        'cache.', action="store_true")
+run_parser.add_argument('--report-args', nargs=argparse.REMAINDER, default=[],
+                        help='Additional arguments for the report, e.g. --report-args -f -w 10.')
+
+# the options of a benchmark; for 'run' every option can have multiple values and a benchmark is generated for
+# every combination
+for subparser, nargs in ((session_parser, 1), (run_parser, '+')):
+    subparser.add_argument('--workers', nargs=nargs, default=[4], type=int,
+                           help='The number of workers.')
+    subparser.add_argument('--agents', nargs=nargs, default=[2], type=int,
+                           help='The number of agents; the workers are spread over the agents.')
+    subparser.add_argument('--duration', nargs=nargs, default=[600], type=int,
+                           help='The duration of the benchmark in seconds.')
+    subparser.add_argument('--interval', nargs=nargs, default=[1], type=int,
+                           help='The interval in seconds of the performance and latency samples of the workers.')
+    subparser.add_argument('--dstat-interval', nargs=nargs, default=[5], type=int,
+                           help='The interval in seconds of the dstat samples of the agents.')
+    subparser.add_argument('--tests', nargs=nargs, default=[1], type=int,
+                           help='The number of tests that run in parallel.')
+    subparser.add_argument('--probes', nargs=nargs, default=[2], type=int,
+                           help='The number of latency probes of every test.')
+
+args = parser.parse_args()
+
+simulator_home = os.environ.get('SIMULATOR_HOME', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+report_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-report.py")
+
+# the start of every synthetic benchmark, so generating a benchmark twice gives the same files
+START_TIME = 1600000000.0
+
+
+# ================ hdr histograms =========================
+
+# The latency histograms are written like the HdrProbe of the workers records them: the values are in nanoseconds,
+# with 3 significant digits, from 1 microsecond up to 1 hour.
+HDR_LOWEST_DISCERNIBLE_VALUE = 1000
+HDR_HIGHEST_TRACKABLE_VALUE = 3600 * 1000 * 1000 * 1000
+HDR_SIGNIFICANT_DIGITS = 3
+HDR_V2_ENCODING_COOKIE = 0x1c849313
+HDR_V2_COMPRESSED_ENCODING_COOKIE = 0x1c849314
+# the number of distinct latencies of an interval; the operations of the interval are spread over these
+HDR_SAMPLES = 32
+# the fraction of the operations of an interval that are outliers; every outlier has its own latency
+HDR_OUTLIERS = 0.001
+
+hdr_unit_magnitude = int(math.floor(math.log(HDR_LOWEST_DISCERNIBLE_VALUE, 2)))
+hdr_sub_bucket_half_count_magnitude = int(math.ceil(math.log(2 * 10 ** HDR_SIGNIFICANT_DIGITS, 2))) - 1
+hdr_sub_bucket_half_count = 1 << hdr_sub_bucket_half_count_magnitude
+hdr_sub_bucket_mask = ((1 << (hdr_sub_bucket_half_count_magnitude + 1)) - 1) << hdr_unit_magnitude
+
+
+# Returns the index in the counts array of a value.
+def hdr_counts_index(value):
+    bucket_index = (value | hdr_sub_bucket_mask).bit_length() - hdr_unit_magnitude \
+                   - (hdr_sub_bucket_half_count_magnitude + 1)
+    sub_bucket_index = value >> (bucket_index + hdr_unit_magnitude)
+    return ((bucket_index + 1) << hdr_sub_bucket_half_count_magnitude) + (sub_bucket_index - hdr_sub_bucket_half_count)
+
+
+# ZigZag LEB128 encoding of a 64 bit value, like the ZigZagEncoding of HdrHistogram.
+def zig_zag(value):
+    value = ((value << 1) ^ (value >> 63)) & 0xffffffffffffffff
+    result = bytearray()
+    for k in range(8):
+        if value >> 7 == 0:
+            result.append(value)
+            return result
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+    result.append(value)
+    return result
+
+
+# Returns the compressed V2 encoding of a histogram with the given counts by index, like
+# Histogram.encodeIntoCompressedByteBuffer does.
+def hdr_encode(counts):
+    payload = bytearray()
+    index = 0
+    max_index = max(counts)
+    while index <= max_index:
+        count = counts.get(index, 0)
+        if count > 0:
+            payload += zig_zag(count)
+            index += 1
+            continue
+        zeros = 0
+        while index <= max_index and counts.get(index, 0) == 0:
+            zeros += 1
+            index += 1
+        payload += zig_zag(-zeros if zeros > 1 else 0)
+
+    header = struct.pack('>iiiiqqd', HDR_V2_ENCODING_COOKIE, len(payload), 0, HDR_SIGNIFICANT_DIGITS,
+                         HDR_LOWEST_DISCERNIBLE_VALUE, HDR_HIGHEST_TRACKABLE_VALUE, 1.0)
+    compressed = zlib.compress(bytes(header + payload))
+    return struct.pack('>ii', HDR_V2_COMPRESSED_ENCODING_COOKIE, len(compressed)) + compressed
+
+
+# Returns the latencies in nanoseconds of the operations of an interval as counts by index, and the max latency.
+# Most operations share a few latencies around the median; the outliers make up the tail of the distribution.
+def hdr_interval(rng, operations, median_nanos):
+    counts = {}
+    max_value = 0
+    outliers = min(int(operations * HDR_OUTLIERS), 256)
+    shared = operations - outliers
+    for k in range(HDR_SAMPLES + outliers):
+        if k < HDR_SAMPLES:
+            value = rng.lognormvariate(math.log(median_nanos), 0.5)
+            count = shared // HDR_SAMPLES + (1 if k < shared % HDR_SAMPLES else 0)
+        else:
+            value = rng.lognormvariate(math.log(median_nanos * 5), 1.0)
+            count = 1
+        value = min(max(int(value), HDR_LOWEST_DISCERNIBLE_VALUE), HDR_HIGHEST_TRACKABLE_VALUE)
+        if count > 0:
+            index = hdr_counts_index(value)
+            counts[index] = counts.get(index, 0) + count
+            max_value = max(max_value, value)
+    return counts, max_value
+
+
+# ================ session =========================
+
+def date_string(seconds, pattern):
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime(pattern)
+
+
+# Returns the name of a benchmark with the given options.
+def session_name(workers, agents, duration, interval, dstat_interval, tests, probes):
+    return "w%d_a%d_d%d_i%d_di%d_t%d_p%d" % (workers, agents, duration, interval, dstat_interval, tests, probes)
+
+
+# Writes the performance csv files and the latency logs of a worker. The worker starts a bit after the benchmark
+# and every sample is a few milliseconds late, like the samples of a real worker.
+def write_worker(worker_dir, rng, duration, interval, tests, probes):
+    offset = rng.uniform(0, 2)
+    run_started = START_TIME + offset
+    test_ids = ["test%d" % (test + 1) for test in range(tests)]
+    probe_names = ["probe%d" % (probe + 1) for probe in range(probes)]
+
+    csv_legend = "epoch,timestamp,operations,operations-delta,operations/second\n"
+    performance_files = [open(os.path.join(worker_dir, "performance-" + test_id + ".csv"), "w")
+                         for test_id in test_ids]
+    global_file = open(os.path.join(worker_dir, "performance.csv"), "w")
+    hdr_files = []
+    for test_id in test_ids:
+        for probe_name in probe_names:
+            f = open(os.path.join(worker_dir, test_id + "-" + probe_name + ".hdr"), "w")
+            f.write("#[StartTime: %.3f (seconds since epoch), %s]\n"
+                    % (run_started, date_string(run_started, "%a %b %d %H:%M:%S UTC %Y")))
+            f.write("#[Latency histograms for " + test_id + "." + probe_name + "]\n")
+            f.write("#[Histogram log format version 1.3]\n")
+            f.write('"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"\n')
+            hdr_files.append(f)
+    for f in performance_files + [global_file]:
+        f.write(csv_legend)
+
+    rates = [rng.uniform(5000, 20000) for test_id in test_ids]
+    totals = [0] * len(test_ids)
+    previous = run_started
+    for sample in range(1, int((duration - offset) // interval) + 1):
+        now = run_started + sample * interval + rng.uniform(0, 0.005)
+        elapsed = now - previous
+        timestamp = date_string(now, "%d/%m/%Y %H:%M:%S")
+        global_delta = 0
+        global_rate = 0.0
+        for test, performance_file in enumerate(performance_files):
+            # the operations of the test are recorded by its probes
+            probe_operations = [int(rates[test] * elapsed * rng.uniform(0.9, 1.1) / len(probe_names))
+                                for probe_name in probe_names]
+            delta = sum(probe_operations)
+            totals[test] += delta
+            rate = delta / elapsed
+            performance_file.write("%.3f,%s,%d,%d,%.3f\n" % (now, timestamp, totals[test], delta, rate))
+            global_delta += delta
+            global_rate += rate
+
+            for probe, operations in enumerate(probe_operations):
+                counts, max_value = hdr_interval(rng, operations, rng.uniform(80000, 120000))
+                if not counts:
+                    continue
+                hdr_files[test * len(probe_names) + probe].write("%.3f,%.3f,%.3f,%s\n" % (
+                    previous - run_started, elapsed, max_value / 1e6,
+                    base64.b64encode(hdr_encode(counts)).decode('ascii')))
+        global_file.write("%.3f,%s,%d,%d,%.3f\n" % (now, timestamp, sum(totals), global_delta, global_rate))
+        previous = now
+
+    for f in performance_files + [global_file] + hdr_files:
+        f.close()
+
+
+# Writes the gc.log of a worker in the unified logging format of a JVM with G1, as logged with
+# -Xlog:gc*:file=gc.log:time,uptime,level,tags.
+def write_gc_log(worker_dir, rng, duration):
+    jvm_started = START_TIME - 5
+    region_size = 1024 * 1024
+    heap_regions = 2048
+
+    def log(seconds, tags, message):
+        f.write("[%s.%03d+0000][%.3fs][info][%-10s] %s\n" % (
+            date_string(seconds, "%Y-%m-%dT%H:%M:%S"), int(seconds * 1000) % 1000, seconds - jvm_started,
+            tags, message))
+
+    with open(os.path.join(worker_dir, "gc.log"), "w") as f:
+        log(jvm_started + 0.01, "gc,init", "Heap Region Size: 1M")
+        log(jvm_started + 0.01, "gc", "Using G1")
+        now = START_TIME
+        gc_id = 0
+        old = 50
+        while True:
+            now += rng.uniform(1, 4)
+            if now > START_TIME + duration:
+                break
+            eden = rng.randint(100, 200)
+            survivor_before = rng.randint(5, 15)
+            survivor_after = rng.randint(5, 15)
+            promoted = rng.randint(0, 5)
+            if old + promoted > heap_regions // 2:
+                # a mixed collection cleans up the old generation
+                kind = "Pause Young (Mixed) (G1 Evacuation Pause)"
+                old_after = old // 2
+            else:
+                kind = "Pause Young (Normal) (G1 Evacuation Pause)"
+                old_after = old + promoted
+            pause_millis = rng.uniform(2, 20)
+            before = (eden + survivor_before + old) * region_size
+            after = (survivor_after + old_after) * region_size
+
+            log(now, "gc,start", "GC(%d) %s" % (gc_id, kind))
+            log(now, "gc,heap", "GC(%d) Eden regions: %d->0(%d)" % (gc_id, eden, eden))
+            log(now, "gc,heap", "GC(%d) Survivor regions: %d->%d(%d)" % (gc_id, survivor_before, survivor_after, 32))
+            log(now, "gc,heap", "GC(%d) Old regions: %d->%d" % (gc_id, old, old_after))
+            log(now, "gc,heap", "GC(%d) Humongous regions: 0->0" % gc_id)
+            log(now, "gc,metaspace", "GC(%d) Metaspace: 30000K(31000K)->30000K(31000K)" % gc_id)
+            log(now + pause_millis / 1000, "gc", "GC(%d) %s %dM->%dM(%dM) %.3fms" % (
+                gc_id, kind, before // region_size, after // region_size, heap_regions, pause_millis))
+            old = old_after
+            gc_id += 1
+
+
+# Writes the _dstat.csv file of an agent like 'dstat --epoch -m --all -l --noheaders --nocolor --output' does.
+def write_dstat(path, rng, agent_index, duration, dstat_interval):
+    with open(path, "w") as f:
+        f.write('"Dstat 0.7.3 CSV output"\n')
+        f.write('"Author:","Dag Wieers <dag@wieers.com>",,,,"URL:","http://dag.wieers.com/home-made/dstat/"\n')
+        f.write('"Host:","agent%d",,,,"User:","simulator"\n' % agent_index)
+        f.write('"Cmdline:","dstat --epoch -m --all -l --noheaders --nocolor --output A%d_dstat.csv %d",,,,'
+                '"Date:","%s"\n' % (agent_index, dstat_interval, date_string(START_TIME, "%d %b %Y %H:%M:%S UTC")))
+        f.write('\n')
+        f.write('"epoch","memory usage",,,,"total cpu usage",,,,,,"dsk/total",,"net/total",,"paging",,"system",,'
+                '"load avg",,\n')
+        f.write('"epoch","used","buff","cach","free","usr","sys","idl","wai","hiq","siq","read","writ","recv","send",'
+                '"in","out","int","csw","1m","5m","15m"\n')
+
+        now = START_TIME - rng.uniform(0, dstat_interval)
+        while now <= START_TIME + duration:
+            user = rng.uniform(30, 60)
+            system = rng.uniform(5, 15)
+            wait = rng.uniform(0, 2)
+            hardware_interrupts = rng.uniform(0, 1)
+            software_interrupts = rng.uniform(0, 3)
+            idle = max(0.0, 100 - user - system - wait - hardware_interrupts - software_interrupts)
+            used = rng.uniform(4e9, 6e9)
+            row = [now, used, 2e8, 8e9, 16e9 - used, user, system, idle, wait, hardware_interrupts,
+                   software_interrupts, rng.uniform(0, 1e6), rng.uniform(1e6, 5e7), rng.uniform(5e7, 2e8),
+                   rng.uniform(5e7, 2e8), 0, 0, rng.uniform(2e4, 6e4), rng.uniform(5e4, 2e5),
+                   rng.uniform(4, 8), rng.uniform(4, 8), rng.uniform(4, 8)]
+            f.write(",".join("%.3f" % value for value in row) + "\n")
+            now += dstat_interval
+
+
+# Writes a synthetic benchmark to the directory. The workers are spread over the agents like the coordinator does;
+# the names of the worker directories are like 'A1_W1-10.0.0.1-member'.
+def write_session(directory, workers, agents, duration, interval, dstat_interval, tests, probes):
+    rng = random.Random(0)
+    os.makedirs(directory)
+    for worker in range(workers):
+        agent_index = worker % agents + 1
+        worker_dir = os.path.join(directory, "A%d_W%d-10.0.0.%d-member" % (agent_index, worker + 1, agent_index))
+        os.makedirs(worker_dir)
+        write_worker(worker_dir, rng, duration, interval, tests, probes)
+        write_gc_log(worker_dir, rng, duration)
+    for agent_index in range(1, min(agents, workers) + 1):
+        write_dstat(os.path.join(directory, "A%d_dstat.csv" % agent_index), rng, agent_index, duration, dstat_interval)
+
+
+def directory_size(directory):
+    size = 0
+    for root, dirs, files in os.walk(directory):
+        for file_name in files:
+            size += os.path.getsize(os.path.join(root, file_name))
+    return size
+
+
+# ================ run =========================
+
+# Makes the report of a benchmark with --profile. Returns the rows of the profile.csv of the report.
+def run_report(session_dir, report_dir, jobs):
+    command = [sys.executable, report_script, session_dir, "-o", report_dir, "-j", str(jobs), "--profile"]
+    if not args.cache:
+        command.append("--no-cache")
+    command.extend(args.report_args)
+
+    # a report directory is not cleaned by the report, so the report of a previous run is removed first
+    if os.path.exists(report_dir):
+        shutil.rmtree(report_dir)
+    os.makedirs(report_dir)
+
+    environment = dict(os.environ, SIMULATOR_HOME=simulator_home)
+    with open(report_dir + ".log", "w") as log:
+        exit_code = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT, env=environment)
+    if exit_code != 0:
+        print("The report of [" + session_dir + "] failed; see " + log.name)
+        exit(1)
+
+    rows = []
+    with open(os.path.join(report_dir, "profile.csv")) as f:
+        # skip the header
+        next(f)
+        for line in f:
+            name, seconds, runs, rss = line.rstrip("\n").split(",")
+            rows.append((name, float(seconds), int(runs), int(rss) if rss else None))
+    return rows
+
+
+def run():
+    work_dir = os.path.abspath(args.work_dir[0])
+    results = os.path.abspath(args.results[0])
+    if not os.path.exists(results):
+        with open(results, "w") as f:
+            f.write('"date","session","session_bytes","jobs","run","phase","seconds","peak_rss(bytes)"\n')
+
+    date = time.strftime("%Y-%m-%dT%H:%M:%S")
+    for options in itertools.product(args.workers, args.agents, args.duration, args.interval, args.dstat_interval,
+                                     args.tests, args.probes):
+        name = session_name(*options)
+        session_dir = os.path.join(work_dir, "sessions", name)
+        if not os.path.exists(session_dir):
+            print("Generating benchmark [" + name + "]")
+            start = time.perf_counter()
+            write_session(session_dir, *options)
+            print(" took %.1f seconds" % (time.perf_counter() - start))
+        session_bytes = directory_size(session_dir)
+
+        for jobs, repeat in itertools.product(args.jobs, range(args.repeat[0])):
+            report_dir = os.path.join(work_dir, "reports", "%s_j%d_%d" % (name, jobs, repeat + 1))
+            rows = run_report(session_dir, report_dir, jobs)
+            print_run(name, session_bytes, jobs, rows)
+            with open(results, "a") as f:
+                for phase, seconds, runs, rss in rows:
+                    f.write("%s,%s,%d,%d,%d,%s,%.6f,%s\n" % (date, name, session_bytes, jobs, repeat + 1, phase,
+                                                            seconds, "" if rss is None else rss))
+    print("Results appended to [" + results + "]")
+
+
+def print_run(name, session_bytes, jobs, rows):
+    total_seconds = rows[-1][1]
+    print("Report of [%s] (%.1f MB) with %d job(s): %.2f seconds, %.1f MB/sec" % (
+        name, session_bytes / 1e6, jobs, total_seconds, session_bytes / 1e6 / total_seconds))
+    for phase, seconds, runs, rss in rows:
+        print(" %-16s %10.3f %16s" % (phase, seconds, "-" if rss is None else "%.1f MB" % (rss / 1e6)))
+
+
+if __name__ == '__main__':
+    if args.command == 'session':
+        directory = args.directory[0]
+        if os.path.exists(directory):
+            print("Directory [" + directory + "] already exists")
+            exit(1)
+        write_session(directory, args.workers[0], args.agents[0], args.duration[0], args.interval[0],
+                      args.dstat_interval[0], args.tests[0], args.probes[0])
+        print("Benchmark written to [" + directory + "]")
+    elif args.command == 'run':
+        run()
+    else:
+        parser.print_help()
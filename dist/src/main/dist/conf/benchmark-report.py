@@ -7,26 +7,53 @@
 # - when not a lot of data points, them time issues in gnuplot (use WORKER_PERFORMANCE_MONITOR_INTERVAL_SECONDS=default)
 # - timeseries: avg
 # - gnuplot y axis formatting; long numbers are unreadable because not dots or comma's
-# - gc aggregated
 # - hdr
 
 # backlog
 # - google chart option
 # - latency per worker
 # - option to plot with real time.
-# - cpu usage merging needs to be divided by number of agents.
 # - option not to make low part of graph shrink
 # - option to show real time
 
 import argparse
+import bisect
+import concurrent.futures
+import contextlib
 import csv
+import datetime
+import functools
+import hashlib
+import itertools
+import json
+import math
+import mmap
 import os
 import re
+import struct
 import subprocess
 import shutil
-from collections import Counter
+import signal
+import sys
+import time
+import zlib
+from array import array
+from decimal import Decimal
+from fractions import Fraction
 import base64
 
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional; without it the series are backed by the stdlib array module.
+    numpy = None
+
+try:
+    import resource
+except ImportError:
+    # the resource module is only available on Unix; without it the peak memory usage isn't measured
+    resource = None
+
 parser = argparse.ArgumentParser(description='Creating a benchmark report from one or more benchmarks.')
 parser.add_argument('benchmarks', metavar='B', nargs='+',
                     help='a benchmark to be used in the comparison')
@@ -39,12 +66,26 @@ parser.add_argument('-c', '--cooldown', nargs=1, default=[0], type=int,
                     help='The cooldown period in seconds. The cooldown removes datapoints from the end.')
 parser.add_argument('-f', '--full', help='Enable individual worker level diagrams.', action="store_true")
 parser.add_argument('--svg', help='SVG instead of PNG graphics.', action="store_true")
+parser.add_argument('-j', '--jobs', nargs=1, default=[1], type=int,
+                    help='The number of processes used to ingest the benchmarks, load the series and render the plots.')
+parser.add_argument('--cache-dir', nargs=1,
+                    help='The directory of the cache with parsed data. By default the benchmark-report directory in the '
+                         'user cache directory (~/.cache) is used.')
+parser.add_argument('--cache-size', nargs=1, default=[1024], type=int,
+                    help='The maximum size of the cache in MB. The least recently used data is removed when the cache '
+                         'becomes larger.')
+parser.add_argument('--no-cache', help='Disable the cache with parsed data.', action="store_true")
+parser.add_argument('--chart-points', nargs=1, default=[2000], type=int,
+                    help='The maximum number of points of a chart in the html report. Longer series are downsampled.')
+parser.add_argument('--profile', help='Print the time spent in every phase of the report generation and the peak '
+                                      'memory usage.', action="store_true")
+parser.add_argument('--watch', nargs=1, type=int,
+                    help='Watch running benchmarks; the report is refreshed every WATCH seconds with the data that '
+                         'has been appended, until interrupted with Ctrl-C.')
 
 args = parser.parse_args()
 benchmark_args = args.benchmarks
 
-gc_logs_found = False
-
 simulator_home = os.environ['SIMULATOR_HOME']
 os.environ['LC_CTYPE'] = "en_US.UTF-8"
 
@@ -54,10 +95,20 @@ else:
     report_dir = args.output[0]
 report_dir = os.path.abspath(report_dir)
 
+if args.no_cache:
+    cache_dir = None
+elif args.cache_dir:
+    cache_dir = os.path.abspath(args.cache_dir[0])
+else:
+    cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                             'hazelcast-simulator', 'benchmark-report')
+cache_size = int(args.cache_size[0]) * 1024 * 1024
+
 warmup_seconds = int(args.warmup[0])
 cooldown_seconds = int(args.cooldown[0])
-
-print("Report directory '" + report_dir + "'")
+jobs = max(1, int(args.jobs[0]))
+watch_seconds = max(1, int(args.watch[0])) if args.watch else None
+chart_points = max(2, int(args.chart_points[0]))
 
 
 # ================ utils ========================
@@ -72,6 +123,31 @@ def ensure_dir(file_path):
         os.makedirs(file_path)
 
 
+# An executor that runs every task directly in the calling thread. It is used instead of a process pool when
+# there is a single job, so the report is made the same way in both cases.
+class SerialExecutor(concurrent.futures.Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+# Returns the executor for the tasks of the report. All tasks must be picklable, so they are either module level
+# functions or methods of objects that only hold plain data.
+def make_executor():
+    if jobs > 1:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=ignore_interrupt)
+    return SerialExecutor()
+
+
+# Ctrl-C, e.g. to stop watching, is handled by the main process only.
+def ignore_interrupt():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
 # Returns the name of the agent this worker belongs to
 def agent_for_worker(worker_name):
     if worker_name.startswith("C_"):
@@ -83,12 +159,69 @@ def agent_for_worker(worker_name):
         return worker_name[0:index]
 
 
+# ================ profiling =========================
+
+# The time spent in every phase of the report generation is measured. With --profile the phases are printed at the
+# end and written to profile.csv in the report directory, so the cost of a report can be tracked over time.
+
+# Returns the peak resident set size in bytes of this process and the largest peak of the child processes that
+# have terminated, e.g. the processes of the pool. Returns None, None if it can't be measured.
+def peak_rss():
+    if resource is None:
+        return None, None
+    # ru_maxrss is in KB, except on macOS where it is in bytes
+    unit = 1 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+
+class Profile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        # per phase the total seconds, the number of runs and the peak rss of this process after its last run; the
+        # phases are kept in the order in which they first ran
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds, runs, rss = self.phases.get(name, (0.0, 0, None))
+            self.phases[name] = (seconds + time.perf_counter() - start, runs + 1, peak_rss()[0])
+
+    # Returns the rows of the profile: the phases and the total. The peak rss of the total includes the processes
+    # that have terminated, so it is complete once the pool has been shut down.
+    def rows(self):
+        rows = [[name, seconds, runs, rss] for name, (seconds, runs, rss) in self.phases.items()]
+        own, children = peak_rss()
+        rows.append(["total", time.perf_counter() - self.start, 1, None if own is None else max(own, children)])
+        return rows
+
+    def report(self):
+        rows = self.rows()
+        print("Profile")
+        print(" %-16s %10s %6s %16s" % ("phase", "seconds", "runs", "peak rss (MB)"))
+        for name, seconds, runs, rss in rows:
+            print(" %-16s %10.3f %6d %16s" % (name, seconds, runs, "-" if rss is None else "%.1f" % (rss / 1e6)))
+
+        with open(os.path.join(report_dir, "profile.csv"), "w") as f:
+            f.write('"phase","seconds","runs","peak_rss(bytes)"\n')
+            for name, seconds, runs, rss in rows:
+                f.write("%s,%.6f,%d,%s\n" % (name, seconds, runs, "" if rss is None else rss))
+
+
+profile = Profile()
+
+
 # ================ plotting =========================
 
 class Gnuplot:
     image_width = 1280
     image_height = 1024
     image_path = None
+    script_path = None
     ylabel = None
     is_bytes = None
     is_points = None
@@ -104,8 +237,6 @@ class Gnuplot:
 
     def _complete(self):
         self.script_file.close()
-        from os import system
-        system('gnuplot ' + self.script_file.name)
 
     def _write(self, line):
         self.script_file.write(line + '\n')
@@ -141,6 +272,7 @@ class Gnuplot:
         else:
             return "dark-goldenrod"
 
+    # Writes the data files and the gnuplot script of the plot. The script is rendered with run_gnuplot.
     def plot(self):
         empty = True
         for ts in self.ts_list:
@@ -161,20 +293,30 @@ class Gnuplot:
         else:
             ext = "png"
 
-        if self.basefilename:
-            self.image_path = os.path.join(self.directory, self.basefilename + "." + ext)
-            script_path = os.path.join(self.directory, self.basefilename + ".plt")
-        else:
-            self.image_path = os.path.join(self.directory, ts_first.name + "." + ext)
-            script_path = os.path.join(self.directory, ts_first.name + ".plt")
+        if not self.basefilename:
+            self.basefilename = ts_first.name
+        self.image_path = os.path.join(self.directory, self.basefilename + "." + ext)
+        self.script_path = os.path.join(self.directory, self.basefilename + ".plt")
 
         self.is_bytes = ts_first.is_bytes
         self.is_points = ts_first.is_points
         ensure_dir(self.directory)
-        self.script_file = open(script_path, "w")
+        self.script_file = open(self.script_path, "w")
         self._plot()
 
-        print(self.image_path)
+    # The maximum number of points of every series of the plot. Longer series are downsampled the same way for the
+    # image and for the chart in the html report, so rendering doesn't take longer for longer benchmarks.
+    def max_points(self):
+        return max(2, chart_points // max(1, len([ts for ts in self.ts_list if not ts.is_empty()])))
+
+    # Returns the checksums of the data of the series of the plot.
+    def fingerprint(self):
+        return [ts.fingerprint() for ts in self.ts_list]
+
+    # The name of the data file of a series of the plot; it only depends on the plot and the position of the series
+    # so the names don't depend on the order in which the plots are made.
+    def _data_file_name(self, ts):
+        return self.basefilename + "_" + str(self.ts_list.index(ts) + 1)
 
     def _plot(self):
         raise NotImplementedError("Please Implement this method")
@@ -216,7 +358,7 @@ class TimeseriesGnuplot(Gnuplot):
         self._write("plot \\")
 
         for ts in self.ts_list:
-            ts_file = ts.to_data_file()
+            ts_file = ts.to_data_file(self._data_file_name(ts), self.max_points())
 
             if len(self.ts_list) > 1:
                 title = self.titles[ts]
@@ -267,7 +409,7 @@ class LatencyDistributionGnuplot(Gnuplot):
 
         self._write("plot '" + simulator_home + "/bin/xlabels.csv' notitle with labels center offset 0, 1.5 point,\\")
         for ts in self.ts_list:
-            ts_file = ts.to_data_file()
+            ts_file = ts.to_data_file(self._data_file_name(ts), self.max_points())
 
             if len(self.ts_list) > 1:
                 title = self.titles[ts]
@@ -287,153 +429,559 @@ class LatencyDistributionGnuplot(Gnuplot):
         self._complete()
 
 
-class GoogleCharts:
-    def __init__(self, ts, directory, title):
-        self.title = title
-        self.ts = ts
-        self.directory = directory
-        with open('chart_template.html', 'r') as f:
-            self.chart_template = f.read()
+# Renders a gnuplot script. If gnuplot can't be run, the error is printed and the report is made without the image.
+def run_gnuplot(script_path):
+    try:
+        subprocess.call(['gnuplot', script_path])
+    except OSError as e:
+        print("Failed to run gnuplot for [" + script_path + "]: " + str(e))
 
-    def plot(self):
-        filepath = os.path.join(self.directory, self.ts.name + ".html")
-        empty = True
-        for ts in ts_list:
-            if not ts.is_empty():
-                empty = False
-                break
 
-        if empty:
-            print("Skipping plot of " + filepath + "; timeseries are empty")
-            return
+# A chart in the html report that is drawn by the browser. The series of a plot are downsampled to at most
+# chart_points points for the whole chart and embedded as base64 encoded little endian float32 arrays, so the size
+# of a chart doesn't depend on the length of the benchmark.
+class HtmlChart:
+    # the css colors of the gnuplot colors
+    colors = {"forest-green": "forestgreen", "dark-goldenrod": "darkgoldenrod"}
 
-        rows = ""
-        first = True
-        for item in self.ts.items:
-            rows += "[" + str(item.time) + "," + str(item.value) + "]"
-            if first:
-                rows += ","
-            rows += "\n"
+    def __init__(self, plot):
+        self.plot = plot
 
-        chart = self.chart_template.replace("$rows", rows)
-        ensure_dir(self.directory)
+    def to_html(self):
+        plot = self.plot
+        is_distribution = isinstance(plot, LatencyDistributionGnuplot)
+        ts_list = [ts for ts in plot.ts_list if not ts.is_empty()]
+        max_points = plot.max_points()
 
-        with open(filepath, 'w') as f:
-            f.write(chart)
-        print(filepath)
+        series = []
+        for ts in ts_list:
+            title = ""
+            if len(plot.ts_list) > 1:
+                title = plot.titles[ts] or ts.name
+            color = plot._color(ts)
+            times, values = ts.downsample(max_points)
+            if not is_distribution:
+                # like in the gnuplot charts, the time is relative to the start of the series
+                start_time = ts.start_time()
+                times = times - start_time if numpy is not None else to_column([time - start_time for time in times])
+            series.append({"title": title, "color": self.colors.get(color, color),
+                           "x": float32_base64(times), "y": float32_base64(values)})
+
+        chart = {"title": plot.title,
+                 "ylabel": "Latency (μs)" if is_distribution else plot.ylabel,
+                 "xlabel": "Percentile" if is_distribution else "Time minutes:seconds",
+                 "bytes": bool(plot.is_bytes), "points": bool(plot.is_points), "xlog": is_distribution,
+                 "series": series}
+
+        metric_name = os.path.basename(plot.directory)
+        image_link = os.path.relpath(plot.image_path, report_dir)
+        # '</' can't be part of the json in the script element
+        data = json.dumps(chart).replace("</", "<\\/")
+        return '<div class="image-container ' + metric_name + '">' \
+               + '<canvas class="chart"></canvas>' \
+               + '<script type="application/json">' + data + '</script>' \
+               + '<p class="image-text">' + plot.title + ' <a href="' + image_link + '">image</a></p>' \
+               + '</div>'
+
+
+# Returns the numbers of a column as base64 encoded little endian float32 values.
+def float32_base64(column):
+    if numpy is not None:
+        data = numpy.asarray(column, dtype='<f4').tobytes()
+    else:
+        values = array('f', column)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        data = values.tobytes()
+    return base64.b64encode(data).decode('ascii')
+
+
+# ================ columns =========================
+
+# The data of a series is stored in contiguous float64 columns. If NumPy is installed, the columns are NumPy arrays
+# and all operations on them are vectorized. Otherwise the columns are memoryviews on a stdlib array('d'). In both
+# cases slicing a column doesn't copy the underlying data.
+
+# Converts an iterable of numbers (or strings containing numbers) to a column.
+def to_column(values):
+    if numpy is not None:
+        return numpy.asarray(values, dtype=numpy.float64)
+
+    if isinstance(values, memoryview):
+        return values
+    if not isinstance(values, array) or values.typecode != 'd':
+        values = array('d', map(float, values))
+    return memoryview(values)
+
+
+# Reduces a series to at most max_points points. The points are split in buckets of consecutive points and of
+# every bucket the points with the minimum and the maximum value are kept, so peaks remain visible. The size of the
+# buckets is a power of 2, so the buckets of a growing series don't move; they are only merged in pairs.
+def downsample(times, values, max_points):
+    length = len(times)
+    if length <= max_points:
+        return times, values
+
+    indices = bucket_indices(extreme_indices(values, 0, length, downsample_bucket_size(length, max_points)))
+    return take(times, indices), take(values, indices)
+
+
+# The smallest power of 2 that splits length points in at most max_points / 2 buckets.
+def downsample_bucket_size(length, max_points):
+    size = 1
+    while size * max(1, max_points // 2) < length:
+        size *= 2
+    return size
+
+
+# Returns the index of the minimum and the index of the maximum value of every bucket of size values from start
+# up to end. A NaN is only the minimum or the maximum if the whole bucket is NaN; on a tie the first index is used.
+def extreme_indices(values, start, end, size):
+    if end <= start:
+        return []
+
+    if numpy is not None:
+        buckets = -(-(end - start) // size)
+        padded = numpy.full(buckets * size, numpy.nan)
+        padded[0:end - start] = values[start:end]
+        padded = padded.reshape(buckets, size)
+        missing = numpy.isnan(padded)
+        lows = numpy.where(missing, numpy.inf, padded).argmin(axis=1)
+        highs = numpy.where(missing, -numpy.inf, padded).argmax(axis=1)
+        starts = numpy.arange(buckets) * size + start
+        return list(zip((starts + lows).tolist(), (starts + highs).tolist()))
+
+    result = []
+    for bucket_start in range(start, end, size):
+        bucket = range(bucket_start, min(bucket_start + size, end))
+        low = min(bucket, key=lambda index: math.inf if math.isnan(values[index]) else values[index])
+        high = max(bucket, key=lambda index: -math.inf if math.isnan(values[index]) else values[index])
+        result.append((low, high))
+    return result
+
+
+# Merges the extreme indices of pairs of consecutive buckets; a last bucket without a pair is left out.
+def merge_extreme_indices(values, buckets):
+    def key(index, missing):
+        return missing if math.isnan(values[index]) else values[index]
+
+    merged = []
+    for k in range(0, len(buckets) - 1, 2):
+        (first_low, first_high), (second_low, second_high) = buckets[k], buckets[k + 1]
+        low = second_low if key(second_low, math.inf) < key(first_low, math.inf) else first_low
+        high = second_high if key(second_high, -math.inf) > key(first_high, -math.inf) else first_high
+        merged.append((low, high))
+    return merged
+
+
+# The sorted indices of the points of the buckets.
+def bucket_indices(buckets):
+    indices = []
+    for low, high in buckets:
+        indices.extend(sorted({low, high}))
+    return indices
+
+
+# Returns the values of the column at the given indices.
+def take(column, indices):
+    if numpy is not None:
+        return column[numpy.asarray(indices, dtype=numpy.int64)]
+    return to_column([column[index] for index in indices])
+
+
+# Creates a column of the given length filled with zeros.
+def zero_column(length):
+    if numpy is not None:
+        return numpy.zeros(length, dtype=numpy.float64)
+    return memoryview(array('d', bytes(8 * length)))
+
+
+# Returns the index range [lo, hi) of a sorted column that lies in between low and high (both inclusive).
+# A bound that is None is ignored.
+def column_range(column, low, high):
+    lo = 0
+    hi = len(column)
+    if numpy is not None:
+        if low is not None:
+            lo = int(numpy.searchsorted(column, low, side='left'))
+        if high is not None:
+            hi = int(numpy.searchsorted(column, high, side='right'))
+    else:
+        if low is not None:
+            lo = bisect.bisect_left(column, low)
+        if high is not None:
+            hi = bisect.bisect_right(column, high)
+    return lo, max(lo, hi)
+
+
+# Sums the values of the columns per bucket of the given number of seconds. The times of the result are the starts
+# of the buckets from the first to the last bucket with values; the buckets in between without values are 0. The
+# columns are pairs of a time column and a value column; they don't need to be aligned with each other. If start_time
+# is given, the result starts at the bucket of start_time.
+def bucket_sum(columns, bucket_seconds=1, start_time=None):
+    low = None
+    if start_time is not None:
+        low = math.floor(start_time / bucket_seconds)
+        sliced = []
+        for times, values in columns:
+            lo = column_range(times, low * bucket_seconds, None)[0]
+            sliced.append((times[lo:], values[lo:]))
+        columns = sliced
+
+    if numpy is not None:
+        columns = [(times, values) for times, values in columns if len(times) > 0]
+        if not columns:
+            return to_column([]), to_column([])
+        buckets = numpy.floor(numpy.concatenate([times for times, values in columns]) / bucket_seconds)
+        values = numpy.concatenate([values for times, values in columns])
+        if low is None:
+            low = buckets.min()
+        sums = numpy.bincount((buckets - low).astype(numpy.int64), weights=values)
+        return (numpy.arange(len(sums)) + low) * bucket_seconds, sums
+
+    sums = {}
+    for times, values in columns:
+        for time, value in zip(times, values):
+            bucket = math.floor(time / bucket_seconds)
+            sums[bucket] = sums.get(bucket, 0.0) + value
+    if not sums:
+        return to_column([]), to_column([])
+    buckets = range(min(sums) if low is None else low, max(sums) + 1)
+    return to_column([bucket * bucket_seconds for bucket in buckets]), \
+        to_column([sums.get(bucket, 0.0) for bucket in buckets])
+
+
+# A column that values are appended to. The view of the column shares the memory with the column; it remains valid
+# when values are appended, but it doesn't see these values.
+class GrowingColumn:
+    def __init__(self):
+        self.length = 0
+        self.__buffer = zero_column(64)
+
+    def append(self, value):
+        if self.length == len(self.__buffer):
+            buffer = zero_column(2 * self.length)
+            buffer[0:self.length] = self.__buffer
+            self.__buffer = buffer
+        self.__buffer[self.length] = value
+        self.length += 1
+
+    def extend(self, values):
+        length = self.length + len(values)
+        if length > len(self.__buffer):
+            buffer = zero_column(max(2 * len(self.__buffer), length))
+            buffer[0:self.length] = self.__buffer[0:self.length]
+            self.__buffer = buffer
+        self.__buffer[self.length:length] = to_column(values)
+        self.length = length
+
+    # Removes the values from the given length on. The values that are appended afterwards overwrite the values
+    # in the views taken before.
+    def truncate(self, length):
+        self.length = min(self.length, length)
+
+    def view(self):
+        return self.__buffer[0:self.length]
+
+
+# ================ aggregation =========================
+
+# The series of different workers and agents are combined on wall clock time. A sample of a source is measured over
+# the interval since the previous sample of that source: the operations/second of a performance.csv row, the count
+# of an interval histogram or the cpu usage of a dstat row. The time is split in buckets that are aligned on the
+# epoch, and every sample is spread over the buckets its interval overlaps. So the samples of sources that are not
+# in phase, or that missed a sample, are combined for the same seconds instead of by their position in the series.
+
+# An interval of more than GAP_INTERVALS times the usual interval of a source is a gap, e.g. the time in between two
+# tests. The sample after the gap only covers the usual interval; the source has no data for the rest of the gap.
+# Sources that don't sample at a regular interval, like the amounts of a gc.log, have no gaps; their samples always
+# cover the time since the previous sample.
+GAP_INTERVALS = 5
+
+# The usual interval of a source is the median of the intervals in between its first USUAL_INTERVALS + 1 samples, so
+# it doesn't change anymore when more samples are appended, e.g. in watch mode.
+USUAL_INTERVALS = 32
+
+
+# The usual interval of a source; samples with a NaN value are left out.
+def usual_interval(times, values):
+    times = times[0:USUAL_INTERVALS + 1]
+    values = values[0:USUAL_INTERVALS + 1]
+    if numpy is not None:
+        intervals = numpy.diff(times[~numpy.isnan(values)])
+        usual = float(numpy.median(intervals)) if len(intervals) > 0 else 0.0
+    else:
+        sampled = [time for time, value in zip(times, values) if not math.isnan(value)]
+        intervals = sorted(sampled[k + 1] - sampled[k] for k in range(len(sampled) - 1))
+        usual = 0.0
+        if intervals:
+            middle = len(intervals) // 2
+            usual = intervals[middle] if len(intervals) % 2 else (intervals[middle - 1] + intervals[middle]) / 2
+    return usual if usual > 0 else 1.0
+
+
+# Linear interpolation of the points (knot_times, knot_values) at the sorted times. Times before the first knot get
+# the first value and times after the last knot the last value.
+def interpolate(times, knot_times, knot_values):
+    if numpy is not None:
+        return numpy.interp(times, knot_times, knot_values)
+
+    result = []
+    k = 0
+    last = len(knot_times) - 1
+    for time in times:
+        while k < last and knot_times[k + 1] <= time:
+            k += 1
+        if time <= knot_times[0] or k == last:
+            result.append(knot_values[k])
+        else:
+            slope = (knot_values[k + 1] - knot_values[k]) / (knot_times[k + 1] - knot_times[k])
+            result.append(slope * (time - knot_times[k]) + knot_values[k])
+    return to_column(result)
+
+
+# The cumulative amount and the cumulative covered time of a source, as points to interpolate. The interval of a
+# sample ends at the time of the sample; if is_amount is False, the value is a rate and the amount of a sample is
+# the rate times the length of its interval. Samples with a NaN value are left out. If start_time is given, the
+# samples that end before it are left out, apart from the sample that the interval of the next sample starts at.
+def coverage_knots(times, values, is_amount, gaps=True, start_time=None):
+    usual = usual_interval(times, values)
+    if start_time is not None:
+        lo = column_range(times, None, start_time)[1] - 1
+        while lo > 0 and math.isnan(values[lo]):
+            lo -= 1
+        times = times[max(0, lo):]
+        values = values[max(0, lo):]
+
+    if numpy is not None:
+        keep = ~numpy.isnan(values)
+        times = times[keep]
+        values = values[keep]
+        if len(times) == 0:
+            return None
 
+        intervals = numpy.diff(times)
+        starts = numpy.empty(len(times))
+        starts[0] = times[0] - usual
+        if gaps:
+            starts[1:] = numpy.where(intervals > GAP_INTERVALS * usual, times[1:] - usual, times[:-1])
+        else:
+            starts[1:] = times[:-1]
+        widths = times - starts
+        amounts = values if is_amount else values * widths
+
+        knot_times = numpy.empty(2 * len(times))
+        knot_times[0::2] = starts
+        knot_times[1::2] = times
+        knots = []
+        for increments in (amounts, widths):
+            totals = numpy.cumsum(increments)
+            knot_values = numpy.empty(2 * len(times))
+            knot_values[0] = 0.0
+            knot_values[2::2] = totals[:-1]
+            knot_values[1::2] = totals
+            knots.append(knot_values)
+        return knot_times, knots[0], knots[1]
+
+    samples = [(time, value) for time, value in zip(times, values) if not math.isnan(value)]
+    if not samples:
+        return None
+
+    knot_times = []
+    amount_values = []
+    covered_values = []
+    amount = 0.0
+    covered = 0.0
+    previous_time = None
+    for time, value in samples:
+        if previous_time is None or (gaps and time - previous_time > GAP_INTERVALS * usual):
+            start = time - usual
+        else:
+            start = previous_time
+        width = time - start
+        knot_times.append(start)
+        amount_values.append(amount)
+        covered_values.append(covered)
+        amount += value if is_amount else value * width
+        covered += width
+        knot_times.append(time)
+        amount_values.append(amount)
+        covered_values.append(covered)
+        previous_time = time
+    return knot_times, amount_values, covered_values
+
+
+# Combines the sources per bucket of bucket_seconds. The sources are pairs of a time column and a value column. The
+# result is a time column with the starts of the buckets and a value column with either the total rate of all
+# sources, or, if mean is True, the mean of the sources weighted by the time they cover in the bucket; e.g. the
+# cpu usage of the cluster. A bucket that no source covers is a gap and its value is NaN. A total is only known for
+# the buckets that are covered completely by at least one source; a total over part of a bucket would show as a drop
+# at the start and the end of the series and around the gaps, so for a total these buckets are gaps as well. The gaps
+# before the first and after the last known bucket are left out. If start_time is given, only the buckets from the
+# bucket of start_time on are combined, and the result starts at that bucket.
+def aggregate(sources, bucket_seconds=1, mean=False, is_amount=False, gaps=True, start_time=None):
+    sources = [knots for knots in (coverage_knots(times, values, is_amount, gaps, start_time)
+                                   for times, values in sources)
+               if knots is not None]
+    if not sources:
+        return to_column([]), to_column([])
+
+    low = math.floor(min(knots[0][0] for knots in sources) / bucket_seconds)
+    if start_time is not None:
+        low = max(low, math.floor(start_time / bucket_seconds))
+    high = math.ceil(max(knots[0][-1] for knots in sources) / bucket_seconds)
+    if high <= low:
+        return to_column([]), to_column([])
+    edges = [bucket * bucket_seconds for bucket in range(low, high + 1)]
+    # the part of a bucket that a source must cover for the value of the bucket to be known
+    minimum = 0.0 if mean else bucket_seconds * (1 - 1e-9)
+    if numpy is not None:
+        edges = numpy.asarray(edges, dtype=numpy.float64)
+        amount = numpy.zeros(len(edges) - 1)
+        covered = numpy.zeros(len(edges) - 1)
+        most = numpy.zeros(len(edges) - 1)
+        for knot_times, amount_values, covered_values in sources:
+            amount += numpy.diff(interpolate(edges, knot_times, amount_values))
+            source_covered = numpy.diff(interpolate(edges, knot_times, covered_values))
+            covered += source_covered
+            most = numpy.maximum(most, source_covered)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            values = amount / covered if mean else amount / bucket_seconds
+        values[most <= minimum] = numpy.nan
+        times = edges[:-1]
+    else:
+        amount = [0.0] * (len(edges) - 1)
+        covered = [0.0] * (len(edges) - 1)
+        most = [0.0] * (len(edges) - 1)
+        for knot_times, amount_values, covered_values in sources:
+            amounts = interpolate(edges, knot_times, amount_values)
+            covers = interpolate(edges, knot_times, covered_values)
+            for k in range(len(edges) - 1):
+                amount[k] += amounts[k + 1] - amounts[k]
+                source_covered = covers[k + 1] - covers[k]
+                covered[k] += source_covered
+                most[k] = max(most[k], source_covered)
+        values = [math.nan if most[k] <= minimum else amount[k] / covered[k] if mean else amount[k] / bucket_seconds
+                  for k in range(len(amount))]
+        times = edges[:-1]
+
+    first = 0
+    while start_time is None and first < len(most) and not most[first] > minimum:
+        first += 1
+    last = len(most)
+    while last > first and not most[last - 1] > minimum:
+        last -= 1
+    return to_column(times[first:last]), to_column(values[first:last])
 
-seriesCounter = Counter()
 
 # a series is a list of key/values. It could be a time series where the key is the time and the value
-# is the measured value e.g. cpu usage.
+# is the measured value e.g. cpu usage. The keys and values are stored as 2 columns of equal length.
 class Series:
     name = None
 
-    def __init__(self, name, ylabel, is_bytes, is_points, ts_list=None, items=None, ):
-        if ts_list is None:
-            ts_list = []
-
+    def __init__(self, name, ylabel, is_bytes, is_points, times=None, values=None):
         self.is_points = is_points
         self.is_bytes = is_bytes
         self.name = name
         self.ylabel = ylabel
-        if not items:
-            self.items = []
-        else:
-            self.items = items
+        self.times = to_column([] if times is None else times)
+        self.values = to_column([] if values is None else values)
         self.attributes = {}
-
-        for source_ts in ts_list:
-            if source_ts.is_empty():
-                continue
-
-            # add all items in the source_ts, to the result_ts
-            for index in range(0, source_ts.length()):
-                source_item = source_ts.items[index]
-                if self.length() > index:
-                    result_item = self.items[index]
-                    result_item.value += source_item.value
-                else:
-                    self.add(source_item.time, source_item.value)
-
-    def add(self, time, value):
-        self.items.append(KeyValue(time, value))
+        # the state of the series in watch mode
+        self.watched = None
 
     def start_time(self):
-        if not self.items:
+        if self.is_empty():
             return None
         else:
-            return self.items[0].time
+            return float(self.times[0])
 
     def end_time(self):
-        if not self.items:
+        if self.is_empty():
             return None
         else:
-            return self.items[len(self.items) - 1].time
+            return float(self.times[self.length() - 1])
 
-    def to_data_file(self):
+    # Writes the series, downsampled to at most max_points points, to a data file for gnuplot.
+    def to_data_file(self, name, max_points):
         data_dir = os.path.join(report_dir, "data")
         ensure_dir(data_dir)
 
-        count = seriesCounter.get(self.name, 1)
-        seriesCounter[self.name] = count + 1
-
-        file_name = os.path.join(data_dir, self.name + "_" + str(count) + ".data")
+        file_name = os.path.join(data_dir, name + ".data")
+        times, values = self.downsample(max_points)
 
         file = open(file_name, "w")
-        for item in self.items:
-            file.write(str(item.time) + ',' + str(item.value) + '\n')
+        file.writelines("%r,%r\n" % item for item in zip(times.tolist(), values.tolist()))
         file.close()
         return file
 
     def length(self):
-        return len(self.items)
+        return len(self.times)
+
+    # A memoryview can't be pickled, so without NumPy the columns are pickled as bytes.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if numpy is None:
+            state['times'] = self.times.tobytes()
+            state['values'] = self.values.tobytes()
+        return state
+
+    def __setstate__(self, state):
+        if numpy is None:
+            for key in ('times', 'values'):
+                column = array('d')
+                column.frombytes(state[key])
+                state[key] = memoryview(column)
+        self.__dict__.update(state)
 
     def is_empty(self):
         return self.length() == 0
 
+    # Returns the length and the checksums of the times and the values.
+    def fingerprint(self):
+        if self.watched is not None:
+            return self.watched.fingerprint()
+        return self.length(), zlib.crc32(self.times.tobytes()), zlib.crc32(self.values.tobytes())
+
+    # Returns the sum and the number of the values that are not NaN.
+    def totals(self):
+        if self.watched is not None:
+            return self.watched.totals()
+        values = [value for value in self.values.tolist() if not math.isnan(value)]
+        return sum(values), len(values)
+
+    # Returns the times and the values reduced to at most max_points points; see downsample.
+    def downsample(self, max_points):
+        if self.watched is not None:
+            return self.watched.downsample(max_points)
+        return downsample(self.times, self.values, max_points)
+
     def min(self):
-        result = None
-        for item in self.items:
-            if not result or item.value < result:
-                result = item.value
-        return result
+        if self.is_empty():
+            return None
+        return float(min(self.values)) if numpy is None else float(self.values.min())
 
     def max(self):
-        result = None
-        for item in self.items:
-            if not result or item.value > result:
-                result = item.value
-        return result
+        if self.is_empty():
+            return None
+        return float(max(self.values)) if numpy is None else float(self.values.max())
 
-    # Removes all items from this time series that are not in between the start/end-time.
+    # Removes all items from this time series that are not in between the start/end-time. The times are
+    # ordered, so the remaining items are a slice of the columns which doesn't copy any data.
     def trim(self, start_time, end_time):
-        new_items = []
-        for item in self.items:
-            if start_time is not None and float(item.time) < float(start_time):
-                continue
-            if end_time is not None and float(item.time) > float(end_time):
-                continue
-            new_items.append(item)
-        self.items = new_items
-
-
-# A key/value in a series
-class KeyValue:
-    time = None
-    value = None
-
-    def __init__(self, time, value):
-        self.time = time
-        self.value = float(value)
+        lo, hi = column_range(self.times,
+                              None if start_time is None else float(start_time),
+                              None if end_time is None else float(end_time))
+        self.times = self.times[lo:hi]
+        self.values = self.values[lo:hi]
 
 
 # A handle to a series. With a handle you can refer to a series, without needing to pull it
 # into memory. Since we could have a lot of measured data, we want to prevent getting it all in memory.
 class SeriesHandle:
     def __init__(self, src, name, title, ylabel, load_method,
-                 args=None, is_bytes=False, is_points=False, start_time=None, end_time=None):
+                 args=None, is_bytes=False, is_points=False, start_time=None, end_time=None, source=None,
+                 inputs=None):
         if not args:
             args = []
 
@@ -447,17 +995,1843 @@ class SeriesHandle:
         self.is_points = is_points
         self.start_time = start_time
         self.end_time = end_time
+        # the file the series is loaded from; handles with the same source are loaded together
+        self.source = source
+        # the handles of the series this series is made of, e.g. the throughput of every worker for the throughput of
+        # all workers. The inputs are loaded once and are shared by all handles that have them.
+        self.inputs = inputs
+        # the state of the series in watch mode
+        self.watched = WatchedSeries() if watch_seconds else None
 
     def period(self, period):
         self.start_time = period.start_time
         self.end_time = period.end_time
 
-    def load(self):
-        items = self.load_method(*self.args)
-        series = Series(self.name, self.ylabel, self.is_bytes, self.is_points, items=items)
+    # The load_method returns the times and the values of the series. The load_method of a handle with inputs gets
+    # the times and the values of the untrimmed inputs as its first argument; the inputs are loaded if not given.
+    # It also gets the start_time from which on the points are needed; see WatchedSeries.
+    def load_untrimmed(self, inputs=None, start_time=None):
+        if self.inputs is None:
+            times, values = self.load_method(*self.args)
+        else:
+            if inputs is None:
+                inputs = [handle.load_untrimmed() for handle in self.inputs]
+            times, values = self.load_method([(series.times, series.values) for series in inputs], *self.args,
+                                             start_time=start_time)
+        return Series(self.name, self.ylabel, self.is_bytes, self.is_points, times=times, values=values)
+
+    # Returns the series trimmed to the period of the handle. The trimmed series shares the columns of the untrimmed
+    # series, which remains complete for the handles it is an input of.
+    def trimmed(self, series):
+        series = Series(self.name, self.ylabel, self.is_bytes, self.is_points, times=series.times, values=series.values)
         series.trim(self.start_time, self.end_time)
         return series
 
+    def load(self):
+        return self.trimmed(self.load_untrimmed())
+
+
+# Loads the untrimmed series of handles with the same source; the source is parsed once for all of them.
+def load_untrimmed_series(handles):
+    return [handle.load_untrimmed() for handle in handles]
+
+
+# Makes the untrimmed series of a handle with inputs from its loaded inputs.
+def combine_series(handle, inputs):
+    return handle.load_untrimmed(inputs)
+
+
+# ================ cache =========================
+
+# Parsed data is cached on disk, so making a report again (e.g. with a different warmup or another benchmark to
+# compare with) doesn't parse the unchanged files again. An entry is keyed by the path, the size and the modification
+# time of the parsed file and the version of the parser. The parsed data is never trimmed; trimming is done after
+# loading. The processed hdr probes are the exception: their output files are cached per trim window. The files in
+# the tmp directory of the report are rewritten on every run, so they are not cached themselves. An entry is a single
+# file with a json header followed by the raw arrays, which are memory mapped when the entry is loaded. When the cache
+# grows beyond its maximum size, the least recently used entries are removed.
+
+# increment when the parsed data or the format of an entry changes.
+CACHE_VERSION = 2
+CACHE_MAGIC = b"BRCACHE1"
+CACHE_ALIGNMENT = 8
+
+
+# Returns True if the parsed data of the file can be cached; the files in the tmp directory of the report are made
+# from other files, which are cached instead.
+def is_cacheable(path):
+    return not os.path.abspath(path).startswith(os.path.join(report_dir, "tmp") + os.sep)
+
+
+def aligned(offset):
+    return (offset + CACHE_ALIGNMENT - 1) // CACHE_ALIGNMENT * CACHE_ALIGNMENT
+
+
+# Returns the raw bytes of an array of numbers with the given struct typecode, e.g. 'd' or 'q'.
+def array_bytes(typecode, values):
+    if isinstance(values, memoryview) and values.format == typecode:
+        return values.tobytes()
+    if numpy is not None:
+        return numpy.asarray(values, dtype=typecode).tobytes()
+    if isinstance(values, array) and values.typecode == typecode:
+        return values.tobytes()
+    return array(typecode, values).tobytes()
+
+
+# Returns an array on a slice of a memory mapped file, without copying the data.
+def mapped_array(mapped, typecode, offset, length):
+    if numpy is not None:
+        return numpy.frombuffer(mapped, dtype=typecode, count=length, offset=offset)
+    return memoryview(mapped)[offset:offset + length * struct.calcsize(typecode)].cast(typecode)
+
+
+class Cache:
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        # the size of the entries; the directory is listed on the first store only
+        self.size = None
+
+    # Returns the key of the data parsed from a file, or None if the file doesn't exist. The params are the
+    # parameters of the parser that change the parsed data.
+    def key(self, kind, path, *params):
+        return self.files_key(kind, [path], *params)
+
+    # Returns the key of the data made from several files, or None if one of the files doesn't exist.
+    def files_key(self, kind, paths, *params):
+        identity = [CACHE_VERSION, kind]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            identity.extend([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        identity.extend(params)
+        return hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+
+    def __path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    # Returns the metadata and the arrays of an entry, or None if there is no valid entry for the key.
+    def load(self, key):
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        entry = self.__read(mapped)
+        if entry is None:
+            # the arrays mapped so far are gone with the failed read, so the mapping can be closed
+            mapped.close()
+            return None
+
+        # the modification time of an entry is its last use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    @staticmethod
+    def __read(mapped):
+        try:
+            if mapped[0:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                return None
+            header_length, = struct.unpack_from("<I", mapped, len(CACHE_MAGIC))
+            header_start = len(CACHE_MAGIC) + 4
+            header = json.loads(mapped[header_start:header_start + header_length].decode('utf-8'))
+            if header["byteorder"] != sys.byteorder:
+                return None
+
+            data_start = aligned(header_start + header_length)
+            arrays = {}
+            for name, typecode, offset, length in header["arrays"]:
+                if data_start + offset + length * struct.calcsize(typecode) > len(mapped):
+                    return None
+                arrays[name] = mapped_array(mapped, typecode, data_start + offset, length)
+        except (ValueError, KeyError, TypeError, struct.error):
+            return None
+        return header["meta"], arrays
+
+    # Stores an entry. The arrays are a dictionary from the name to a tuple with the typecode and the numbers.
+    def store(self, key, meta, arrays):
+        header = {"byteorder": sys.byteorder, "meta": meta, "arrays": []}
+        blobs = []
+        offset = 0
+        for name, (typecode, values) in sorted(arrays.items()):
+            blob = array_bytes(typecode, values)
+            header["arrays"].append([name, typecode, offset, len(blob) // struct.calcsize(typecode)])
+            blobs.append((offset, blob))
+            offset = aligned(offset + len(blob))
+
+        header_bytes = json.dumps(header).encode('utf-8')
+        header_start = len(CACHE_MAGIC) + 4
+        data_start = aligned(header_start + len(header_bytes))
+
+        path = self.__path(key)
+        # the entry is written to a temporary file first, so a concurrent reader never sees a partial entry
+        tmp_path = path + "." + str(os.getpid()) + ".tmp"
+        try:
+            ensure_dir(self.directory)
+            with open(tmp_path, "wb") as f:
+                f.write(CACHE_MAGIC)
+                f.write(struct.pack("<I", len(header_bytes)))
+                f.write(header_bytes)
+                for blob_offset, blob in blobs:
+                    f.write(bytes(data_start + blob_offset - f.tell()))
+                    f.write(blob)
+                entry_size = f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("Failed to write cache entry [" + path + "]: " + str(e))
+            return
+
+        if self.size is None:
+            self.evict()
+        else:
+            # a replaced entry is counted twice; that only makes the next eviction come a bit earlier
+            self.size += entry_size
+            if self.size > self.max_size:
+                self.evict()
+
+    # Removes the least recently used entries until the cache fits in its maximum size.
+    def evict(self):
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".bin"):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum([size for mtime, size, path in entries])
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+        self.size = total_size
+
+
+cache = Cache(cache_dir, cache_size) if cache_dir else None
+
+
+# ================ scanning =========================
+
+# Many series are loaded from the same csv file, e.g. every dstat column is a series. To prevent parsing such a
+# file for every series, a file is tokenized once into all its columns and the scan is shared by all loaders.
+
+# the number of scans that are kept in memory
+SCAN_CACHE_SIZE = 16
+
+
+# A csv file that is tokenized in a single pass. The rows are transposed into string columns, which are converted
+# to float columns on first use. If there is a cache, all columns are converted and cached right away.
+class CsvScan:
+    def __init__(self, path, skip_lines):
+        self.path = path
+        self.row_lengths = []
+        self.ragged = False
+        self.width = 0
+        self.__string_columns = []
+        self.__float_columns = {}
+
+        key = cache.key("csv", path, skip_lines) if cache and is_cacheable(path) else None
+        if key is None:
+            if os.path.exists(path):
+                self.__scan(skip_lines)
+            return
+
+        entry = cache.load(key)
+        if entry:
+            meta, arrays = entry
+            self.ragged = meta["ragged"]
+            self.width = meta["width"]
+            self.row_lengths = arrays["row_lengths"] if self.ragged else [self.width] * meta["rows"]
+            # columns that are not in the entry are not numeric
+            self.__string_columns = [None] * self.width
+            for index in range(self.width):
+                column = arrays.get("column_" + str(index))
+                if column is not None:
+                    self.__float_columns[index] = column
+            return
+
+        self.__scan(skip_lines)
+        arrays = {}
+        for index in range(self.width):
+            try:
+                arrays["column_" + str(index)] = ('d', self.column(index))
+            except ValueError:
+                pass
+        if self.ragged:
+            arrays["row_lengths"] = ('q', self.row_lengths)
+        cache.store(key, {"rows": len(self.row_lengths), "width": self.width, "ragged": self.ragged}, arrays)
+
+    def __scan(self, skip_lines):
+        with open(self.path) as csvfile:
+            csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
+            for x in range(0, skip_lines):
+                next(csvreader, None)
+            rows = list(csvreader)
+
+        self.row_lengths = [len(row) for row in rows]
+        self.width = max(self.row_lengths, default=0)
+        if rows and min(self.row_lengths) != self.width:
+            # a short row, e.g. a partially written last line, is padded with None
+            self.ragged = True
+            self.__string_columns = list(itertools.zip_longest(*rows))
+        else:
+            self.__string_columns = list(zip(*rows))
+
+    def column(self, index):
+        column = self.__float_columns.get(index)
+        if column is None:
+            if index >= self.width:
+                column = to_column([math.nan] * len(self.row_lengths))
+            else:
+                strings = self.__string_columns[index]
+                if strings is None:
+                    raise ValueError("Column " + str(index) + " of [" + self.path + "] is not numeric")
+                if self.ragged:
+                    strings = ["nan" if s is None else s for s in strings]
+                column = to_column(strings)
+                # the strings are not needed anymore
+                self.__string_columns[index] = None
+            self.__float_columns[index] = column
+        return column
+
+    # Returns the given columns of all rows that have these columns. If a skip_value is given, the rows where the
+    # last of the columns has that value are left out as well.
+    def select(self, indices, skip_value=None):
+        columns = [self.column(index) for index in indices]
+        min_length = max(indices) + 1
+        if not self.ragged and skip_value is None:
+            return columns
+
+        if numpy is not None:
+            keep = numpy.ones(len(self.row_lengths), dtype=bool)
+            if self.ragged:
+                keep &= numpy.asarray(self.row_lengths) >= min_length
+            if skip_value is not None:
+                keep &= columns[-1] != skip_value
+            return [column[keep] for column in columns]
+
+        last = columns[-1]
+        keep = [row for row, length in enumerate(self.row_lengths)
+                if length >= min_length and (skip_value is None or last[row] != skip_value)]
+        return [to_column([column[row] for row in keep]) for column in columns]
+
+
+# Returns the scan of a csv file. The scan is shared as long as the file isn't modified.
+def scan_csv(path, skip_lines):
+    if watch_seconds:
+        return tailed_source(TailedCsvScan, path, skip_lines)
+
+    try:
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        version = None
+    return cached_scan_csv(path, skip_lines, version)
+
+
+@functools.lru_cache(maxsize=SCAN_CACHE_SIZE)
+def cached_scan_csv(path, skip_lines, version):
+    return CsvScan(path, skip_lines)
+
+
+# ================ hdr histograms =========================
+
+# The .hdr files written by the workers contain interval histograms in the compressed HdrHistogram V2 encoding.
+# The code below trims, merges and processes these files in-process; it produces the same output as the
+# HistogramTrimmer, HistogramLogMerger, SimulatorHistogramLogProcessor and ReportCsv Java tools.
+
+HDR_V2_ENCODING_COOKIE = 0x1c849303
+HDR_V2_COMPRESSED_ENCODING_COOKIE = 0x1c849304
+HDR_ENCODING_HEADER_SIZE = 40
+# the recorded values are in nanoseconds, the output in microseconds
+HDR_OUTPUT_VALUE_UNIT_RATIO = 1000.0
+HDR_PERCENTILE_TICKS_PER_HALF_DISTANCE = 5
+HDR_INTERVAL_PERCENTILES = [25.0, 50.0, 75.0, 90.0, 99.0, 99.9, 99.99, 99.999]
+# a log timestamp more than a year before the StartTime is relative to the StartTime.
+HDR_RELATIVE_TIMESTAMP_THRESHOLD_SEC = 365 * 24 * 3600.0
+# a ZigZag LEB128 encoded long; at most 8 bytes with the continuation bit set followed by a final byte.
+HDR_LEB128_PATTERN = re.compile(rb"[\x80-\xff]{0,8}[\x00-\x7f]|[\x80-\xff]{8}[\x00-\xff]")
+HDR_ZIGZAG_BYTES = [(byte >> 1) ^ -(byte & 1) for byte in range(128)]
+# the accumulated histogram keeps the sum of the counts of every block of 2^HDR_BLOCK_SHIFT indices.
+HDR_BLOCK_SHIFT = 8
+
+hdr_layouts = {}
+
+
+# Formats a double like java.util.Formatter does for '%.nf'.
+def java_fixed(value, digits):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    return "%.*f" % (digits, value)
+
+
+# Formats a double like java.lang.Double.toString does.
+def java_double(value):
+    if math.isnan(value) or math.isinf(value) or value == 0:
+        return java_fixed(value, 1)
+    if 1e-3 <= abs(value) < 1e7:
+        return repr(value)
+    sign, digits, exponent = Decimal(repr(value)).normalize().as_tuple()
+    digits = "".join(str(digit) for digit in digits)
+    mantissa = digits[0] + "." + (digits[1:] or "0")
+    return ("-" if sign else "") + mantissa + "E" + str(len(digits) - 1 + exponent)
+
+
+# The bucket layout of a histogram. This is a port of the index math of org.HdrHistogram.AbstractHistogram.
+class HdrLayout:
+
+    @staticmethod
+    def of(lowest_discernible_value, highest_trackable_value, significant_digits):
+        key = (lowest_discernible_value, highest_trackable_value, significant_digits)
+        layout = hdr_layouts.get(key)
+        if layout is None:
+            layout = HdrLayout(lowest_discernible_value, highest_trackable_value, significant_digits)
+            hdr_layouts[key] = layout
+        return layout
+
+    def __init__(self, lowest_discernible_value, highest_trackable_value, significant_digits):
+        self.lowest_discernible_value = lowest_discernible_value
+        self.highest_trackable_value = highest_trackable_value
+        self.significant_digits = significant_digits
+
+        largest_value_with_single_unit_resolution = 2 * 10 ** significant_digits
+        self.unit_magnitude = int(math.log(lowest_discernible_value) / math.log(2))
+        sub_bucket_count_magnitude = int(math.ceil(math.log(largest_value_with_single_unit_resolution) / math.log(2)))
+        self.sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self.sub_bucket_count = 1 << (self.sub_bucket_half_count_magnitude + 1)
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+        self.leading_zero_count_base = 64 - self.unit_magnitude - self.sub_bucket_half_count_magnitude - 1
+
+        smallest_untrackable_value = self.sub_bucket_count << self.unit_magnitude
+        self.bucket_count = 1
+        while smallest_untrackable_value <= highest_trackable_value:
+            if smallest_untrackable_value > (2 ** 63 - 1) // 2:
+                self.bucket_count += 1
+                break
+            smallest_untrackable_value <<= 1
+            self.bucket_count += 1
+        self.counts_array_length = (self.bucket_count + 1) * self.sub_bucket_half_count
+
+        self.__highest_values = None
+        self.__median_values = None
+
+    # returns True if the counts of both layouts can be added index by index.
+    def is_compatible(self, other):
+        return self.unit_magnitude == other.unit_magnitude \
+               and self.sub_bucket_half_count_magnitude == other.sub_bucket_half_count_magnitude
+
+    def value_from_index(self, index):
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << (bucket_index + self.unit_magnitude)
+
+    def counts_array_index(self, value):
+        bucket_index = self.__bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        bucket_base_index = (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        return bucket_base_index + sub_bucket_index - self.sub_bucket_half_count
+
+    def __bucket_index(self, value):
+        # 64 - bit_length is Java's Long.numberOfLeadingZeros
+        return self.leading_zero_count_base - (64 - (value | self.sub_bucket_mask).bit_length())
+
+    def size_of_equivalent_value_range(self, value):
+        bucket_index = self.__bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        if sub_bucket_index >= self.sub_bucket_count:
+            bucket_index += 1
+        return 1 << (self.unit_magnitude + bucket_index)
+
+    def lowest_equivalent_value(self, value):
+        bucket_index = self.__bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        return sub_bucket_index << (bucket_index + self.unit_magnitude)
+
+    def highest_equivalent_value(self, value):
+        return self.lowest_equivalent_value(value) + self.size_of_equivalent_value_range(value) - 1
+
+    def median_equivalent_value(self, value):
+        return self.lowest_equivalent_value(value) + (self.size_of_equivalent_value_range(value) >> 1)
+
+    # the highest equivalent value of every index
+    def highest_values(self):
+        if self.__highest_values is None:
+            self.__highest_values = [self.highest_equivalent_value(self.value_from_index(index))
+                                     for index in range(self.counts_array_length)]
+        return self.__highest_values
+
+    # the median equivalent value of every index
+    def median_values(self):
+        if self.__median_values is None:
+            self.__median_values = [self.median_equivalent_value(self.value_from_index(index))
+                                    for index in range(self.counts_array_length)]
+        return self.__median_values
+
+    # the value Histogram.getValueAtPercentile returns once the count at the percentile is found at the index
+    def percentile_value_at_index(self, index, percentile):
+        if percentile == 0.0:
+            return self.lowest_equivalent_value(self.value_from_index(index))
+        return self.highest_values()[index]
+
+
+# The count that needs to be reached for the given percentile; see Histogram.getValueAtPercentile.
+def hdr_count_at_percentile(percentile, total_count):
+    requested_percentile = min(max(math.nextafter(percentile, -math.inf), 0.0), 100.0)
+    return max(int(math.ceil((requested_percentile / 100.0) * total_count)), 1)
+
+
+# A single interval histogram. Only the non zero counts are stored; indices are ordered.
+class HdrHistogram:
+
+    def __init__(self, layout, indices, counts, start_time_stamp, end_time_stamp):
+        self.layout = layout
+        self.indices = indices
+        self.counts = counts
+        self.start_time_stamp = start_time_stamp
+        self.end_time_stamp = end_time_stamp
+        self.total_count = sum(counts)
+        self.__cumulative_counts = None
+
+    # Decodes a histogram from the compressed V2 encoding.
+    @staticmethod
+    def decode(data, start_time_stamp, end_time_stamp):
+        cookie, compressed_length = struct.unpack_from(">ii", data, 0)
+        if cookie & ~0xf0 != HDR_V2_COMPRESSED_ENCODING_COOKIE:
+            raise ValueError("Unsupported compressed histogram encoding cookie 0x%x" % cookie)
+        data = zlib.decompress(data[8:8 + compressed_length])
+
+        cookie, payload_length, normalizing_index_offset, significant_digits, lowest_discernible_value, \
+            highest_trackable_value, conversion_ratio = struct.unpack_from(">iiiiqqd", data, 0)
+        if cookie & ~0xf0 != HDR_V2_ENCODING_COOKIE:
+            raise ValueError("Unsupported histogram encoding cookie 0x%x" % cookie)
+        if normalizing_index_offset != 0:
+            raise ValueError("Shifted histograms (normalizing index offset %d) are not supported"
+                             % normalizing_index_offset)
+
+        layout = HdrLayout.of(lowest_discernible_value, highest_trackable_value, significant_digits)
+
+        # the payload is a sequence of ZigZag LEB128 encoded longs; a negative value is a run of zero counts
+        indices = []
+        counts = []
+        index = 0
+        payload = data[HDR_ENCODING_HEADER_SIZE:HDR_ENCODING_HEADER_SIZE + payload_length]
+        for token in HDR_LEB128_PATTERN.findall(payload):
+            if len(token) == 1:
+                value = HDR_ZIGZAG_BYTES[token[0]]
+            else:
+                value = 0
+                for shift, byte in enumerate(token):
+                    # the 9th byte carries 8 bits
+                    value |= (byte & 0x7f if shift < 8 else byte) << (7 * shift)
+                value = (value >> 1) ^ -(value & 1)
+
+            if value < 0:
+                index -= value
+            else:
+                if value > 0:
+                    indices.append(index)
+                    counts.append(value)
+                index += 1
+
+        return HdrHistogram(layout, indices, counts, start_time_stamp, end_time_stamp)
+
+    # Merges histograms the way Histogram.add does: the counts and the time range are combined. The layout
+    # of the first histogram is used.
+    @staticmethod
+    def merge(histograms):
+        layout = histograms[0].layout
+        merged = {}
+        for histogram in histograms:
+            if histogram.layout.is_compatible(layout):
+                indices = histogram.indices
+            else:
+                indices = [layout.counts_array_index(histogram.layout.value_from_index(index))
+                           for index in histogram.indices]
+            merged_get = merged.get
+            for index, count in zip(indices, histogram.counts):
+                merged[index] = merged_get(index, 0) + count
+
+        indices = sorted(merged)
+        return HdrHistogram(layout, indices, [merged[index] for index in indices],
+                            min(histogram.start_time_stamp for histogram in histograms),
+                            max(histogram.end_time_stamp for histogram in histograms))
+
+    def value_at_percentile(self, percentile):
+        count_at_percentile = hdr_count_at_percentile(percentile, self.total_count)
+        if count_at_percentile > self.total_count:
+            return 0
+        if self.__cumulative_counts is None:
+            self.__cumulative_counts = list(itertools.accumulate(self.counts))
+        position = bisect.bisect_left(self.__cumulative_counts, count_at_percentile)
+        return self.layout.percentile_value_at_index(self.indices[position], percentile)
+
+    def min_value(self):
+        if self.total_count == 0 or self.indices[0] == 0:
+            return 0
+        return self.layout.lowest_equivalent_value(self.layout.value_from_index(self.indices[0]))
+
+    def max_value(self):
+        if self.total_count == 0:
+            return 0
+        return self.layout.highest_values()[self.indices[-1]]
+
+    def mean(self):
+        if self.total_count == 0:
+            return 0.0
+        medians = self.layout.median_values()
+        return sum([medians[index] * float(count) for index, count in zip(self.indices, self.counts)]) \
+               / self.total_count
+
+    def std_deviation(self):
+        if self.total_count == 0:
+            return 0.0
+        mean = self.mean()
+        medians = self.layout.median_values()
+        geometric_deviation_total = sum([(medians[index] - mean) * (medians[index] - mean) * count
+                                         for index, count in zip(self.indices, self.counts)])
+        return math.sqrt(geometric_deviation_total / self.total_count)
+
+
+# The histogram that accumulates all the interval histograms of a log. Since its statistics are needed after
+# every interval, the counts are also summed per block of indices so a percentile can be found without
+# walking over all the counts.
+class HdrAccumulatedHistogram:
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.counts = [0] * layout.counts_array_length
+        self.__block_counts = [0] * ((layout.counts_array_length >> HDR_BLOCK_SHIFT) + 1)
+        self.__cumulative_block_counts = None
+        self.total_count = 0
+        self.start_time_stamp = 2 ** 63 - 1
+        self.end_time_stamp = 0
+        self.__min_index = None
+        self.__max_index = None
+        # exact sums of median*count and median^2*count for the mean and the standard deviation
+        self.__value_total = 0
+        self.__square_total = 0
+
+    def add(self, histogram):
+        indices = histogram.indices
+        if not histogram.layout.is_compatible(self.layout):
+            indices = [self.layout.counts_array_index(histogram.layout.value_from_index(index))
+                       for index in indices]
+        if indices and indices[-1] >= len(self.counts):
+            self.__resize(histogram.max_value())
+
+        counts = self.counts
+        block_counts = self.__block_counts
+        for index, count in zip(indices, histogram.counts):
+            counts[index] += count
+            block_counts[index >> HDR_BLOCK_SHIFT] += count
+        self.__cumulative_block_counts = None
+
+        medians = self.layout.median_values()
+        values = [medians[index] * count for index, count in zip(indices, histogram.counts)]
+        self.__value_total += sum(values)
+        self.__square_total += sum([value * medians[index] for index, value in zip(indices, values)])
+
+        if indices:
+            if self.__min_index is None or indices[0] < self.__min_index:
+                self.__min_index = indices[0]
+            if self.__max_index is None or indices[-1] > self.__max_index:
+                self.__max_index = indices[-1]
+        self.total_count += histogram.total_count
+        self.start_time_stamp = min(self.start_time_stamp, histogram.start_time_stamp)
+        self.end_time_stamp = max(self.end_time_stamp, histogram.end_time_stamp)
+
+    # grows the histogram so it can track the value, like an auto resizing Histogram does.
+    def __resize(self, highest_trackable_value):
+        self.layout = HdrLayout.of(self.layout.lowest_discernible_value,
+                                   max(highest_trackable_value, self.layout.highest_trackable_value),
+                                   self.layout.significant_digits)
+        self.counts.extend([0] * (self.layout.counts_array_length - len(self.counts)))
+        self.__block_counts = [0] * ((len(self.counts) >> HDR_BLOCK_SHIFT) + 1)
+        for index, count in enumerate(self.counts):
+            self.__block_counts[index >> HDR_BLOCK_SHIFT] += count
+        self.__cumulative_block_counts = None
+
+    # finds the first index where the cumulative count reaches the given count
+    def __find_index(self, count):
+        if self.__cumulative_block_counts is None:
+            self.__cumulative_block_counts = list(itertools.accumulate(self.__block_counts))
+        block = bisect.bisect_left(self.__cumulative_block_counts, count)
+        start = block << HDR_BLOCK_SHIFT
+        cumulative_counts = list(itertools.accumulate(
+            self.counts[start:start + (1 << HDR_BLOCK_SHIFT)],
+            initial=self.__cumulative_block_counts[block - 1] if block > 0 else 0))
+        return start + bisect.bisect_left(cumulative_counts, count, 1) - 1
+
+    def value_at_percentile(self, percentile):
+        count_at_percentile = hdr_count_at_percentile(percentile, self.total_count)
+        if count_at_percentile > self.total_count:
+            return 0
+        return self.layout.percentile_value_at_index(self.__find_index(count_at_percentile), percentile)
+
+    def min_value(self):
+        if self.total_count == 0 or self.__min_index == 0:
+            return 0
+        return self.layout.lowest_equivalent_value(self.layout.value_from_index(self.__min_index))
+
+    def max_value(self):
+        if self.total_count == 0:
+            return 0
+        return self.layout.highest_values()[self.__max_index]
+
+    def mean(self):
+        if self.total_count == 0:
+            return 0.0
+        return self.__value_total / self.total_count
+
+    def std_deviation(self):
+        if self.total_count == 0:
+            return 0.0
+        variance = Fraction(self.__square_total * self.total_count - self.__value_total ** 2,
+                            self.total_count ** 2)
+        return math.sqrt(variance)
+
+    # Yields the (value, percentile level, total count) steps of the PercentileIterator used by
+    # Histogram.outputPercentileDistribution.
+    def percentile_steps(self):
+        total_count = self.total_count
+        if total_count == 0:
+            return
+
+        counts = self.counts
+        highest_values = self.layout.highest_values()
+        percentile_level = 0.0
+        total_to_index = 0
+        index = 0
+        fresh = True
+        while total_to_index < total_count:
+            while True:
+                count = counts[index]
+                if fresh:
+                    total_to_index += count
+                    fresh = False
+                if count != 0 and (100.0 * total_to_index) / total_count >= percentile_level:
+                    break
+                index += 1
+                fresh = True
+
+            yield highest_values[index], percentile_level, total_to_index
+
+            if percentile_level >= 100.0:
+                return
+            reporting_ticks = HDR_PERCENTILE_TICKS_PER_HALF_DISTANCE \
+                              * 2 ** (int(math.log(100.0 / (100.0 - percentile_level)) / math.log(2)) + 1)
+            percentile_level += 100.0 / reporting_ticks
+
+        # one additional last step to 100%
+        yield highest_values[index], 100.0, total_to_index
+
+
+# Writing a histogram to an interval log and reading it back truncates its timestamps. The Java tools pass the
+# histograms to each other through files, so this is mimicked to get the same timestamps. Returns the
+# start time in seconds as it is written in the log.
+def hdr_log_round_trip(histogram):
+    start_time_sec = float("%.3f" % (histogram.start_time_stamp / 1000.0))
+    length_sec = float("%.3f" % (histogram.end_time_stamp / 1000.0 - histogram.start_time_stamp / 1000.0))
+    histogram.start_time_stamp = int(start_time_sec * 1000.0)
+    histogram.end_time_stamp = int((start_time_sec + length_sec) * 1000.0)
+    return start_time_sec
+
+
+# Reads the interval histograms from a histogram log; a port of org.HdrHistogram.HistogramLogReader. The lines
+# are fed one by one, so a log can be read while it is being written.
+class HdrLogReader:
+    def __init__(self, path):
+        self.path = path
+        self.start_time_sec = None
+        self.base_time_sec = None
+        self.line_number = 0
+
+    # Returns the histogram of a line, or None if the line doesn't contain a histogram.
+    def read_line(self, line):
+        self.line_number += 1
+        line = line.strip()
+        if not line:
+            return None
+
+        if line.startswith("#"):
+            tokens = re.split("[ ,]+", line)
+            if len(tokens) > 1 and tokens[0] in ("#[StartTime:", "#[BaseTime:"):
+                try:
+                    seconds = float(tokens[1])
+                except ValueError:
+                    return None
+                if tokens[0] == "#[StartTime:":
+                    self.start_time_sec = seconds
+                else:
+                    self.base_time_sec = seconds
+            return None
+
+        if line.startswith('"StartTimestamp"'):
+            # legend
+            return None
+
+        try:
+            fields = line.split(",")
+            if fields[0].startswith("Tag="):
+                # tagged histograms are not written by the simulator; the tag is ignored like the
+                # HistogramTrimmer does.
+                fields = fields[1:]
+            log_time_stamp_sec = float(fields[0])
+            interval_length_sec = float(fields[1])
+
+            if self.start_time_sec is None:
+                self.start_time_sec = log_time_stamp_sec
+            if self.base_time_sec is None:
+                if log_time_stamp_sec < self.start_time_sec - HDR_RELATIVE_TIMESTAMP_THRESHOLD_SEC:
+                    self.base_time_sec = self.start_time_sec
+                else:
+                    self.base_time_sec = 0.0
+
+            absolute_start_time_sec = log_time_stamp_sec + self.base_time_sec
+            absolute_end_time_sec = absolute_start_time_sec + interval_length_sec
+            return HdrHistogram.decode(base64.b64decode(fields[3]),
+                                       int(absolute_start_time_sec * 1000.0),
+                                       int(absolute_end_time_sec * 1000.0))
+        except (IndexError, ValueError, zlib.error, struct.error) as e:
+            raise ValueError("Log file [" + self.path + "] parsing error at line number " + str(self.line_number)
+                             + ": line appears to be malformed (" + str(e) + ")")
+
+
+def read_hdr_log(path):
+    reader = HdrLogReader(path)
+    with open(path) as f:
+        for line in f:
+            histogram = reader.read_line(line)
+            if histogram is not None:
+                yield histogram
+
+
+# Reads the interval histograms of a .hdr log file like read_hdr_log. If there is a cache, the decoded histograms
+# are cached; the counts of all intervals are stored back to back and are read from the memory mapped entry.
+def load_hdr_log(path):
+    key = cache.key("hdr", path) if cache else None
+    if key is None:
+        return read_hdr_log(path)
+
+    entry = cache.load(key)
+    if entry is None:
+        starts = array('q')
+        ends = array('q')
+        layouts = array('q')
+        offsets = array('q', [0])
+        indices = array('q')
+        counts = array('q')
+        for histogram in read_hdr_log(path):
+            starts.append(histogram.start_time_stamp)
+            ends.append(histogram.end_time_stamp)
+            layouts.extend([histogram.layout.lowest_discernible_value, histogram.layout.highest_trackable_value,
+                            histogram.layout.significant_digits])
+            indices.extend(histogram.indices)
+            counts.extend(histogram.counts)
+            offsets.append(len(indices))
+        cache.store(key, {"intervals": len(starts)},
+                    {"starts": ('q', starts), "ends": ('q', ends), "layouts": ('q', layouts),
+                     "offsets": ('q', offsets), "indices": ('q', indices), "counts": ('q', counts)})
+        entry = cache.load(key)
+        if entry is None:
+            return read_hdr_log(path)
+
+    return cached_hdr_log(*entry)
+
+
+def cached_hdr_log(meta, arrays):
+    starts = arrays["starts"].tolist()
+    ends = arrays["ends"].tolist()
+    layouts = arrays["layouts"].tolist()
+    offsets = arrays["offsets"].tolist()
+    indices = arrays["indices"]
+    counts = arrays["counts"]
+    for interval in range(meta["intervals"]):
+        layout = HdrLayout.of(*layouts[3 * interval:3 * interval + 3])
+        low = offsets[interval]
+        high = offsets[interval + 1]
+        yield HdrHistogram(layout, indices[low:high].tolist(), counts[low:high].tolist(),
+                           starts[interval], ends[interval])
+
+
+# Writes the interval percentile csv and the overall percentile distribution (.hgrm) for a log of interval
+# histograms, like the SimulatorHistogramLogProcessor does with '-outputValueUnitRatio 1000'. The csv is
+# written to 'path', the distribution to 'path.hgrm'.
+class HdrLogProcessor:
+    csv_legend = '"Timestamp","StartTime","Int_Count","Int_25%","Int_50%","Int_75%","Int_90%","Int_99%",' \
+                 '"Int_99.9%","Int_99.99%","Int_99.999%","Int_Min","Int_Max","Int_Mean","Int_Std_Deviation",' \
+                 '"Int_Throughput","Total_Count","Total_25%","Total_50%","Total_75%","Total_90%","Total_99%",' \
+                 '"Total_99.9%","Total_99.99%","Total_99.999%","Total_Min%","Total_Max","Total_Mean",' \
+                 '"Total_Std_Deviation","Total_Throughput",'
+
+    def __init__(self, path):
+        self.path = path
+        self.start_time_sec = None
+        self.accumulated = None
+        self.second_row = None
+        self.last_row = None
+        self.csv_file = open(path, "w")
+        self.csv_file.write(self.__time_range("Interval percentile log"))
+
+    @staticmethod
+    def __time_range(title):
+        return "#[" + title + " between 0.000 and <Infinite> seconds (relative to StartTime)]\n"
+
+    @staticmethod
+    def __start_time(start_time_sec):
+        date = time.strftime("%a %b %d %H:%M:%S %Z %Y", time.localtime(int(start_time_sec * 1000) / 1000.0))
+        return "#[StartTime: %.3f (seconds since epoch), %s]\n" % (start_time_sec, date)
+
+    # start_time_sec is the start time of the log; the start time of its first histogram.
+    def process(self, histogram, start_time_sec):
+        if self.accumulated is None:
+            self.accumulated = HdrAccumulatedHistogram(histogram.layout)
+            self.start_time_sec = start_time_sec
+            self.csv_file.write(self.__start_time(start_time_sec))
+            self.csv_file.write(self.csv_legend + "\n")
+        accumulated = self.accumulated
+        accumulated.add(histogram)
+
+        interval = [histogram.value_at_percentile(percentile) / HDR_OUTPUT_VALUE_UNIT_RATIO
+                    for percentile in HDR_INTERVAL_PERCENTILES]
+        interval.append(histogram.min_value() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        interval.append(histogram.max_value() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        interval.append(histogram.mean() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        interval.append(histogram.std_deviation() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        total = [accumulated.value_at_percentile(percentile) / HDR_OUTPUT_VALUE_UNIT_RATIO
+                 for percentile in HDR_INTERVAL_PERCENTILES]
+        total.append(accumulated.min_value() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        total.append(accumulated.max_value() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+        total.append(accumulated.mean() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+
+        interval_throughput = self.__throughput(histogram)
+        total_throughput = self.__throughput(accumulated)
+
+        row = [java_fixed(histogram.end_time_stamp / 1000.0 - self.start_time_sec, 3),
+               java_fixed(histogram.end_time_stamp / 1000.0, 3),
+               str(histogram.total_count)]
+        row.extend("%.3f" % value for value in interval)
+        row.append(java_fixed(interval_throughput / HDR_OUTPUT_VALUE_UNIT_RATIO, 3))
+        row.append(str(accumulated.total_count))
+        row.extend("%.3f" % value for value in total)
+        # the Java format string lacks the comma between the total std deviation and the total throughput
+        row.append("%.3f" % (accumulated.std_deviation() / HDR_OUTPUT_VALUE_UNIT_RATIO)
+                   + java_fixed(total_throughput / HDR_OUTPUT_VALUE_UNIT_RATIO, 3))
+
+        if self.last_row is not None and self.second_row is None:
+            self.second_row = row
+        self.last_row = row
+        self.csv_file.write(",".join(row) + "\n")
+
+    @staticmethod
+    def __throughput(histogram):
+        duration = histogram.end_time_stamp - histogram.start_time_stamp
+        if duration == 0:
+            return math.nan if histogram.total_count == 0 else math.inf
+        return float(histogram.total_count) / duration
+
+    # Completes the csv and writes the .hgrm file. Returns the lines of the .hgrm file.
+    def close(self):
+        self.csv_file.close()
+        return self.write_distribution()
+
+    # Writes the .hgrm file with the distribution of all histograms processed so far. Returns its lines.
+    def write_distribution(self):
+        accumulated = self.accumulated
+        if accumulated is None:
+            # no histograms; the distribution of an empty histogram is written
+            accumulated = HdrAccumulatedHistogram(HdrLayout.of(1, 1000000, 2))
+        digits = accumulated.layout.significant_digits
+
+        lines = [self.__time_range("Overall percentile distribution")]
+        if self.start_time_sec is not None:
+            lines.append(self.__start_time(self.start_time_sec))
+        lines.append("%12s %14s %10s %14s\n\n" % ("Value", "Percentile", "TotalCount", "1/(1-Percentile)"))
+        for value, percentile_level, total_count in accumulated.percentile_steps():
+            value = value / HDR_OUTPUT_VALUE_UNIT_RATIO
+            percentile = percentile_level / 100.0
+            if percentile_level != 100.0:
+                lines.append("%12.*f %2.12f %10d %14.2f\n" % (digits, value, percentile, total_count,
+                                                              1 / (1.0 - percentile)))
+            else:
+                lines.append("%12.*f %2.12f %10d\n" % (digits, value, percentile, total_count))
+        lines.append("#[Mean    = %12.*f, StdDeviation   = %12.*f]\n" % (
+            digits, accumulated.mean() / HDR_OUTPUT_VALUE_UNIT_RATIO,
+            digits, accumulated.std_deviation() / HDR_OUTPUT_VALUE_UNIT_RATIO))
+        lines.append("#[Max     = %12.*f, Total count    = %12d]\n" % (
+            digits, accumulated.max_value() / HDR_OUTPUT_VALUE_UNIT_RATIO, accumulated.total_count))
+        lines.append("#[Buckets = %12d, SubBuckets     = %12d]\n" % (
+            accumulated.layout.bucket_count, accumulated.layout.sub_bucket_count))
+
+        with open(self.path + ".hgrm", "w") as f:
+            f.writelines(lines)
+        return "".join(lines).split("\n")
+
+    # Returns the row for the report.csv, like the ReportCsv does, or None if there is not enough data.
+    def report_row(self, session_name, hgrm_lines):
+        if self.second_row is None:
+            return None
+
+        row = [session_name, os.path.basename(self.path)]
+
+        important_percentiles = ["0.1", "0.2", "0.5", "0.75", "0.90", "0.95", "0.99", "0.999", "0.9999", "1.00"]
+        # the data lines of the hgrm file; skipping the 4 header and 3 footer lines
+        for line in hgrm_lines[4:len(hgrm_lines) - 4]:
+            tokens = line.split()
+            if tokens[1].startswith(important_percentiles[0]):
+                row.append(tokens[0])
+                important_percentiles.pop(0)
+                if not important_percentiles:
+                    break
+
+        # the ReportCsv takes the start from the second row of the csv.
+        start_millis = int(math.floor(float(self.second_row[1]) * 1000 + 0.5))
+        end_millis = int(math.floor(float(self.last_row[1]) * 1000 + 0.5))
+        operations = int(self.last_row[16])
+        duration_millis = end_millis - start_millis
+        row.append(str(operations))
+        row.append(str(duration_millis))
+        if duration_millis == 0:
+            row.append(java_double(math.nan if operations == 0 else math.inf))
+        else:
+            row.append(java_double(operations * 1000.0 / duration_millis))
+        return row
+
+
+report_csv_header = '"session","benchmark","10%(us)","20%(us)","50%(us)","75%(us)","90%(us)","95%(us)",' \
+                    '"99%(us)","99.9%(us)","99.99%(us)","max(us)","operations","duration(ms)","throughput"\n'
+
+
+# Appends a row to the report.csv; the header is written when the file is created.
+def append_report_csv(row):
+    report_csv = os.path.join(report_dir, "report.csv")
+    if not os.path.exists(report_csv):
+        with open(report_csv, "w") as f:
+            f.write(report_csv_header)
+    with open(report_csv, "a") as f:
+        f.write(",".join(row) + "\n")
+
+
+# Processes the .hdr files of a single probe. The histograms of every worker are trimmed to the period and
+# processed into the worker output directory. The trimmed histograms are merged by interval index and the
+# result is processed into 'merged_path'. Returns the report.csv row of the merged histograms, or None if
+# there are not enough intervals. If there is a cache, the output files and the row are cached for the trim
+# window, so a report made again with the same warmup and cooldown only copies the files from the cache.
+def process_hdr_probe(session_name, hdr_files, worker_output_paths, merged_path, start_millis, end_millis):
+    # the dates in the output files are in the local time zone
+    key = cache.files_key("hdr-probe", hdr_files, session_name, os.path.basename(merged_path),
+                          start_millis, end_millis, time.tzname) if cache else None
+    output_paths = []
+    for path in worker_output_paths + [merged_path]:
+        output_paths.extend([path, path + ".hgrm"])
+
+    entry = cache.load(key) if key else None
+    if entry is not None:
+        meta, arrays = entry
+        for k, path in enumerate(output_paths):
+            with open(path, "wb") as f:
+                f.write(arrays[str(k)])
+        return meta["row"]
+
+    row = process_hdr_files(session_name, hdr_files, worker_output_paths, merged_path, start_millis, end_millis)
+    if key:
+        files = {}
+        for k, path in enumerate(output_paths):
+            with open(path, "rb") as f:
+                files[str(k)] = ('B', memoryview(f.read()))
+        cache.store(key, {"row": row}, files)
+    return row
+
+
+def process_hdr_files(session_name, hdr_files, worker_output_paths, merged_path, start_millis, end_millis):
+    def trimmed(path):
+        for histogram in load_hdr_log(path):
+            if histogram.start_time_stamp >= start_millis and histogram.end_time_stamp <= end_millis:
+                yield histogram
+
+    readers = [trimmed(path) for path in hdr_files]
+    worker_processors = [HdrLogProcessor(path) for path in worker_output_paths]
+    worker_start_times = [None] * len(hdr_files)
+    merged_processor = HdrLogProcessor(merged_path)
+    merged_start_time = None
+
+    while True:
+        histograms = []
+        for k, reader in enumerate(readers):
+            histogram = next(reader, None)
+            if histogram is None:
+                continue
+            start_time_sec = hdr_log_round_trip(histogram)
+            if worker_start_times[k] is None:
+                worker_start_times[k] = start_time_sec
+            worker_processors[k].process(histogram, worker_start_times[k])
+            histograms.append(histogram)
+
+        if not histograms:
+            break
+
+        merged = HdrHistogram.merge(histograms)
+        start_time_sec = hdr_log_round_trip(merged)
+        if merged_start_time is None:
+            merged_start_time = start_time_sec
+        merged_processor.process(merged, merged_start_time)
+
+    for processor in worker_processors:
+        processor.close()
+    return merged_processor.report_row(session_name, merged_processor.close())
+
+
+# ================ gc logs =========================
+
+# The gc.log files of the workers are parsed in-process. Both the JDK 8 format (-XX:+PrintGCDetails with time and
+# date stamps) and the unified JVM logging format of JDK 9+ (-Xlog:gc*) are supported. The log is streamed line by
+# line; only the event that is being parsed is kept, and every stop-the-world pause becomes a row of the columns
+# below. The derived columns (collected, allocated and promoted bytes and their rates) are computed like the CSV_FULL
+# export of gcviewer does, but the sizes are in bytes instead of KB * 1000. A missing value is NaN.
+
+GC_LOG_COLUMNS = ["time", "uptime", "pause_time",
+                  "young_size_before_gc", "young_size_after_gc", "young_size_max",
+                  "young_collected", "young_collected_rate", "young_allocated", "allocation_rate",
+                  "heap_size_before_gc", "heap_size_after_gc", "heap_size_max",
+                  "heap_collected", "heap_collected_rate", "promotion", "promotion_rate",
+                  "old_size_before_gc", "old_size_after_gc", "old_total",
+                  "meta_size_before_gc", "meta_size_after_gc", "meta_total"]
+
+GC_SIZE_UNITS = {"B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+GC_SIZE = r"([\d.]+)([BKMG])"
+GC_YOUNG_GENERATIONS = ("PSYoungGen", "ParNew", "DefNew", "ASParNew")
+GC_OLD_GENERATIONS = ("PSOldGen", "ParOldGen", "Tenured", "CMS", "Old")
+GC_META_GENERATIONS = ("PSPermGen", "Perm", "CMS Perm", "Metaspace")
+
+# a JDK 8 log statement starts with an optional date stamp and the uptime, e.g. '2021-05-31T23:19:14.123+0000: 1.234: '
+GC_JDK8_PREFIX_PATTERN = re.compile(r"^(?:(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d+[+-]\d{4}): )?(\d+\.\d+): ")
+GC_JDK8_EVENT_PATTERN = re.compile(r"\[(?:GC|Full GC)\b")
+# e.g. '[PSYoungGen: 65536K->10720K(76288K)]' or '[CMS: 100K->50K(200K), 0.1 secs]'
+GC_JDK8_GENERATION_PATTERN = re.compile(
+    r"\[(" + "|".join(GC_YOUNG_GENERATIONS + GC_OLD_GENERATIONS + GC_META_GENERATIONS) + r")\s*: "
+    + GC_SIZE + "->" + GC_SIZE + r"\(" + GC_SIZE + r"\)(?:, [\d.]+ secs)?\]")
+# the heap of an event, e.g. '65536K->10728K(251392K)' or '10728K(253440K)' for a CMS initial mark
+GC_JDK8_HEAP_PATTERN = re.compile(r"(?:" + GC_SIZE + "->)?" + GC_SIZE + r"\(" + GC_SIZE + r"\)")
+GC_JDK8_PAUSE_PATTERN = re.compile(r", ([\d.]+) secs\]")
+# e.g. '[Eden: 24.0M(24.0M)->0.0B(13.0M) Survivors: 0.0B->3072.0K Heap: 24.0M(256.0M)->4016.0K(256.0M)]'
+GC_JDK8_G1_DETAILS_PATTERN = re.compile(
+    r"\[Eden: " + GC_SIZE + r"\(" + GC_SIZE + r"\)->" + GC_SIZE + r"\(" + GC_SIZE + r"\) Survivors: "
+    + GC_SIZE + "->" + GC_SIZE + " Heap: " + GC_SIZE + r"\(" + GC_SIZE + r"\)->" + GC_SIZE + r"\(" + GC_SIZE + r"\)")
+
+# a unified log statement starts with the decorations, e.g. '[2021-05-31T23:19:14.123+0000][1.234s][info][gc]'
+GC_UNIFIED_PATTERN = re.compile(r"^((?:\[[^\]]*\])+)\s*(.*)$")
+GC_UNIFIED_DECORATION_PATTERN = re.compile(r"\[([^\]]*)\]")
+GC_UNIFIED_PAUSE_PATTERN = re.compile(
+    r"^GC\((\d+)\) Pause .*?(?: " + GC_SIZE + "->" + GC_SIZE + r"\(" + GC_SIZE + r"\))? ([\d.]+)ms$")
+GC_UNIFIED_REGIONS_PATTERN = re.compile(r"^GC\((\d+)\) (Eden|Survivor|Old|Humongous) regions: (\d+)->(\d+)(?:\((\d+)\))?")
+# e.g. 'GC(0) PSYoungGen: 65536K->10720K(76288K)' or 'GC(0) Metaspace: 3344K(3520K)->3344K(3520K) NonClass: ...'
+GC_UNIFIED_GENERATION_PATTERN = re.compile(
+    r"^GC\((\d+)\) (" + "|".join(GC_YOUNG_GENERATIONS + GC_OLD_GENERATIONS + GC_META_GENERATIONS) + "): "
+    + GC_SIZE + r"(?:\(" + GC_SIZE + r"\))?->" + GC_SIZE + r"\(" + GC_SIZE + r"\)")
+GC_UNIFIED_REGION_SIZE_PATTERN = re.compile(r"Heap [Rr]egion [Ss]ize: " + GC_SIZE)
+
+
+def gc_size(value, unit):
+    return int(float(value) * GC_SIZE_UNITS[unit])
+
+
+# Returns the epoch seconds of a date stamp like '2021-05-31T23:19:14.123+0000'.
+def gc_date_stamp_seconds(date_stamp):
+    return datetime.datetime.strptime(date_stamp, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+
+
+# A streaming gc.log parser. The lines are fed one by one and a row is added to the columns for every pause.
+class GcLogParser:
+    def __init__(self):
+        self.columns = {name: array('d') for name in GC_LOG_COLUMNS}
+        self.has_date_stamps = False
+        self.last_uptime = 0.0
+        self.__last_young_after = 0
+        self.__region_size = None
+        # the JDK 8 event that is being parsed; its text is complete when the next statement starts
+        self.__event = None
+        # the generation sizes of the unified gc event with the given id, which are logged before the pause itself
+        self.__generations_gc_id = None
+        self.__generations = {}
+
+    def parse_line(self, line):
+        line = line.rstrip()
+        if not line:
+            return
+
+        if line.startswith("["):
+            match = GC_UNIFIED_PATTERN.match(line)
+            if match and not GC_JDK8_EVENT_PATTERN.match(line):
+                self.__parse_unified(match.group(1), match.group(2))
+                return
+
+        match = GC_JDK8_PREFIX_PATTERN.match(line)
+        if match:
+            rest = line[match.end():]
+            if GC_JDK8_EVENT_PATTERN.match(rest) and "concurrent" not in rest[:20]:
+                self.__complete_event()
+                self.__event = [match.group(1), float(match.group(2)), rest, None]
+            # other statements, e.g. safepoint statistics, are not part of an event
+            return
+
+        if self.__event is not None:
+            details = GC_JDK8_G1_DETAILS_PATTERN.search(line)
+            if details:
+                self.__event[3] = line
+                self.__complete_event()
+            else:
+                self.__event[2] += " " + line.strip()
+
+    # Completes the last event; must be called when the whole log has been parsed.
+    def close(self):
+        self.__complete_event()
+
+    def __complete_event(self):
+        if self.__event is None:
+            return
+        date_stamp, uptime, text, g1_details = self.__event
+        self.__event = None
+
+        pauses = GC_JDK8_PAUSE_PATTERN.findall(text)
+        if not pauses:
+            return
+
+        generations = {}
+        for name, pre, pre_unit, post, post_unit, total, total_unit in GC_JDK8_GENERATION_PATTERN.findall(
+                text + ("" if g1_details is None else g1_details)):
+            generations[name] = (gc_size(pre, pre_unit), gc_size(post, post_unit), gc_size(total, total_unit))
+
+        heap = None
+        young = None
+        if g1_details is not None:
+            sizes = GC_JDK8_G1_DETAILS_PATTERN.search(g1_details).groups()
+            sizes = [gc_size(sizes[k], sizes[k + 1]) for k in range(0, len(sizes), 2)]
+            eden_before, eden_total_before, eden_after, eden_total_after, survivors_before, survivors_after, \
+                heap_before, heap_total_before, heap_after, heap_total_after = sizes
+            heap = (heap_before, heap_after, heap_total_after)
+            young = (eden_before + survivors_before, eden_after + survivors_after, eden_total_after + survivors_after)
+        else:
+            heaps = GC_JDK8_HEAP_PATTERN.findall(GC_JDK8_GENERATION_PATTERN.sub("", text))
+            if heaps:
+                pre, pre_unit, post, post_unit, total, total_unit = heaps[-1]
+                post = gc_size(post, post_unit)
+                heap = (gc_size(pre, pre_unit) if pre else post, post, gc_size(total, total_unit))
+
+        if young is None:
+            young = self.__generation(generations, GC_YOUNG_GENERATIONS)
+        epoch = None if date_stamp is None else gc_date_stamp_seconds(date_stamp)
+        self.__add(epoch, uptime, float(pauses[-1]), heap, young,
+                   self.__generation(generations, GC_OLD_GENERATIONS),
+                   self.__generation(generations, GC_META_GENERATIONS))
+
+    @staticmethod
+    def __generation(generations, names):
+        for name in names:
+            sizes = generations.get(name)
+            if sizes is not None:
+                return sizes
+        return None
+
+    def __parse_unified(self, decorations, message):
+        match = GC_UNIFIED_REGION_SIZE_PATTERN.search(message)
+        if match:
+            self.__region_size = gc_size(*match.groups())
+            return
+
+        if not message.startswith("GC("):
+            return
+
+        match = GC_UNIFIED_REGIONS_PATTERN.match(message)
+        if match:
+            # region based collectors like G1 log the number of regions; the old regions have no target
+            gc_id, name, before, after, target = match.groups()
+            if self.__region_size is not None:
+                self.__set_generation(gc_id, name, (int(before) * self.__region_size, int(after) * self.__region_size,
+                                                    None if target is None else int(target) * self.__region_size))
+            return
+
+        match = GC_UNIFIED_GENERATION_PATTERN.match(message)
+        if match:
+            gc_id, name, pre, pre_unit, _, _, post, post_unit, total, total_unit = match.groups()
+            self.__set_generation(gc_id, name,
+                                  (gc_size(pre, pre_unit), gc_size(post, post_unit), gc_size(total, total_unit)))
+            return
+
+        match = GC_UNIFIED_PAUSE_PATTERN.match(message)
+        if not match:
+            return
+
+        gc_id, pre, pre_unit, post, post_unit, total, total_unit, pause_millis = match.groups()
+        generations = self.__generations if gc_id == self.__generations_gc_id else {}
+        self.__generations_gc_id = None
+        self.__generations = {}
+
+        epoch = None
+        uptime = None
+        for decoration in GC_UNIFIED_DECORATION_PATTERN.findall(decorations):
+            if decoration[:1].isdigit():
+                if "T" in decoration:
+                    epoch = gc_date_stamp_seconds(decoration)
+                elif decoration.endswith("ms"):
+                    value = int(decoration[:-2])
+                    # the time in millis since the epoch or the uptime in millis
+                    if value > 100000000000:
+                        epoch = value / 1000.0
+                    else:
+                        uptime = value / 1000.0
+                elif decoration.endswith("ns"):
+                    uptime = int(decoration[:-2]) / 1e9
+                elif decoration.endswith("s"):
+                    uptime = float(decoration[:-1])
+        if uptime is None:
+            # without an uptime decoration, the time between the pauses is taken from the wall clock
+            uptime = self.last_uptime if epoch is None else epoch
+
+        heap = None
+        if pre is not None:
+            heap = (gc_size(pre, pre_unit), gc_size(post, post_unit), gc_size(total, total_unit))
+
+        young = self.__generation(generations, GC_YOUNG_GENERATIONS)
+        if young is None and "Eden" in generations:
+            eden = generations["Eden"]
+            survivor = generations.get("Survivor", (0, 0, 0))
+            young = (eden[0] + survivor[0], eden[1] + survivor[1], eden[2] + survivor[1])
+
+        old = self.__generation(generations, GC_OLD_GENERATIONS)
+        if old is not None and old[2] is None:
+            # the old regions take the part of the heap that isn't young
+            old = (old[0], old[1], old[1] if heap is None or young is None else heap[2] - young[2])
+
+        self.__add(epoch, uptime, float(pause_millis) / 1000.0, heap, young, old,
+                   self.__generation(generations, GC_META_GENERATIONS))
+
+    # Sets the sizes of a generation of a unified gc event. The sizes of an earlier event that has no pause, e.g. a
+    # concurrent cycle, are dropped when the next event starts.
+    def __set_generation(self, gc_id, name, sizes):
+        if gc_id != self.__generations_gc_id:
+            self.__generations_gc_id = gc_id
+            self.__generations = {}
+        self.__generations[name] = sizes
+
+    # Adds the row of a pause. The sizes of the heap and the generations are tuples with the size before and after
+    # the gc and the total size; they are None when not known.
+    def __add(self, epoch, uptime, pause, heap, young, old, meta):
+        nan = math.nan
+        if epoch is not None:
+            self.has_date_stamps = True
+
+        # like gcviewer, a missing young or old generation is derived from the heap and the other generation
+        if heap is not None:
+            if young is None and old is not None:
+                young = (heap[0] - old[0], heap[1] - old[1], heap[2] - old[2])
+            elif old is None and young is not None:
+                old = (heap[0] - young[0], heap[1] - young[1], heap[2] - young[2])
+
+        duration = uptime - self.last_uptime
+
+        def rate(size):
+            return size / duration if duration > 0 and not math.isnan(size) else nan
+
+        row = dict.fromkeys(GC_LOG_COLUMNS, nan)
+        row["time"] = nan if epoch is None else epoch
+        row["uptime"] = uptime
+        row["pause_time"] = pause
+
+        young_collected = nan
+        if young is not None:
+            if young[2] > 0:
+                young_collected = young[0] - young[1]
+                row["young_size_before_gc"], row["young_size_after_gc"], row["young_size_max"] = young
+                row["young_collected"] = young_collected
+                row["young_collected_rate"] = rate(young_collected)
+            row["young_allocated"] = young[0] - self.__last_young_after
+            row["allocation_rate"] = rate(row["young_allocated"])
+
+        if heap is not None:
+            heap_collected = heap[0] - heap[1]
+            row["heap_size_before_gc"], row["heap_size_after_gc"], row["heap_size_max"] = heap
+            row["heap_collected"] = heap_collected
+            row["heap_collected_rate"] = rate(heap_collected)
+            if young is not None and young[1] != 0:
+                row["promotion"] = young_collected - heap_collected
+                row["promotion_rate"] = rate(row["promotion"])
+
+        if old is not None and old[2] != 0:
+            row["old_size_before_gc"], row["old_size_after_gc"], row["old_total"] = old
+        if meta is not None:
+            row["meta_size_before_gc"], row["meta_size_after_gc"], row["meta_total"] = meta
+
+        for name in GC_LOG_COLUMNS:
+            self.columns[name].append(row[name])
+
+        if young is not None:
+            self.__last_young_after = young[1]
+        self.last_uptime = uptime
+
+
+# The parsed columns of a gc.log file.
+class GcLog:
+    def __init__(self, path):
+        self.path = path
+        self.columns = {}
+
+        key = cache.key("gc", path) if cache else None
+        entry = cache.load(key) if key else None
+        if entry:
+            meta, arrays = entry
+            self.columns = arrays
+            return
+
+        gc_log_parser = GcLogParser()
+        with open(path, errors='replace') as f:
+            for line in f:
+                gc_log_parser.parse_line(line)
+        gc_log_parser.close()
+
+        times = gc_log_parser.columns["time"]
+        if not gc_log_parser.has_date_stamps:
+            # without date stamps, the start of the JVM is estimated from the last modification of the log
+            start = os.path.getmtime(path) - gc_log_parser.last_uptime
+            times = [start + uptime for uptime in gc_log_parser.columns["uptime"]]
+        for name in GC_LOG_COLUMNS:
+            self.columns[name] = to_column(array('d', times if name == "time" else gc_log_parser.columns[name]))
+
+        if key:
+            cache.store(key, {}, {name: ('d', column) for name, column in self.columns.items()})
+
+    # Returns the times and the values of a column, leaving out the pauses where the value is not known.
+    def select(self, name):
+        times = self.columns["time"]
+        values = self.columns[name]
+        if numpy is not None:
+            keep = ~(numpy.isnan(times) | numpy.isnan(values))
+            return times[keep], values[keep]
+        keep = [row for row, (time, value) in enumerate(zip(times, values))
+                if not (math.isnan(time) or math.isnan(value))]
+        return to_column([times[row] for row in keep]), to_column([values[row] for row in keep])
+
+
+# Returns the parsed gc.log. The parsed log is shared as long as the file isn't modified.
+def load_gc_log(path):
+    if watch_seconds:
+        return tailed_source(TailedGcLog, path)
+
+    stat = os.stat(path)
+    return cached_load_gc_log(path, (stat.st_size, stat.st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=SCAN_CACHE_SIZE)
+def cached_load_gc_log(path, version):
+    return GcLog(path)
+
+
+# ================ watching =========================
+
+# In watch mode the report is made while the benchmarks are running and it is refreshed periodically. The source
+# files are tailed: for every file the offset up to which it has been read is remembered, and on a refresh only the
+# lines appended since are parsed. The parsed data is appended to the columns of the file, and the series are views
+# on these columns. The series made of other series are only combined again from the time their inputs may have
+# changed (see WatchedSeries), and only the plots with series that changed are rendered again.
+
+# the tailed sources; the key is the type of the source and its parameters
+tailed_sources = {}
+
+
+# Returns the tailed source of the given type and parameters; the source is created and read on first use.
+def tailed_source(source_type, *params):
+    key = (source_type.__name__,) + params
+    source = tailed_sources.get(key)
+    if source is None:
+        source = source_type(*params)
+        source.refresh()
+        tailed_sources[key] = source
+    return source
+
+
+# Reads the lines appended to all tailed sources. Returns True if any source changed.
+def refresh_tailed_sources():
+    changed = False
+    for source in list(tailed_sources.values()):
+        if source.refresh():
+            changed = True
+    return changed
+
+
+# A file that is being written to; the complete lines are read once.
+class TailedFile:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    # Returns the complete lines appended since the last read. A partially written line is returned once it has
+    # been completed.
+    def read_lines(self):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return data[:end].decode('utf-8', errors='replace').splitlines()
+
+
+# The tailed version of a CsvScan. Fields that are not numeric are NaN.
+class TailedCsvScan:
+    def __init__(self, path, skip_lines):
+        self.path = path
+        self.skip_lines = skip_lines
+        self.rows = 0
+        self.ragged = False
+        self.width = 0
+        self.__tailed_file = TailedFile(path)
+        self.__columns = []
+
+    def refresh(self):
+        lines = self.__tailed_file.read_lines()
+        if self.skip_lines > 0:
+            skipped = min(self.skip_lines, len(lines))
+            self.skip_lines -= skipped
+            lines = lines[skipped:]
+
+        for row in csv.reader(lines, delimiter=',', quotechar='|'):
+            if len(row) != self.width and self.rows > 0:
+                self.ragged = True
+            while len(self.__columns) < len(row):
+                column = GrowingColumn()
+                for k in range(self.rows):
+                    column.append(math.nan)
+                self.__columns.append(column)
+            self.width = len(self.__columns)
+
+            for index, column in enumerate(self.__columns):
+                try:
+                    column.append(float(row[index]))
+                except (IndexError, ValueError):
+                    column.append(math.nan)
+            self.rows += 1
+        return len(lines) > 0
+
+    def column(self, index):
+        if index >= self.width:
+            return to_column([math.nan] * self.rows)
+        return self.__columns[index].view()
+
+    # Returns the given columns like CsvScan.select; the rows of a ragged file where a column is NaN are left out.
+    def select(self, indices, skip_value=None):
+        columns = [self.column(index) for index in indices]
+        if not self.ragged and skip_value is None:
+            return columns
+
+        if numpy is not None:
+            keep = numpy.ones(self.rows, dtype=bool)
+            if self.ragged:
+                for column in columns:
+                    keep &= ~numpy.isnan(column)
+            if skip_value is not None:
+                keep &= columns[-1] != skip_value
+            return [column[keep] for column in columns]
+
+        keep = [row for row in range(self.rows)
+                if not (self.ragged and any(math.isnan(column[row]) for column in columns))
+                and (skip_value is None or columns[-1][row] != skip_value)]
+        return [to_column([column[row] for row in keep]) for column in columns]
+
+
+# The tailed version of a GcLog. The pauses that are parsed are appended to the columns, and to the selected times
+# and values of every column, so a refresh only handles the new pauses. Without date stamps, the start of the JVM is
+# estimated once, when the first pause is read.
+class TailedGcLog(GcLog):
+    def __init__(self, path):
+        self.path = path
+        self.columns = {name: to_column([]) for name in GC_LOG_COLUMNS}
+        self.__tailed_file = TailedFile(path)
+        self.__gc_log_parser = GcLogParser()
+        self.__start = None
+        self.__columns = {name: GrowingColumn() for name in GC_LOG_COLUMNS}
+        self.__selected = {name: (GrowingColumn(), GrowingColumn()) for name in GC_LOG_COLUMNS}
+
+    def refresh(self):
+        gc_log_parser = self.__gc_log_parser
+        pauses = len(gc_log_parser.columns["time"])
+        for line in self.__tailed_file.read_lines():
+            gc_log_parser.parse_line(line)
+        if len(gc_log_parser.columns["time"]) == pauses:
+            return False
+
+        if self.__start is None and not gc_log_parser.has_date_stamps:
+            self.__start = os.path.getmtime(self.path) - gc_log_parser.last_uptime
+        for row in range(pauses, len(gc_log_parser.columns["time"])):
+            time = gc_log_parser.columns["time"][row]
+            if not gc_log_parser.has_date_stamps:
+                time = self.__start + gc_log_parser.columns["uptime"][row]
+            for name in GC_LOG_COLUMNS:
+                value = time if name == "time" else gc_log_parser.columns[name][row]
+                self.__columns[name].append(value)
+                if not (math.isnan(time) or math.isnan(value)):
+                    selected_times, selected_values = self.__selected[name]
+                    selected_times.append(time)
+                    selected_values.append(value)
+        self.columns = {name: column.view() for name, column in self.__columns.items()}
+        return True
+
+    def select(self, name):
+        selected_times, selected_values = self.__selected[name]
+        return selected_times.view(), selected_values.view()
+
+
+# The number of seconds a worker that hasn't logged an interval of a probe is waited for, when other workers have logged
+# later intervals already. In watch mode it is at least 3 refreshes, since the files are read on a refresh.
+TAILED_HDR_IDLE_SECONDS = 10
+
+
+# The tailed version of process_hdr_probe. The histograms are processed as soon as they are logged; like in
+# process_hdr_files, the n-th histograms of the workers are merged into the n-th interval. An interval is merged once
+# every worker has logged it, or once another worker has logged a later interval and the workers that haven't logged
+# it have been idle for the idle timeout; a stalled worker doesn't hold back the merged probe. A worker that logs
+# again after it was left out, or that is added later, continues at the first interval that isn't merged yet.
+class TailedHdrProbe:
+    def __init__(self, session_name, hdr_files, worker_output_paths, merged_path, start_millis,
+                 idle_seconds=TAILED_HDR_IDLE_SECONDS):
+        self.session_name = session_name
+        self.start_millis = start_millis
+        self.idle_seconds = idle_seconds
+        self.hdr_files = []
+        self.tailed_files = []
+        self.readers = []
+        self.worker_processors = []
+        self.worker_start_times = []
+        # the histograms of every worker that are not merged yet; the first one is of the first interval that isn't
+        # merged, and the monotonic time the worker logged its last histogram
+        self.pending = []
+        self.last_logged = []
+        self.merged_processor = HdrLogProcessor(merged_path)
+        self.merged_start_time = None
+        self.hgrm_lines = None
+        self.merged_processor.write_distribution()
+        for hdr_file, worker_output_path in zip(hdr_files, worker_output_paths):
+            self.add_worker(hdr_file, worker_output_path)
+
+    def add_worker(self, hdr_file, worker_output_path):
+        self.hdr_files.append(hdr_file)
+        self.tailed_files.append(TailedFile(hdr_file))
+        self.readers.append(HdrLogReader(hdr_file))
+        processor = HdrLogProcessor(worker_output_path)
+        processor.write_distribution()
+        self.worker_processors.append(processor)
+        self.worker_start_times.append(None)
+        self.pending.append([])
+        self.last_logged.append(time.monotonic())
+
+    # Processes the appended histograms and merges the complete intervals. Returns True if there were any.
+    def refresh(self):
+        now = time.monotonic()
+        changed = False
+        for k, tailed_file in enumerate(self.tailed_files):
+            for line in tailed_file.read_lines():
+                histogram = self.readers[k].read_line(line)
+                if histogram is None or histogram.start_time_stamp < self.start_millis:
+                    continue
+                start_time_sec = hdr_log_round_trip(histogram)
+                if self.worker_start_times[k] is None:
+                    self.worker_start_times[k] = start_time_sec
+                self.worker_processors[k].process(histogram, self.worker_start_times[k])
+                self.pending[k].append(histogram)
+                self.last_logged[k] = now
+                changed = True
+
+        while True:
+            logged = [pending for pending in self.pending if pending]
+            if not logged:
+                break
+            if len(logged) < len(self.pending):
+                idle = all(now - last_logged >= self.idle_seconds
+                           for pending, last_logged in zip(self.pending, self.last_logged) if not pending)
+                if not idle or max(len(pending) for pending in logged) < 2:
+                    break
+            merged = HdrHistogram.merge([pending.pop(0) for pending in logged])
+            start_time_sec = hdr_log_round_trip(merged)
+            if self.merged_start_time is None:
+                self.merged_start_time = start_time_sec
+            self.merged_processor.process(merged, self.merged_start_time)
+            changed = True
+
+        if not changed:
+            return False
+
+        for processor in self.worker_processors:
+            processor.csv_file.flush()
+            processor.write_distribution()
+        self.merged_processor.csv_file.flush()
+        self.hgrm_lines = self.merged_processor.write_distribution()
+        return True
+
+    # Returns the report.csv row of the merged histograms, or None if there are not enough intervals yet.
+    def report_row(self):
+        if self.hgrm_lines is None:
+            return None
+        return self.merged_processor.report_row(self.session_name, self.hgrm_lines)
+
+
+# The series of a handle in watch mode. The tailed sources only grow, so from one refresh to the next only the end of
+# a series changes. For every series the number of points at its start that are the same as at the previous refresh
+# is tracked, and the checksums, the totals and the downsampled buckets of these points are kept; only the points
+# after them are hashed, summed and downsampled again.
+#
+# A series that is made of inputs, like an aggregate, doesn't change before the settled time: the time up to which all
+# its inputs had been read at the previous refresh. A new sample of an input only covers the time since the previous
+# sample of that input, and the buckets are aligned on whole seconds. So only the points from the settled time on are
+# combined again. A series is settled once the usual intervals of all its inputs are known and it has points before
+# the settled time; until then it is combined completely.
+class WatchedSeries:
+    def __init__(self):
+        # the untrimmed and the trimmed series, and the number of their points that are the same as at the previous
+        # refresh
+        self.series = None
+        self.stable = 0
+        self.trimmed = None
+        self.trimmed_stable = 0
+        # the length and the last time of the series of a handle without inputs at the previous refresh
+        self.__length = 0
+        self.__last_time = None
+        # the combined series of a handle with inputs and the lengths of the inputs it was combined from
+        self.__times = GrowingColumn()
+        self.__values = GrowingColumn()
+        self.__input_lengths = None
+        self.__settled_time = None
+        # the number of points of the trimmed series that are hashed and summed, with the checksums and the totals
+        self.__hashed = (0, 0, 0)
+        self.__summed = (0, 0.0, 0)
+        # the bucket size of the downsampled trimmed series and the extreme indices of its complete, stable buckets
+        self.__bucket_size = 1
+        self.__buckets = []
+
+    # Sets the loaded series of a handle without inputs. The series of the tailed sources only grow, so the points
+    # before the previous end are the same if the last time of the previous series is still there. The latency
+    # distributions are written again by every refresh.
+    def update(self, handle, series):
+        length = series.length()
+        self.stable = 0
+        if handle.src != "latency-distribution" and 0 < self.__length <= length \
+                and float(series.times[self.__length - 1]) == self.__last_time:
+            self.stable = self.__length
+        self.__length = length
+        self.__last_time = float(series.times[length - 1]) if length > 0 else None
+        self.series = series
+        return series
+
+    # Returns the series of a handle with inputs, combined from the loaded inputs.
+    def combine(self, handle, inputs):
+        lengths = [series.length() for series in inputs]
+        if lengths == self.__input_lengths:
+            self.stable = self.series.length()
+            return self.series
+
+        settled_time = self.__settled_time
+        if settled_time is not None and any(length < previous
+                                            for length, previous in zip(lengths, self.__input_lengths)):
+            settled_time = None
+        keep = 0 if settled_time is None else column_range(self.__times.view(), settled_time, None)[0]
+        combined = handle.load_untrimmed(inputs, settled_time)
+        self.__times.truncate(keep)
+        self.__values.truncate(keep)
+        self.__times.extend(combined.times)
+        self.__values.extend(combined.values)
+        self.stable = keep
+
+        self.__input_lengths = lengths
+        self.__settled_time = None
+        if inputs and min(lengths) > USUAL_INTERVALS:
+            last_time = math.floor(min(float(series.times[series.length() - 1]) for series in inputs))
+            if column_range(self.__times.view(), last_time, None)[0] > 0:
+                self.__settled_time = last_time if settled_time is None else max(settled_time, last_time)
+        self.series = Series(handle.name, handle.ylabel, handle.is_bytes, handle.is_points,
+                             times=self.__times.view(), values=self.__values.view())
+        return self.series
+
+    # Returns the series trimmed to the period of the handle. In watch mode the period has no end, so the trimmed
+    # series is the end of the series.
+    def trim(self, handle):
+        trimmed = handle.trimmed(self.series)
+        stable = max(0, self.stable - (self.series.length() - trimmed.length()))
+        if self.__hashed[0] > stable:
+            self.__hashed = (0, 0, 0)
+        if self.__summed[0] > stable:
+            self.__summed = (0, 0.0, 0)
+        if len(self.__buckets) * self.__bucket_size > stable:
+            self.__buckets = []
+        trimmed.watched = self
+        self.trimmed = trimmed
+        self.trimmed_stable = stable
+        return trimmed
+
+    def fingerprint(self):
+        times = self.trimmed.times
+        values = self.trimmed.values
+        stable = self.trimmed_stable
+        hashed, times_checksum, values_checksum = self.__hashed
+        times_checksum = zlib.crc32(times[hashed:stable].tobytes(), times_checksum)
+        values_checksum = zlib.crc32(values[hashed:stable].tobytes(), values_checksum)
+        self.__hashed = (stable, times_checksum, values_checksum)
+        return len(times), zlib.crc32(times[stable:].tobytes(), times_checksum), \
+            zlib.crc32(values[stable:].tobytes(), values_checksum)
+
+    def totals(self):
+        values = self.trimmed.values
+        stable = self.trimmed_stable
+        summed, total, count = self.__summed
+        for value in values[summed:stable].tolist():
+            if not math.isnan(value):
+                total += value
+                count += 1
+        self.__summed = (stable, total, count)
+        for value in values[stable:].tolist():
+            if not math.isnan(value):
+                total += value
+                count += 1
+        return total, count
+
+    def downsample(self, max_points):
+        times = self.trimmed.times
+        values = self.trimmed.values
+        length = len(times)
+        if length <= max_points:
+            return times, values
+
+        size = downsample_bucket_size(length, max_points)
+        if self.__bucket_size > size:
+            self.__buckets = []
+            self.__bucket_size = size
+        while self.__bucket_size < size:
+            self.__buckets = merge_extreme_indices(values, self.__buckets)
+            self.__bucket_size *= 2
+        complete = self.trimmed_stable // size
+        if complete > len(self.__buckets):
+            self.__buckets.extend(extreme_indices(values, len(self.__buckets) * size, complete * size, size))
+        indices = bucket_indices(self.__buckets + extreme_indices(values, len(self.__buckets) * size, length, size))
+        return take(times, indices), take(values, indices)
+
 
 class HdrAnalyzer:
     def __init__(self, directory):
@@ -475,41 +2849,41 @@ class HdrAnalyzer:
 
             handles.append(
                 SeriesHandle("latency", "latency_interval_25_" + name, "Interval 25%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 3]))
+                             self._load_latency_ts, args=[file_path, 3], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_50_" + name, "Interval 50%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 4]))
+                             self._load_latency_ts, args=[file_path, 4], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_75_" + name, "Interval 75%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 5]))
+                             self._load_latency_ts, args=[file_path, 5], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_90_" + name, "Interval 90%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 6]))
+                             self._load_latency_ts, args=[file_path, 6], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_99_" + name, "Interval 99%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 7]))
+                             self._load_latency_ts, args=[file_path, 7], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_999_" + name, "Interval 99.9%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 8]))
+                             self._load_latency_ts, args=[file_path, 8], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_9999_" + name, "Interval 99.99%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 9]))
+                             self._load_latency_ts, args=[file_path, 9], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_99999_" + name, "Interval 99.999%", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 10]))
+                             self._load_latency_ts, args=[file_path, 10], source=file_path))
 
             handles.append(
                 SeriesHandle("latency", "latency_interval_min_" + name, "Interval Min", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 11]))
+                             self._load_latency_ts, args=[file_path, 11], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_max_" + name, "Interval Max", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 12]))
+                             self._load_latency_ts, args=[file_path, 12], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_mean_" + name, "Interval Mean", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 13]))
+                             self._load_latency_ts, args=[file_path, 13], source=file_path))
             handles.append(
                 SeriesHandle("latency", "latency_interval_std_deviation_" + name, "Interval Standard Deviation", "Latency (μs)",
-                             self._load_latency_ts, args=[file_path, 14]))
+                             self._load_latency_ts, args=[file_path, 14], source=file_path))
 
             hgrm_path = os.path.join(self.directory, file_name + ".hgrm")
             handles.append(
@@ -519,18 +2893,13 @@ class HdrAnalyzer:
         return handles
 
     def _load_latency_ts(self, path, column):
-        result = []
-        with open(path) as csvfile:
-            csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
-            # we need to skip the first 7 lines
-            for x in range(0, 3):
-                next(csvreader)
-            for row in csvreader:
-                result.append(KeyValue(row[0], row[column]))
-        return result
+        # we need to skip the first 3 lines
+        times, values = scan_csv(path, 3).select([0, column])
+        return times, values
 
     def _load_latency_distribution_ts(self, path):
-        result = []
+        times = []
+        values = []
 
         line_index = 0
         with open(path) as f:
@@ -545,8 +2914,9 @@ class HdrAnalyzer:
                 if len(row) < 5:
                     continue
 
-                result.append(KeyValue(row[4], row[1]))
-        return result
+                times.append(row[4])
+                values.append(row[1])
+        return times, values
 
 
 class GcAnalyzer:
@@ -556,120 +2926,92 @@ class GcAnalyzer:
         self.period = period
 
     def analyze(self):
-        self.__make_gc_csv()
-
-        if os.path.exists(os.path.join(self.worker_dir, "gc.csv")):
-            global gc_logs_found
-            gc_logs_found = True
+        gc_log = os.path.join(self.worker_dir, "gc.log")
+        self.gc_logs_found = os.path.exists(gc_log)
 
         handles = []
+        if not self.gc_logs_found:
+            return handles
 
         handles.append(
             SeriesHandle("gc", "pause_time", "Pause time", "seconds",
-                         self.__load_gc, args=[1, True], is_points=True))
+                         self._load_gc, args=["pause_time"], is_points=True))
         handles.append(
             SeriesHandle("gc", "young_size_before_gc", "Young size before gc", "Size",
-                         self.__load_gc, args=[5, True], is_bytes=True))
+                         self._load_gc, args=["young_size_before_gc"], is_bytes=True))
 
         handles.append(
             SeriesHandle("gc", "young_size_after_gc", "Young size after gc", "Size",
-                         self.__load_gc, args=[6, True], is_bytes=True))
+                         self._load_gc, args=["young_size_after_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "young_size_max", "Young size max", "Size",
-                         self.__load_gc, args=[7, True], is_bytes=True))
+                         self._load_gc, args=["young_size_max"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "young_collected", "Young collected", "Collected",
-                         self.__load_gc, args=[8, True], is_bytes=True, is_points=True))
+                         self._load_gc, args=["young_collected"], is_bytes=True, is_points=True))
         handles.append(
             SeriesHandle("gc", "young_collected_rate", "Young collection rate", "Collected/sec",
-                         self.__load_gc, args=[9, True], is_bytes=True))
+                         self._load_gc, args=["young_collected_rate"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "young_allocated", "Young allocated", "Allocation",
-                         self.__load_gc, args=[10, True], is_bytes=True, is_points=True))
+                         self._load_gc, args=["young_allocated"], is_bytes=True, is_points=True))
         handles.append(
             SeriesHandle("gc", "allocation_rate", "Allocation rate", "Allocated/sec",
-                         self.__load_gc, args=[11, True], is_bytes=True))
+                         self._load_gc, args=["allocation_rate"], is_bytes=True))
 
         handles.append(
             SeriesHandle("gc", "heap_size_before_gc", "Heap size before gc", "Size",
-                         self.__load_gc, args=[12, False], is_bytes=True))
+                         self._load_gc, args=["heap_size_before_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "heap_size_after_gc", "Heap size after gc", "Size",
-                         self.__load_gc, args=[13, False], is_bytes=True))
+                         self._load_gc, args=["heap_size_after_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "heap_size_max", "Heap size max", "Size",
-                         self.__load_gc, args=[14, False], is_bytes=True))
+                         self._load_gc, args=["heap_size_max"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "heap_collected", "Heap collected", "Size",
-                         self.__load_gc, args=[15, False], is_bytes=True, is_points=True))
+                         self._load_gc, args=["heap_collected"], is_bytes=True, is_points=True))
         handles.append(
             SeriesHandle("gc", "heap_collected_rate", "Heap collected rate", "Collected/sec",
-                         self.__load_gc, args=[16, False], is_bytes=True))
+                         self._load_gc, args=["heap_collected_rate"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "promotion", "Promoted", "Size",
-                         self.__load_gc, args=[17, False], is_bytes=True, is_points=True))
+                         self._load_gc, args=["promotion"], is_bytes=True, is_points=True))
         handles.append(
             SeriesHandle("gc", "promotion_rate", "Promotion rate", "Promoted/sec",
-                         self.__load_gc, args=[18, True], is_bytes=True))
+                         self._load_gc, args=["promotion_rate"], is_bytes=True))
 
         handles.append(
             SeriesHandle("gc", "old_size_before_gc", "Tenured size before gc", "Size",
-                         self.__load_gc, args=[19, True], is_bytes=True))
+                         self._load_gc, args=["old_size_before_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "old_size_after_gc", "Tenured size after gc", "Size",
-                         self.__load_gc, args=[20, True], is_bytes=True))
+                         self._load_gc, args=["old_size_after_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "old_total", "Tenured size total", "Size",
-                         self.__load_gc, args=[21, True], is_bytes=True))
+                         self._load_gc, args=["old_total"], is_bytes=True))
 
         handles.append(
             SeriesHandle("gc", "meta_size_before_gc", "Meta/Perm size before gc", "Size",
-                         self.__load_gc, args=[22, True], is_bytes=True))
+                         self._load_gc, args=["meta_size_before_gc"], is_bytes=True))
 
         handles.append(
             SeriesHandle("gc", "meta_size_after_gc", "Meta/Perm size after gc", "Size",
-                         self.__load_gc, args=[23, True], is_bytes=True))
+                         self._load_gc, args=["meta_size_after_gc"], is_bytes=True))
         handles.append(
             SeriesHandle("gc", "meta_total", "Meta/Perm size total", "Size",
-                         self.__load_gc, args=[24, True], is_bytes=True))
+                         self._load_gc, args=["meta_total"], is_bytes=True))
 
-        # set the period
+        # set the period and the source
         for handle in handles:
             handle.period(self.period)
+            handle.source = gc_log
 
         return handles
 
-    # Extracts a gc.csv file from the gc.log file
-    def __make_gc_csv(self):
-        gc_csv = os.path.join(self.worker_dir, "gc.csv")
-        gc_log = os.path.join(self.worker_dir, "gc.log")
-
-        # if there is no gc.log file, we are done
-        if not os.path.exists(gc_log):
-            return
-
-        cmd = "java -jar " + simulator_home + "/lib/gcviewer-1.35-SNAPSHOT.jar " + gc_log + " " + gc_csv + " -t CSV_FULL"
-        print(cmd)
-        with open(os.devnull, 'w') as devnull:
-            subprocess.check_call(cmd.split(), stdout=devnull, stderr=devnull)
-
-    # Loads the data from the gc.csv file
-    def __load_gc(self, column, filter_minus_one):
-        gc_csv = os.path.join(self.worker_dir, "gc.csv")
-
-        result = []
-        if os.path.exists(gc_csv):
-            with open(gc_csv) as csvfile:
-                csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
-                # we need to skip the first line
-                next(csvreader)
-
-                for row in csvreader:
-                    key = row[0]
-                    value = row[column]
-                    if value != "-1" or not filter_minus_one:
-                        result.append(KeyValue(key, value))
-        return result
+    # Loads a column of the parsed gc.log file
+    def _load_gc(self, name):
+        return load_gc_log(os.path.join(self.worker_dir, "gc.log")).select(name)
 
 
 class DstatAnalyzer:
@@ -679,142 +3021,146 @@ class DstatAnalyzer:
 
     def analyze(self):
         handles = []
+        agent_names = []
 
         # Load the dstat data
-        for file_name in os.listdir(self.directory):
+        for file_name in sorted(os.listdir(self.directory)):
             if not file_name.endswith("_dstat.csv"):
                 continue
 
             agent_name = agent_for_worker(file_name)
             period = self.period
             dstat_file = os.path.join(self.directory, file_name)
+            agent_names.append(agent_name)
 
             handles.append(
                 SeriesHandle("dstat", "memory_used_" + agent_name, "Memory Used", "Memory used",
-                             self.__load_dstat, args=[1, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[1, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "memory_buffered_" + agent_name, "Memory Buffered", "Memory Buffered",
-                             self.__load_dstat, args=[2, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[2, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "memory_cached_" + agent_name, "Memory Cached", "Memory Cached",
-                             self.__load_dstat, args=[3, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[3, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "memory_free_" + agent_name, "Memory Free", "Memory Free",
-                             self.__load_dstat, args=[4, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[4, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "cpu_user_" + agent_name, "CPU User", "CPU User %",
-                             self.__load_dstat, args=[5, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[5, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "cpu_system_" + agent_name, "CPU System", "CPU System %",
-                             self.__load_dstat, args=[6, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[6, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "cpu_idle_" + agent_name, "CPU Idle", "CPU Idle %",
-                             self.__load_dstat, args=[7, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[7, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "cpu_wait_" + agent_name, "CPU Wait", "CPU Wait %",
-                             self.__load_dstat, args=[8, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[8, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "cpu_total_" + agent_name, "CPU Total", "CPU Total %",
-                             self.__load_dstat_cpu_total_ts, args=[dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat_cpu_total_ts, args=[dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "cpu_hardware_interrupts_" + agent_name, "CPU Hardware Interrupts",
                              "CPU Hardware Interrupts/sec",
-                             self.__load_dstat, args=[9, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[9, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "cpu_software_interrupts_" + agent_name, "CPU Software Interrupts",
                              "CPU Software Interrupts/sec",
-                             self.__load_dstat, args=[10, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[10, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "disk_read_" + agent_name, "Disk Reads", "Disk Reads/sec",
-                             self.__load_dstat, args=[11, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[11, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "disk_write_" + agent_name, "Disk Writes", "Disk writes/sec",
-                             self.__load_dstat, args=[12, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[12, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "net_receive_" + agent_name, "Net Receive", "Receiving/sec",
-                             self.__load_dstat, args=[13, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[13, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "net_send_" + agent_name, "Net Send", "Sending/sec",
-                             self.__load_dstat, args=[14, dstat_file], is_bytes=True,
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[14, dstat_file], is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "page_in_" + agent_name, "Page in", "Pages/sec",
-                             self.__load_dstat, args=[15, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[15, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "page_out_" + agent_name, "Page out", "Pages/sec",
-                             self.__load_dstat, args=[16, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[16, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "system_interrupts_" + agent_name, "System Interrupts", "System Interrupts/sec",
-                             self.__load_dstat, args=[17, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[17, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "system_context_switches_" + agent_name, "System Context Switches",
                              "System Context Switches/sec",
-                             self.__load_dstat, args=[18, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[18, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
 
             handles.append(
                 SeriesHandle("dstat", "load_average_1m_" + agent_name, "Load Average 1 Minute", "Load",
-                             self.__load_dstat, args=[19, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[19, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "load_average_5m_" + agent_name, "Load Average 5 Minutes", "Load",
-                             self.__load_dstat, args=[20, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[20, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
             handles.append(
                 SeriesHandle("dstat", "load_average_15m_" + agent_name, "Load Average 15 Minute", "Load",
-                             self.__load_dstat, args=[21, dstat_file],
-                             start_time=period.start_time, end_time=period.end_time))
+                             self._load_dstat, args=[21, dstat_file],
+                             start_time=period.start_time, end_time=period.end_time, source=dstat_file))
+
+        # the cpu usage of the cluster is the mean of the cpu usage of the agents
+        if len(agent_names) > 1:
+            period = self.period
+            for name, title in [("cpu_user", "CPU User"), ("cpu_system", "CPU System"), ("cpu_idle", "CPU Idle"),
+                                ("cpu_wait", "CPU Wait"), ("cpu_total", "CPU Total")]:
+                agent_handle_names = [name + "_" + agent_name for agent_name in agent_names]
+                handles.append(
+                    SeriesHandle("dstat", name, "Cluster " + title, title + " %", self._load_cluster_cpu,
+                                 start_time=period.start_time, end_time=period.end_time,
+                                 inputs=[handle for handle in handles if handle.name in agent_handle_names]))
         return handles
 
-    def __load_dstat(self, column, dstat_csv):
-        result = []
-        if os.path.exists(dstat_csv):
-            with open(dstat_csv) as csvfile:
-                csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
-                # we need to skip the first 7 lines
-                for x in range(0, 8):
-                    next(csvreader)
-                for row in csvreader:
-                    if column < len(row):  # protection if column doesn't exist
-                        result.append(KeyValue(row[0], row[column]))
-        return result
+    def _load_dstat(self, column, dstat_csv):
+        # we need to skip the first 8 lines; rows without the column are left out
+        times, values = scan_csv(dstat_csv, 8).select([0, column])
+        return times, values
 
     # total cpu usage isn't explicitly provided by dstat, so we just sum the user+system
-    def __load_dstat_cpu_total_ts(self, dstat_csv):
-        result = []
-        if os.path.exists(dstat_csv):
-            with open(dstat_csv) as csvfile:
-                csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
-                # we need to skip the first 7 lines
-                for x in range(0, 8):
-                    next(csvreader)
-                for row in csvreader:
-                    if len(row) > 6:  # protection if column doesn't exist
-                        result.append(KeyValue(row[0], float(row[5]) + float(row[6])))
-        return result
+    def _load_dstat_cpu_total_ts(self, dstat_csv):
+        times, user, system = scan_csv(dstat_csv, 8).select([0, 5, 6])
+        if numpy is not None:
+            return times, user + system
+        return times, to_column(map(sum, zip(user, system)))
+
+    # The mean of the cpu usage of all agents. The agents are weighted by the time they cover, so an agent that
+    # misses samples doesn't pull the mean down.
+    @staticmethod
+    def _load_cluster_cpu(sources, start_time=None):
+        return aggregate(sources, mean=True, start_time=start_time)
 
 
 # Analyzes the perform.csv for a worker.
@@ -828,22 +3174,33 @@ class ThroughputAnalyzer:
         handles = []
         handles.append(
             SeriesHandle("throughput", "throughput_" + self.worker_name, "Throughput", "Operations/sec",
-                         self.__load_throughput,
+                         self._load_throughput,
                          start_time=self.period.start_time,
-                         end_time=self.period.end_time))
+                         end_time=self.period.end_time,
+                         source=os.path.join(self.worker_dir, "performance.csv")))
+        return handles
+
+    # Returns the handles of the throughput of every test by the test id, for the performance-<test id>.csv files.
+    # These are not plotted per worker; they are the inputs of the throughput of a test of all workers.
+    def analyze_tests(self):
+        handles = {}
+        for file_name in sorted(os.listdir(self.worker_dir)):
+            if not file_name.startswith("performance-") or not file_name.endswith(".csv"):
+                continue
+            test_id = file_name[len("performance-"):-len(".csv")]
+            handles[test_id] = SeriesHandle("throughput", "throughput_" + test_id + "_" + self.worker_name,
+                                            "Throughput " + test_id, "Operations/sec",
+                                            self._load_throughput, args=[file_name],
+                                            start_time=self.period.start_time,
+                                            end_time=self.period.end_time,
+                                            source=os.path.join(self.worker_dir, file_name))
         return handles
 
-    def __load_throughput(self):
-        performance_csv = os.path.join(self.worker_dir, "performance.csv")
-        result = []
-        if os.path.exists(performance_csv):
-            with open(performance_csv) as csvfile:
-                csvreader = csv.reader(csvfile, delimiter=',', quotechar='|')
-                # skip the first line
-                next(csvreader)
-                for row in csvreader:
-                    result.append(KeyValue(row[0], row[4]))
-        return result
+    def _load_throughput(self, file_name="performance.csv"):
+        performance_csv = os.path.join(self.worker_dir, file_name)
+        # skip the first line
+        times, values = scan_csv(performance_csv, 1).select([0, 4])
+        return times, values
 
 
 class Worker:
@@ -855,8 +3212,13 @@ class Worker:
         self.name = os.path.basename(worker_dir)
         self.period = period
         self.handles = []
-        self.handles.extend(ThroughputAnalyzer(self.worker_dir, self.name, period).analyze())
-        self.handles.extend(GcAnalyzer(self.worker_dir, period).analyze())
+        throughput_analyzer = ThroughputAnalyzer(self.worker_dir, self.name, period)
+        self.handles.extend(throughput_analyzer.analyze())
+        # the throughput of every test by the test id
+        self.test_handles = throughput_analyzer.analyze_tests()
+        gc_analyzer = GcAnalyzer(self.worker_dir, period)
+        self.handles.extend(gc_analyzer.analyze())
+        self.gc_logs_found = gc_analyzer.gc_logs_found
         self.handles.extend(HdrAnalyzer(self.worker_dir).analyze())
 
 
@@ -871,6 +3233,7 @@ class Period:
     def end_millis(self):
         return int(round(float(self.end_time)*1000))
 
+
 class Benchmark:
     # the directory where the original files can be found
     src_dir = ""
@@ -883,10 +3246,17 @@ class Benchmark:
         self.name = name
         self.handles = []
         self.id=id
+        # the directory with the dstat files
+        self.dstat_dir = None
+        # the tailed hdr probes in watch mode, by the name of the hdr file
+        self.tailed_probes = {}
+        # the report.csv rows of the probes
+        self.probe_rows = []
 
     def load_workers(self):
         # load all workers
         self.workers = []
+        self.handles = []
         for subdir_name in os.listdir(self.src_dir):
             subdir = os.path.join(self.src_dir, subdir_name)
             if not os.path.isdir(subdir):
@@ -901,18 +3271,82 @@ class Benchmark:
             print("Invalid Benchmark " + self.name + " from directory [" + self.src_dir + "]; no workers found")
             exit(1)
 
+        # the throughput of all workers together, of the workers of every agent, of every test and of every probe.
+        # These are made of the series of the workers, which are loaded once for all of them.
+        period = self.period
+        workers = sorted(self.workers, key=lambda worker: worker.name)
+        worker_handles = [(worker, handle) for worker in workers for handle in worker.handles
+                          if handle.src == "throughput"]
         self.handles.append(
-            SeriesHandle("throughput", "throughput", "Throughput", "Operations/sec", self.aggregated_throughput))
-        self.handles.extend(DstatAnalyzer(report_dir+"/tmp/"+str(self.id), self.period).analyze())
+            SeriesHandle("throughput", "throughput", "Throughput", "Operations/sec", self.aggregated_throughput,
+                         start_time=period.start_time, end_time=period.end_time,
+                         inputs=[handle for worker, handle in worker_handles]))
+        agent_names = sorted(set(agent_for_worker(worker.name) for worker in self.workers))
+        if len(agent_names) > 1:
+            for agent_name in agent_names:
+                self.handles.append(
+                    SeriesHandle("throughput", "throughput_agent_" + agent_name, "Throughput " + agent_name,
+                                 "Operations/sec", self.aggregated_throughput,
+                                 start_time=period.start_time, end_time=period.end_time,
+                                 inputs=[handle for worker, handle in worker_handles
+                                         if agent_for_worker(worker.name) == agent_name]))
+        for test_id in self.__test_ids():
+            self.handles.append(
+                SeriesHandle("throughput", "throughput_test_" + test_id, "Throughput " + test_id, "Operations/sec",
+                             self.aggregated_throughput,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=[worker.test_handles[test_id] for worker in workers
+                                     if test_id in worker.test_handles]))
+        for probe_file_name, worker_names in self.__hdr_files():
+            probe_name = os.path.splitext(probe_file_name)[0]
+            self.handles.append(
+                SeriesHandle("throughput", "throughput_probe_" + probe_name, "Throughput " + probe_name,
+                             "Operations/sec", self.aggregated_probe_throughput,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=self.__probe_count_handles(probe_name, worker_names)))
+
+        self.handles.extend(DstatAnalyzer(self.dstat_dir, self.period).analyze())
         self.handles.extend(HdrAnalyzer(report_dir+"/tmp/"+str(self.id)).analyze())
 
+        # the gc activity of all workers together
+        if self.gc_logs_found():
+            gc_handles = {}
+            for worker in self.workers:
+                for handle in worker.handles:
+                    if handle.src == "gc":
+                        gc_handles.setdefault(handle.name, []).append(handle)
+            self.handles.append(
+                SeriesHandle("gc", "gc_pause_time", "Pause time", "seconds",
+                             self.aggregated_gc_pauses, is_points=True,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=gc_handles["pause_time"]))
+            self.handles.append(
+                SeriesHandle("gc", "gc_pause_time_per_second", "Pause time per second", "seconds",
+                             self.aggregated_gc_pauses_per_second,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=gc_handles["pause_time"]))
+            self.handles.append(
+                SeriesHandle("gc", "gc_allocation_rate", "Allocation rate", "Allocated/sec",
+                             self.aggregated_gc_rate, is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=gc_handles["young_allocated"]))
+            self.handles.append(
+                SeriesHandle("gc", "gc_promotion_rate", "Promotion rate", "Promoted/sec",
+                             self.aggregated_gc_rate, is_bytes=True,
+                             start_time=period.start_time, end_time=period.end_time,
+                             inputs=gc_handles["promotion"]))
+
         agents = {}
         for worker in self.workers:
             agent = agent_for_worker(worker.name)
             if not agents.get(agent):
                 agents[agent] = worker
 
+    # Returns the period of the benchmark; from the first row after the warmup until the last row before the cooldown
+    # of the performance.csv files of all workers. The period is returned instead of set, so it can be looked up in
+    # the executor.
     def lookup_period(self):
+        period = None
         for worker_name in os.listdir(self.src_dir):
             if not worker_name.startswith("A"):
                 continue
@@ -926,50 +3360,245 @@ class Benchmark:
                 continue
 
             print(performance_csv_file)
-            with open(performance_csv_file) as csv_file:
-                csv_reader = csv.reader(csv_file, delimiter=',', quotechar='|')
-                # skip first line
-                next(csv_reader)
-                first_time = float(next(csv_reader)[0])
-                start_time = str(first_time + warmup_seconds)
-                end_time = str(first_time - cooldown_seconds)
-
-                for row in csv_reader:
-                    v = float(row[0])
-                    end_time = str(v - cooldown_seconds)
-
-                if self.period is None:
-                    # first iteration where the period is not set yet
-                    self.period = Period(start_time, end_time)
-                else:
-                    # We need to pick the earliest time from all series for the start.
-                    # and the latest for the end.
-                    # That way the series don't get trimmed because of milliseconds (minimal worker reporting
-                    # interval is 1 second, see WORKER_PERFORMANCE_MONITOR_INTERVAL_SECONDS property) causing
-                    # misalignment of the series by one data point in the chart resulting in ugly vertical drop
-                    # at the end of the throughput charts
-                    self.period = Period(min(self.period.start_time, start_time), max(self.period.end_time, end_time))
-
-    def init_files(self):
-        cmd = simulator_home + "/conf/init_report_files.sh " + self.src_dir+ " " + report_dir + " " + str(self.id) + " "+ str(self.period.start_millis()) + " " + str(self.period.end_millis())
-        print(cmd)
-        out = subprocess.check_output(cmd.split())
-        
-# todo: better name
-    def x(self, handle):
-        return handle.load().items
-
-    def aggregated_throughput(self):
-        ts_list = []
+            # the times are taken from the scan of the file that the throughput is loaded from as well; skip the
+            # first line
+            times = scan_csv(performance_csv_file, 1).column(0)
+            if len(times) == 0:
+                continue
+            start_time = str(float(times[0]) + warmup_seconds)
+            end_time = str(float(times[len(times) - 1]) - cooldown_seconds)
+
+            if period is None:
+                # first iteration where the period is not set yet
+                period = Period(start_time, end_time)
+            else:
+                # We need to pick the earliest time from all series for the start.
+                # and the latest for the end.
+                # That way no worker loses data points because the workers don't report at the same
+                # milliseconds (minimal worker reporting interval is 1 second, see
+                # WORKER_PERFORMANCE_MONITOR_INTERVAL_SECONDS property).
+                period = Period(min(period.start_time, start_time), max(period.end_time, end_time))
+        return period
+
+    # Prepares the files in the tmp directory of the benchmark. The latency histograms of every probe are trimmed
+    # to the period and merged over the workers. This work is submitted to the executor; the returned futures
+    # result in the report.csv rows of the probes, or None.
+    def init_files(self, executor):
+        target_dir = os.path.join(report_dir, "tmp", str(self.id))
+        ensure_dir(target_dir)
+        futures = []
+
+        for worker_name in sorted(os.listdir(self.src_dir)):
+            worker_dir = os.path.join(self.src_dir, worker_name)
+            if not os.path.isdir(worker_dir):
+                continue
+
+            for file_name in sorted(os.listdir(worker_dir)):
+                if file_name.startswith("performance") and file_name.endswith(".csv"):
+                    ensure_dir(os.path.join(target_dir, worker_name))
+                    shutil.copy2(os.path.join(worker_dir, file_name), os.path.join(target_dir, worker_name))
+
+        session_name = os.path.basename(os.path.normpath(self.src_dir))
+        for probe_file_name, worker_names in self.__hdr_files():
+            print("Merging probe " + probe_file_name)
+            futures.append(executor.submit(
+                process_hdr_probe,
+                session_name,
+                [os.path.join(self.src_dir, worker_name, probe_file_name) for worker_name in worker_names],
+                self.__worker_output_paths(probe_file_name, worker_names),
+                os.path.join(target_dir, os.path.splitext(probe_file_name)[0]),
+                self.period.start_millis(),
+                self.period.end_millis()))
+
+        # copy the dstats files if they exist; they are scanned in the benchmark directory itself, where their
+        # scans stay cached
+        for file_name in os.listdir(self.src_dir):
+            if file_name.endswith("_dstat.csv"):
+                shutil.copy2(os.path.join(self.src_dir, file_name), target_dir)
+        self.dstat_dir = self.src_dir
+        return futures
+
+    # Returns the hdr files of every probe, sorted by the name of the hdr file, with the names of the workers
+    # that have the file.
+    def __hdr_files(self):
+        hdr_files = {}
+        for worker_name in sorted(os.listdir(self.src_dir)):
+            worker_dir = os.path.join(self.src_dir, worker_name)
+            if not os.path.isdir(worker_dir):
+                continue
+
+            for file_name in sorted(os.listdir(worker_dir)):
+                if file_name.endswith(".hdr"):
+                    hdr_files.setdefault(file_name, []).append(worker_name)
+        return sorted(hdr_files.items())
+
+    def __worker_output_paths(self, probe_file_name, worker_names):
+        target_dir = os.path.join(report_dir, "tmp", str(self.id))
+        probe_name = os.path.splitext(probe_file_name)[0]
+        worker_output_paths = []
+        for worker_name in worker_names:
+            ensure_dir(os.path.join(target_dir, worker_name))
+            worker_output_paths.append(os.path.join(target_dir, worker_name, probe_name))
+        return worker_output_paths
+
+    # In watch mode the end of the benchmark isn't known yet. The period starts after the warmup of the earliest
+    # first row of the performance.csv files and has no end. Returns False if no worker has written a row yet.
+    def lookup_live_period(self):
+        start_time = None
+        for worker_name in os.listdir(self.src_dir):
+            performance_csv_file = os.path.join(self.src_dir, worker_name, "performance.csv")
+            if not worker_name.startswith("A") or not os.path.isfile(performance_csv_file):
+                continue
+
+            # the tailed scan is shared with the throughput of the worker; skip the first line
+            scan = scan_csv(performance_csv_file, 1)
+            scan.refresh()
+            if scan.rows > 0:
+                first_time = float(scan.column(0)[0])
+                start_time = first_time if start_time is None else min(start_time, first_time)
+
+        if start_time is None:
+            return False
+        self.period = Period(str(start_time + warmup_seconds), None)
+        return True
+
+    # Prepares the tmp directory of the benchmark in watch mode. The hdr files are processed by tailed probes and
+    # the dstat files are tailed in the benchmark directory itself.
+    def init_tailed_files(self):
+        self.__add_tailed_probes()
+        self.dstat_dir = self.src_dir
+
+    # Adds the hdr files that are not tailed yet to the tailed probes; a worker or a probe can start after the
+    # report. Returns True if any file was added.
+    def __add_tailed_probes(self):
+        target_dir = os.path.join(report_dir, "tmp", str(self.id))
+        ensure_dir(target_dir)
+
+        session_name = os.path.basename(os.path.normpath(self.src_dir))
+        added = False
+        for probe_file_name, worker_names in self.__hdr_files():
+            hdr_files = [os.path.join(self.src_dir, worker_name, probe_file_name) for worker_name in worker_names]
+            worker_output_paths = self.__worker_output_paths(probe_file_name, worker_names)
+            probe = self.tailed_probes.get(probe_file_name)
+            if probe is None:
+                self.tailed_probes[probe_file_name] = TailedHdrProbe(
+                    session_name, hdr_files, worker_output_paths,
+                    os.path.join(target_dir, os.path.splitext(probe_file_name)[0]),
+                    self.period.start_millis(), max(TAILED_HDR_IDLE_SECONDS, 3 * watch_seconds))
+                added = True
+                continue
+
+            for hdr_file, worker_output_path in zip(hdr_files, worker_output_paths):
+                if hdr_file not in probe.hdr_files:
+                    probe.add_worker(hdr_file, worker_output_path)
+                    added = True
+        return added
+
+    # Processes the histograms appended to the hdr files in watch mode. Returns the report.csv rows of the probes.
+    # The worker directories are scanned again; when a worker or a probe was added, the workers are loaded again,
+    # so the series of the report include it.
+    def refresh_tailed_probes(self):
+        worker_names = set(name for name in os.listdir(self.src_dir)
+                           if name.startswith("A") and os.path.isdir(os.path.join(self.src_dir, name)))
+        added = self.__add_tailed_probes()
+        if added or worker_names != set(worker.name for worker in self.workers):
+            self.load_workers()
+
+        rows = []
+        for probe_file_name in sorted(self.tailed_probes):
+            probe = self.tailed_probes[probe_file_name]
+            probe.refresh()
+            row = probe.report_row()
+            if row:
+                rows.append(row)
+        return rows
+
+    def gc_logs_found(self):
         for worker in self.workers:
-            for handle in worker.handles:
-                if handle.src == "throughput":
-                    ts_list.append(handle.load())
-        return Series("", "", False, False, ts_list=ts_list).items
+            if worker.gc_logs_found:
+                return True
+        return False
+
+    # The ids of the tests that have a performance-<test id>.csv file in any of the worker directories.
+    def __test_ids(self):
+        test_ids = set()
+        for worker in self.workers:
+            test_ids.update(worker.test_handles)
+        return sorted(test_ids)
+
+    # The handles of the counts of the interval histograms of a probe of every worker; the counts are taken from
+    # the interval csv files of the workers.
+    def __probe_count_handles(self, probe_name, worker_names):
+        handles = []
+        for worker_name in worker_names:
+            interval_csv = os.path.join(report_dir, "tmp", str(self.id), worker_name, probe_name)
+            handles.append(SeriesHandle("throughput", "throughput_probe_" + probe_name + "_" + worker_name,
+                                        "Throughput " + probe_name, "Operations/sec",
+                                        self._load_interval_counts, args=[interval_csv], source=interval_csv))
+        return handles
+
+    @staticmethod
+    def _load_interval_counts(interval_csv):
+        # we need to skip the first 3 lines
+        times, counts = scan_csv(interval_csv, 3).select([1, 2])
+        return times, counts
+
+    # The throughput per second of the workers; of all workers, the workers of an agent or the workers of a test.
+    # The samples of the workers are aligned on the time they were measured.
+    @staticmethod
+    def aggregated_throughput(sources, start_time=None):
+        return aggregate(sources, start_time=start_time)
+
+    # The throughput per second of a probe of all workers, from the counts of the interval histograms.
+    @staticmethod
+    def aggregated_probe_throughput(sources, start_time=None):
+        return aggregate(sources, is_amount=True, start_time=start_time)
+
+    # Returns the report.csv rows with the operations, the duration and the throughput of all workers, of every
+    # agent and of every test over the period. These rows have no latencies. The series are the loaded series of
+    # the handles.
+    def throughput_rows(self, series_by_handle):
+        session_name = os.path.basename(os.path.normpath(self.src_dir))
+        rows = []
+        for handle in self.handles:
+            if handle.src != "throughput" or handle.name.startswith("throughput_probe_"):
+                continue
+            total, count = series_by_handle[handle].totals()
+            if count == 0:
+                continue
+            # the buckets of the series are 1 second
+            operations = int(round(total))
+            duration_millis = count * 1000
+            row = [session_name, handle.name] + [""] * 10
+            row.append(str(operations))
+            row.append(str(duration_millis))
+            row.append(java_double(operations * 1000.0 / duration_millis))
+            rows.append(row)
+        return rows
+
+    # The pauses of all workers.
+    @staticmethod
+    def aggregated_gc_pauses(sources, start_time=None):
+        ranges = [column_range(times, start_time, None) for times, values in sources]
+        pauses = sorted(itertools.chain.from_iterable(
+            zip(times[lo:hi].tolist(), values[lo:hi].tolist()) for (times, values), (lo, hi) in zip(sources, ranges)))
+        return [time for time, pause in pauses], [pause for time, pause in pauses]
+
+    # The pause time of all workers per second. A pause is counted in the second it ended in.
+    @staticmethod
+    def aggregated_gc_pauses_per_second(sources, start_time=None):
+        return bucket_sum(sources, start_time=start_time)
+
+    # The rate of an amount of the gc.log, e.g. the allocated bytes, of all workers per second. The amount of a gc
+    # is spread over the time since the previous gc of the worker.
+    @staticmethod
+    def aggregated_gc_rate(sources, start_time=None):
+        return aggregate(sources, is_amount=True, gaps=False, start_time=start_time)
+
 
 class Comparison:
 
-    def __init__(self):
+    def __init__(self, executor):
         benchmark_dirs = []
         benchmark_names = {}
         last_benchmark = None
@@ -994,25 +3623,57 @@ class Comparison:
                 name = os.path.basename(os.path.normpath(benchmark_dir))
                 benchmark_names[benchmark_dir] = name
 
-        # Make the benchmarks
-        benchmark_id=0
+        # Make the benchmarks; the benchmarks are ingested concurrently
         self.benchmarks = []
-        for benchmark_dir in benchmark_dirs:
-            benchmark_id += 1
-            benchmark = Benchmark(benchmark_dir, benchmark_names[benchmark_dir], benchmark_id)
-            benchmark.lookup_period()
-            benchmark.init_files()
-            benchmark.load_workers()
-            self.benchmarks.append(benchmark)
+        for benchmark_id, benchmark_dir in enumerate(benchmark_dirs, 1):
+            self.benchmarks.append(Benchmark(benchmark_dir, benchmark_names[benchmark_dir], benchmark_id))
+
+        init_futures = []
+        if watch_seconds:
+            for benchmark in self.benchmarks:
+                while True:
+                    with profile.phase("lookup_period"):
+                        started = benchmark.lookup_live_period()
+                    if started:
+                        break
+                    print("Waiting for benchmark [" + benchmark.name + "] to start")
+                    time.sleep(watch_seconds)
+                with profile.phase("init_files"):
+                    benchmark.init_tailed_files()
+                init_futures.append([])
+        else:
+            with profile.phase("lookup_period"):
+                period_futures = [executor.submit(benchmark.lookup_period) for benchmark in self.benchmarks]
+                for benchmark, future in zip(self.benchmarks, period_futures):
+                    benchmark.period = future.result()
+            with profile.phase("init_files"):
+                for benchmark in self.benchmarks:
+                    init_futures.append(benchmark.init_files(executor))
+
+        # the workers are loaded once the files of the benchmark are prepared
+        for benchmark, futures in zip(self.benchmarks, init_futures):
+            with profile.phase("init_files"):
+                benchmark.probe_rows = [row for row in [future.result() for future in futures] if row]
+            with profile.phase("load_workers"):
+                benchmark.load_workers()
+
+    def gc_logs_found(self):
+        for benchmark in self.benchmarks:
+            if benchmark.gc_logs_found():
+                return True
+        return False
 
     def output_dir(self, name):
         output_dir = os.path.join(report_dir, name)
         ensure_dir(output_dir)
         return output_dir
 
-    # makes the actual comparison report.
-    def make(self):
+    # makes the actual comparison report. In watch mode, rendered has the fingerprints of the rendered plots by
+    # the index of the plot; only the plots with a different fingerprint are rendered.
+    def make(self, executor, rendered=None):
         plots = {}
+        # the series to load; every item is the plot, the handle and the title of the series in the plot
+        plot_series = []
 
         # plot benchmark/machine level metrics
         for benchmark in self.benchmarks:
@@ -1030,7 +3691,7 @@ class Comparison:
 
                     plots[handle.name] = plot
 
-                plot.add(handle.load(), title=benchmark.name)
+                plot_series.append((plot, handle, benchmark.name))
 
         # plot worker level metrics
         if args.full:
@@ -1046,9 +3707,9 @@ class Comparison:
                                 plots["throughput_per_worker"] = plot
 
                             if len(self.benchmarks) > 1:
-                                plot.add(handle.load(), benchmark.name + "_" + worker.name)
+                                plot_series.append((plot, handle, benchmark.name + "_" + worker.name))
                             else:
-                                plot.add(handle.load(), worker.name)
+                                plot_series.append((plot, handle, worker.name))
                         else:
                             name = handle.name + "_" + worker.name
                             plot = plots.get(name)
@@ -1060,44 +3721,358 @@ class Comparison:
                                     plot = TimeseriesGnuplot(self.output_dir(handle.src), title, basefilename=name)
                                 plots[name] = plot
 
-                            plot.add(handle.load(), benchmark.name)
+                            plot_series.append((plot, handle, benchmark.name))
 
-        for plot in list(plots.values()):
-            plot.plot()
-            htmlReport.addImage(plot)
+        # load the series in the executor. Every series is loaded once, also when it's in several plots or an input
+        # of other series, e.g. the throughput of a worker is an input of the throughput of all workers and of its
+        # agent. The handles with the same source are loaded by a single task, so the source file is scanned only
+        # once. The handles with inputs are made from the loaded inputs afterwards.
+        handles = []
+        for plot, handle, title in plot_series:
+            handles.extend(handle.inputs if handle.inputs is not None else [handle])
+        groups = {}
+        for handle in handles:
+            key = id(handle) if handle.source is None else handle.source
+            group = groups.setdefault(key, [])
+            if handle not in group:
+                group.append(handle)
+        groups = list(groups.values())
+        combined = []
+        for plot, handle, title in plot_series:
+            if handle.inputs is not None and handle not in combined:
+                combined.append(handle)
+
+        # the tailed sources are in the memory of this process, so in watch mode the series are loaded here. Only the
+        # ends of the series that changed since the previous refresh are combined; see WatchedSeries.
+        loaded = {}
+        with profile.phase("load_series"):
+            if watch_seconds:
+                for group in groups:
+                    for handle, series in zip(group, load_untrimmed_series(group)):
+                        loaded[handle] = handle.watched.update(handle, series)
+                for handle in combined:
+                    inputs = [loaded[input_handle] for input_handle in handle.inputs]
+                    loaded[handle] = handle.watched.combine(handle, inputs)
+            else:
+                for group, group_series in zip(groups, executor.map(load_untrimmed_series, groups)):
+                    loaded.update(zip(group, group_series))
+                inputs = [[loaded[input_handle] for input_handle in handle.inputs] for handle in combined]
+                loaded.update(zip(combined, executor.map(combine_series, combined, inputs)))
+        series_by_handle = {}
+        for handle in dict.fromkeys(handle for plot, handle, title in plot_series):
+            if watch_seconds:
+                series_by_handle[handle] = handle.watched.trim(handle)
+            else:
+                series_by_handle[handle] = handle.trimmed(loaded[handle])
+
+        for plot, handle, title in plot_series:
+            plot.add(series_by_handle[handle], title)
+
+        # the report.csv has the rows of the probes and the throughput rows of every benchmark. In watch mode the
+        # file is written again by every refresh.
+        with profile.phase("report_csv"):
+            rows = []
+            for benchmark in self.benchmarks:
+                rows.extend(benchmark.probe_rows)
+                rows.extend(benchmark.throughput_rows(series_by_handle))
+            if rendered is None:
+                for row in rows:
+                    append_report_csv(row)
+            else:
+                with open(os.path.join(report_dir, "report.csv"), "w") as f:
+                    f.write(report_csv_header)
+                    f.writelines(",".join(row) + "\n" for row in rows)
+
+        # render the plots in the executor; the charts are added to the html report as soon as their images are done
+        plot_list = list(plots.values())
+        futures = {}
+        for index, plot in enumerate(plot_list):
+            with profile.phase("plot"):
+                if rendered is not None:
+                    fingerprint = plot.fingerprint()
+                    if rendered.get(index) == fingerprint:
+                        continue
+                    rendered[index] = fingerprint
+                plot.plot()
+            if not plot.skipped:
+                with profile.phase("render"):
+                    futures[executor.submit(run_gnuplot, plot.script_path)] = index
+
+        with profile.phase("render"):
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                index = futures[future]
+                print(plot_list[index].image_path)
+                htmlReport.addChart(plot_list[index], index)
+
+        if rendered is not None:
+            return
 
         print("Done writing report [" + report_dir + "]")
         for benchmark in self.benchmarks:
             print(" benchmark [" + benchmark.name + "] benchmark.dir [" + benchmark.src_dir + "]")
 
+    # Refreshes the report with the data appended to the files of the benchmarks, until interrupted.
+    def watch(self, executor):
+        print("Watching the benchmarks; the report is refreshed every " + str(watch_seconds) + " seconds. "
+              + "Press Ctrl-C to stop.")
+        rendered = {}
+        try:
+            while True:
+                with profile.phase("refresh"):
+                    for benchmark in self.benchmarks:
+                        benchmark.probe_rows = benchmark.refresh_tailed_probes()
+                    refresh_tailed_sources()
+
+                self.make(executor, rendered)
+                with profile.phase("html"):
+                    htmlReport.generate()
+                time.sleep(watch_seconds)
+        except KeyboardInterrupt:
+            print("Stopped watching [" + report_dir + "]")
+
+# The script that draws the charts of the html report on a canvas. A chart is drawn when it is shown for the first
+# time. Dragging over a chart zooms in on the selected time range; a double click zooms out again.
+HTML_CHART_SCRIPT = """
+var chartColors = ['red', 'blue', 'forestgreen', 'orchid', 'grey', 'brown', 'violet', 'darkgoldenrod'];
+function decodeFloats(text) {
+    var bytes = atob(text);
+    var view = new DataView(new ArrayBuffer(bytes.length));
+    for (var i = 0; i < bytes.length; i++) { view.setUint8(i, bytes.charCodeAt(i)); }
+    var result = new Float32Array(bytes.length / 4);
+    for (var i = 0; i < result.length; i++) { result[i] = view.getFloat32(4 * i, true); }
+    return result;
+}
+function formatValue(value, bytes) {
+    var units = bytes ? ['B', 'KB', 'MB', 'GB', 'TB', 'PB'] : ['', 'k', 'M', 'G', 'T', 'P'];
+    var unit = 0;
+    while (Math.abs(value) >= 1000 && unit < units.length - 1) { value /= 1000; unit++; }
+    return (Math.round(value * 100) / 100) + (bytes ? ' ' : '') + units[unit];
+}
+function formatX(chart, x, precise) {
+    if (chart.xlog) {
+        var percentile = 100 * (1 - 1 / x);
+        return (precise ? percentile.toFixed(5) : String(Math.round(percentile * 100000) / 100000)) + '%';
+    }
+    var seconds = Math.round(x);
+    var sign = seconds < 0 ? '-' : '';
+    seconds = Math.abs(seconds);
+    var rest = seconds % 60;
+    return sign + Math.floor(seconds / 60) + ':' + (rest < 10 ? '0' : '') + rest;
+}
+function niceTicks(low, high, count, steps) {
+    var range = high - low;
+    var step = 0;
+    if (steps) {
+        for (var i = 0; i < steps.length && !step; i++) { if (range / steps[i] <= count) { step = steps[i]; } }
+    }
+    if (!step) {
+        step = Math.pow(10, Math.floor(Math.log10(range / count)));
+        var error = count / range * step;
+        if (error <= 0.15) { step *= 10; } else if (error <= 0.35) { step *= 5; } else if (error <= 0.75) { step *= 2; }
+    }
+    var ticks = [];
+    for (var tick = Math.ceil(low / step) * step; tick <= high + step * 1e-9; tick += step) { ticks.push(tick); }
+    return ticks;
+}
+function nearestIndex(xs, x) {
+    var low = 0, high = xs.length - 1;
+    while (low < high) {
+        var middle = (low + high) >> 1;
+        if (xs[middle] < x) { low = middle + 1; } else { high = middle; }
+    }
+    if (low > 0 && Math.abs(xs[low - 1] - x) < Math.abs(xs[low] - x)) { low--; }
+    return low;
+}
+function drawChart(container) {
+    var chart = JSON.parse(container.getElementsByTagName('script')[0].textContent);
+    chart.canvas = container.getElementsByTagName('canvas')[0];
+    var xmin = Infinity, xmax = -Infinity;
+    chart.series.forEach(function(series, index) {
+        series.xs = decodeFloats(series.x);
+        series.ys = decodeFloats(series.y);
+        series.color = series.color || 'hsl(' + (index * 137) % 360 + ', 70%, 45%)';
+        if (series.xs.length) { xmin = Math.min(xmin, series.xs[0]); xmax = Math.max(xmax, series.xs[series.xs.length - 1]); }
+    });
+    if (xmax <= xmin) { xmax = xmin + 1; }
+    chart.full = [xmin, xmax];
+    chart.view = [xmin, xmax];
+    container.chart = chart;
+
+    var canvas = chart.canvas;
+    function mouseX(e) { return e.clientX - canvas.getBoundingClientRect().left; }
+    canvas.addEventListener('mousemove', function(e) { chart.hover = mouseX(e); renderChart(chart); });
+    canvas.addEventListener('mouseleave', function(e) { chart.hover = null; chart.drag = null; renderChart(chart); });
+    canvas.addEventListener('mousedown', function(e) { chart.drag = mouseX(e); });
+    canvas.addEventListener('mouseup', function(e) {
+        var start = chart.drag, end = mouseX(e);
+        chart.drag = null;
+        if (start !== null && Math.abs(end - start) > 5) {
+            var x0 = chart.toX(Math.min(start, end)), x1 = chart.toX(Math.max(start, end));
+            chart.view = [x0, x1];
+        }
+        renderChart(chart);
+    });
+    canvas.addEventListener('dblclick', function(e) { chart.view = chart.full.slice(); renderChart(chart); });
+    renderChart(chart);
+}
+function renderChart(chart) {
+    var canvas = chart.canvas;
+    var ratio = window.devicePixelRatio || 1;
+    var width = canvas.clientWidth, height = canvas.clientHeight;
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+    var ctx = canvas.getContext('2d');
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.fillStyle = 'white';
+    ctx.fillRect(0, 0, width, height);
+    ctx.font = '12px sans-serif';
+
+    var legend = chart.series.filter(function(series) { return series.title; });
+    var left = 80, right = 20, top = 30, bottom = 45 + (legend.length ? 18 * Math.ceil(legend.length / 3) : 0);
+    var plotWidth = Math.max(1, width - left - right), plotHeight = Math.max(1, height - top - bottom);
+    var x0 = chart.view[0], x1 = chart.view[1];
+    var scale = chart.xlog ? Math.log : function(x) { return x; };
+    var toPixelX = function(x) { return left + (scale(x) - scale(x0)) / (scale(x1) - scale(x0)) * plotWidth; };
+    chart.toX = function(pixel) {
+        var fraction = (pixel - left) / plotWidth;
+        var x = scale(x0) + fraction * (scale(x1) - scale(x0));
+        return chart.xlog ? Math.exp(x) : x;
+    };
+
+    var ymin = 0, ymax = -Infinity;
+    chart.series.forEach(function(series) {
+        for (var i = 0; i < series.xs.length; i++) {
+            if (series.xs[i] < x0 || series.xs[i] > x1 || isNaN(series.ys[i])) { continue; }
+            ymin = Math.min(ymin, series.ys[i]);
+            ymax = Math.max(ymax, series.ys[i]);
+        }
+    });
+    if (!(ymax > ymin)) { ymax = ymin + 1; }
+    ymax += (ymax - ymin) * 0.05;
+    var toPixelY = function(y) { return top + plotHeight - (y - ymin) / (ymax - ymin) * plotHeight; };
+
+    ctx.fillStyle = 'black';
+    ctx.textAlign = 'center';
+    ctx.fillText(chart.title, left + plotWidth / 2, 18);
+    ctx.fillText(chart.xlabel, left + plotWidth / 2, top + plotHeight + 34);
+    ctx.strokeStyle = '#dddddd';
+    ctx.beginPath();
+    var xticks;
+    if (chart.xlog) {
+        xticks = [];
+        for (var tick = 1; tick <= x1; tick *= 10) { if (tick >= x0) { xticks.push(tick); } }
+    } else {
+        xticks = niceTicks(x0, x1, 10, [1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400]);
+    }
+    xticks.forEach(function(tick) {
+        var pixel = toPixelX(tick);
+        ctx.moveTo(pixel, top);
+        ctx.lineTo(pixel, top + plotHeight);
+        ctx.fillText(formatX(chart, tick, false), pixel, top + plotHeight + 16);
+    });
+    ctx.textAlign = 'right';
+    niceTicks(ymin, ymax, 8).forEach(function(tick) {
+        var pixel = toPixelY(tick);
+        ctx.moveTo(left, pixel);
+        ctx.lineTo(left + plotWidth, pixel);
+        ctx.fillText(formatValue(tick, chart.bytes), left - 6, pixel + 4);
+    });
+    ctx.stroke();
+    ctx.strokeStyle = 'black';
+    ctx.strokeRect(left, top, plotWidth, plotHeight);
+    ctx.save();
+    ctx.translate(14, top + plotHeight / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.textAlign = 'center';
+    ctx.fillText(chart.ylabel, 0, 0);
+    ctx.restore();
+
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(left, top, plotWidth, plotHeight);
+    ctx.clip();
+    chart.series.forEach(function(series) {
+        ctx.strokeStyle = series.color;
+        ctx.fillStyle = series.color;
+        ctx.beginPath();
+        var drawing = false;
+        for (var i = 0; i < series.xs.length; i++) {
+            if (isNaN(series.ys[i])) { drawing = false; continue; }
+            var px = toPixelX(series.xs[i]), py = toPixelY(series.ys[i]);
+            if (chart.points) { ctx.fillRect(px - 1.5, py - 1.5, 3, 3); }
+            else if (drawing) { ctx.lineTo(px, py); }
+            else { ctx.moveTo(px, py); drawing = true; }
+        }
+        ctx.stroke();
+    });
+    ctx.restore();
+
+    ctx.textAlign = 'left';
+    legend.forEach(function(series, index) {
+        var lx = left + (index % 3) * plotWidth / 3, ly = top + plotHeight + 52 + 18 * Math.floor(index / 3);
+        ctx.fillStyle = series.color;
+        ctx.fillRect(lx, ly - 8, 14, 4);
+        ctx.fillStyle = 'black';
+        ctx.fillText(series.title, lx + 20, ly - 3);
+    });
+
+    if (chart.drag !== null && chart.drag !== undefined && chart.hover !== null) {
+        ctx.fillStyle = 'rgba(0, 0, 255, 0.1)';
+        ctx.fillRect(Math.min(chart.drag, chart.hover), top, Math.abs(chart.hover - chart.drag), plotHeight);
+    } else if (chart.hover !== null && chart.hover !== undefined && chart.hover >= left && chart.hover <= left + plotWidth) {
+        var x = chart.toX(chart.hover);
+        var lines = [formatX(chart, x, true)];
+        chart.series.forEach(function(series) {
+            if (!series.xs.length) { return; }
+            var i = nearestIndex(series.xs, x);
+            lines.push((series.title ? series.title + ': ' : '') + formatValue(series.ys[i], chart.bytes));
+        });
+        ctx.strokeStyle = 'grey';
+        ctx.beginPath();
+        ctx.moveTo(chart.hover, top);
+        ctx.lineTo(chart.hover, top + plotHeight);
+        ctx.stroke();
+        var boxWidth = Math.max.apply(null, lines.map(function(line) { return ctx.measureText(line).width; })) + 12;
+        var bx = chart.hover + 10 + boxWidth > left + plotWidth ? chart.hover - 10 - boxWidth : chart.hover + 10;
+        ctx.fillStyle = 'rgba(255, 255, 255, 0.9)';
+        ctx.fillRect(bx, top + 5, boxWidth, 16 * lines.length + 6);
+        ctx.strokeRect(bx, top + 5, boxWidth, 16 * lines.length + 6);
+        ctx.fillStyle = 'black';
+        lines.forEach(function(line, index) { ctx.fillText(line, bx + 6, top + 20 + 16 * index); });
+    }
+}
+function drawVisibleCharts() {
+    for (let item of imageContainer) {
+        if (item.style.display != 'none') {
+            if (item.chart) { renderChart(item.chart); } else { drawChart(item); }
+        }
+    }
+}
+window.addEventListener('resize', drawVisibleCharts);
+"""
+
+
 class HTMLReport:
 
     def __init__(self):
-        self.report = ""
-        self.images = ""
+        # the html of the charts; the key is the position of the chart in the report
+        self.charts = {}
         self.metrics = []
         print("Initialising HTML Report Generation.")
 
-    def addImage(self, plot):
+    def addChart(self, plot, index):
 
         if plot.skipped:
           return
 
-        metric_name = plot.image_path.split('/')[-2]
-
-        encoded_image = ""
-        with open(plot.image_path, "rb") as image_file:
-           encoded_image = str(base64.b64encode(image_file.read()), encoding='utf-8')
-
-        encoded_image = "data:image/png;base64,%s" % encoded_image
-
-        self.images = self.images + '<div class="image-container ' + metric_name + '">'
-        self.images = self.images + '<img src="' + encoded_image + '" onclick="toggleZoom(this);" />'
-        self.images = self.images + '<p class="image-text">' + plot.title + "</p>"
-        self.images = self.images + '</div>'
+        self.charts[index] = HtmlChart(plot).to_html()
 
     def getCSVContents(self):
         contents = []
+        if not os.path.exists(os.path.join(report_dir + "/report.csv")):
+            # no latency info has been found
+            return [report_csv_header]
         with open(os.path.join(report_dir + "/report.csv")) as csvfile:
             line = csvfile.readline()
             while line != '':
@@ -1106,66 +4081,90 @@ class HTMLReport:
 
         return contents
 
+    # Writes the report.html. The page is written to the file as it is generated; it is written to a temporary file
+    # first, so a browser never loads a partially written report.
     def generate(self):
         csvContents = self.getCSVContents()
 
-        self.report = self.report + '<!DOCTYPE html>'
-        self.report = self.report + '<html>'
-        self.report = self.report + '<head>'
-        self.report = self.report + '<style>'
-        self.report = self.report + 'body { background-color: #cdcdcd; text-align: center; } img { width: 40vw; } .images-block { display: block; } h1,h2,h3,h4,h5,h6 { width: 100vw; }'
-        self.report = self.report + '.tabs { display: flex; border-bottom: 1px solid black; margin-bottom: 3vh; } .tab { flex: 33.33%; } .tab:hover, .active-tab { background-color: #dedede; }'
-        self.report = self.report + 'img:hover { cursor: zoom-in; } .zoomin { zoom: 2; -moz-transform: scale(2); } .zoomout { zoom: normal; -moz-transform: scale(1); }'
-        self.report = self.report + 'tr,td { border: 1px solid black; } td { padding: 3px; }'
-        self.report = self.report + '</style>'
-        self.report = self.report + '<body>'
-        self.report = self.report + '<h1>Benchmark Report</h1>'
-        self.report = self.report + '<div class="tabs">'
-        self.report = self.report + '<div class="tab" id="csv" style="border-right: 1px solid black;"><p>Summary</p></div>'
-        self.report = self.report + '<div class="tab" id="throughput" style="border-right: 1px solid black;"><p>Throughput</p></div>'
-        self.report = self.report + '<div class="tab" id="latency" style="border-right: 1px solid black;"><p>Latency</p></div>'
-        self.report = self.report + '<div class="tab" id="dstat"><p>dstat</p></div>'
-        self.report = self.report + '</div>'
-        self.report = self.report + '<div class="images-block">' + self.images + '</div>'
-        self.report = self.report + '<table><tbody>'
-        for i in range(len(csvContents[0].split(','))):
-            self.report = self.report + '<tr>'
-            for j in range(len(csvContents)):
-                self.report = self.report + '<td>' + csvContents[j].split(',')[i].replace('"', '') + '</td>'
-            self.report = self.report + '</tr>'
-        self.report = self.report + '</table></tbody>'
-        self.report = self.report + '<script>'
-        self.report = self.report + "var activeTab = 'throughput'; var throughputdom = document.getElementById('throughput'); var latencydom = document.getElementById('latency');  var dstatdom = document.getElementById('dstat'); var csvdom = document.getElementById('csv'); var imageContainer = document.getElementsByClassName('image-container'); var tabledom = document.getElementsByTagName('table')[0]; "
-        self.report = self.report + "function addClass(classname, element){ while(element.classList.contains(classname)) { element.classList.remove(classname); } element.classList.add(classname); } "
-        self.report = self.report + "function removeClass(classname, element){ while(element.classList.contains(classname)) { element.classList.remove(classname); } } "
-        self.report = self.report + "function filter() { tabledom.style.display = 'none'; for(let item of imageContainer){ if(item.classList.contains(activeTab)) item.style.display='block'; else item.style.display = 'none';} } "
-        self.report = self.report + "function showcsv() { for(let item of imageContainer){ item.style.display = 'none'; } tabledom.style.display = 'inline'; }"
-        self.report = self.report + "throughputdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', dstatdom); removeClass('active-tab', csvdom); activeTab = 'throughput'; filter(); }); "
-        self.report = self.report + "latencydom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', latencydom); removeClass('active-tab', throughputdom); removeClass('active-tab', dstatdom); removeClass('active-tab', csvdom); activeTab = 'latency'; filter(); }); "
-        self.report = self.report + "dstatdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', dstatdom); removeClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', csvdom); activeTab = 'dstat'; filter(); }); "
-        self.report = self.report + "csvdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', csvdom); removeClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', dstatdom); activeTab = 'csv'; showcsv(); }); "
-        self.report = self.report + "csvdom.click(); "
-        self.report = self.report + "function toggleZoom(element){ if(element){ if(element.classList.contains('zoomin')) { removeClass('zoomin', element); addClass('zoomout', element); } else { removeClass('zoomout', element); addClass('zoomin', element); } } } "
-        self.report = self.report + '</script>'
-        self.report = self.report + '</body>'
-        self.report = self.report + '</head>'
-        self.report = self.report + '</html>'
-
         file_name = os.path.join(report_dir + "/report.html")
-        with open(file_name, 'w') as f:
-            f.write(self.report)
+        tmp_file_name = file_name + ".tmp"
+        with open(tmp_file_name, 'w') as f:
+            write = f.write
+            write('<!DOCTYPE html>')
+            write('<html>')
+            write('<head>')
+            write('<meta charset="utf-8">')
+            if watch_seconds:
+                write('<meta http-equiv="refresh" content="' + str(watch_seconds) + '">')
+            write('<style>')
+            write('body { background-color: #cdcdcd; text-align: center; } .chart { width: 80vw; height: 45vw; cursor: crosshair; } .images-block { display: block; } h1,h2,h3,h4,h5,h6 { width: 100vw; }')
+            write('.tabs { display: flex; border-bottom: 1px solid black; margin-bottom: 3vh; } .tab { flex: 33.33%; } .tab:hover, .active-tab { background-color: #dedede; }')
+            write('tr,td { border: 1px solid black; } td { padding: 3px; }')
+            write('</style>')
+            write('<body>')
+            write('<h1>Benchmark Report</h1>')
+            write('<div class="tabs">')
+            write('<div class="tab" id="csv" style="border-right: 1px solid black;"><p>Summary</p></div>')
+            write('<div class="tab" id="throughput" style="border-right: 1px solid black;"><p>Throughput</p></div>')
+            write('<div class="tab" id="latency" style="border-right: 1px solid black;"><p>Latency</p></div>')
+            write('<div class="tab" id="dstat" style="border-right: 1px solid black;"><p>dstat</p></div>')
+            write('<div class="tab" id="gc"><p>gc</p></div>')
+            write('</div>')
+            write('<div class="images-block">')
+            for index in sorted(self.charts):
+                write(self.charts[index])
+            write('</div>')
+            write('<table><tbody>')
+            csvRows = [line.rstrip('\n').split(',') for line in csvContents]
+            for i in range(len(csvRows[0])):
+                write('<tr>')
+                for row in csvRows:
+                    # a row can be shorter than the header, e.g. if the distribution lacks a percentile
+                    write('<td>' + (row[i].replace('"', '') if i < len(row) else '') + '</td>')
+                write('</tr>')
+            write('</table></tbody>')
+            write('<script>')
+            write("var activeTab = 'throughput'; var throughputdom = document.getElementById('throughput'); var latencydom = document.getElementById('latency');  var dstatdom = document.getElementById('dstat'); var gcdom = document.getElementById('gc'); var csvdom = document.getElementById('csv'); var imageContainer = document.getElementsByClassName('image-container'); var tabledom = document.getElementsByTagName('table')[0]; ")
+            write(HTML_CHART_SCRIPT)
+            write("function addClass(classname, element){ while(element.classList.contains(classname)) { element.classList.remove(classname); } element.classList.add(classname); } ")
+            write("function removeClass(classname, element){ while(element.classList.contains(classname)) { element.classList.remove(classname); } } ")
+            write("function filter() { sessionStorage.setItem('activeTab', activeTab); tabledom.style.display = 'none'; for(let item of imageContainer){ if(item.classList.contains(activeTab)) item.style.display='block'; else item.style.display = 'none';} drawVisibleCharts(); } ")
+            write("function showcsv() { sessionStorage.setItem('activeTab', activeTab); for(let item of imageContainer){ item.style.display = 'none'; } tabledom.style.display = 'inline'; }")
+            write("throughputdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', dstatdom); removeClass('active-tab', csvdom); removeClass('active-tab', gcdom); activeTab = 'throughput'; filter(); }); ")
+            write("latencydom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', latencydom); removeClass('active-tab', throughputdom); removeClass('active-tab', dstatdom); removeClass('active-tab', csvdom); removeClass('active-tab', gcdom); activeTab = 'latency'; filter(); }); ")
+            write("dstatdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', dstatdom); removeClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', csvdom); removeClass('active-tab', gcdom); activeTab = 'dstat'; filter(); }); ")
+            write("gcdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', gcdom); removeClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', dstatdom); removeClass('active-tab', csvdom); activeTab = 'gc'; filter(); }); ")
+            write("csvdom.addEventListener('click', function(e){ e.preventDefault(); addClass('active-tab', csvdom); removeClass('active-tab', throughputdom); removeClass('active-tab', latencydom); removeClass('active-tab', dstatdom); removeClass('active-tab', gcdom); activeTab = 'csv'; showcsv(); }); ")
+            # the active tab is kept when the page is reloaded, e.g. by the refresh in watch mode
+            write("var storedTab = sessionStorage.getItem('activeTab'); (storedTab ? document.getElementById(storedTab) : csvdom).click(); ")
+            write('</script>')
+            write('</body>')
+            write('</head>')
+            write('</html>')
+        os.replace(tmp_file_name, file_name)
 
         file_url = "file://" + file_name
         # print a clickable link to report file
         print(f"HTML report generated at: \u001b]8;;{file_url}\u001b\\{file_url}\u001b]8;;\u001b\\")
 
-if os.path.isdir('report'):
-    shutil.rmtree('report')
+if __name__ == '__main__':
+    print("Report directory '" + report_dir + "'")
+
+    if os.path.isdir('report'):
+        shutil.rmtree('report')
+
+    htmlReport = HTMLReport()
+    with make_executor() as executor:
+        comparison = Comparison(executor)
+        if watch_seconds:
+            comparison.watch(executor)
+        else:
+            comparison.make(executor)
+            with profile.phase("html"):
+                htmlReport.generate()
 
-htmlReport = HTMLReport()
-comparison = Comparison()
-comparison.make()
-htmlReport.generate()
+    if not args.full and comparison.gc_logs_found():
+        print("gc.log files have been found. Run with -f option to get the gc plots of every worker as well.")
 
-if not args.full and gc_logs_found:
-    print("gc.log files have been found. Run with -f option to get these plotted.")
+    if args.profile:
+        profile.report()
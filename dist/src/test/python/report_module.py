@@ -0,0 +1,55 @@
+# Loads the benchmark-report script as a module, so the tests can call its functions. The script parses its command
+# line and reads SIMULATOR_HOME when it is loaded; both are provided here. The tests are run with:
+#   python3 -m unittest discover -s dist/src/test/python
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.normpath(os.path.join(TEST_DIR, "..", "..", "main", "dist"))
+SCRIPT_PATH = os.path.join(DIST_DIR, "conf", "benchmark-report.py")
+RESOURCES_DIR = os.path.normpath(os.path.join(TEST_DIR, "..", "resources", "benchmark-report"))
+
+# the dates in the output files are in the local time zone
+os.environ["TZ"] = "UTC"
+time.tzset()
+
+modules = {}
+
+
+# Returns the benchmark-report module. Without NumPy the module is loaded as if NumPy isn't installed, so its
+# columns are backed by the stdlib array module.
+def load(use_numpy=True):
+    module = modules.get(use_numpy)
+    if module is not None:
+        return module
+
+    name = "benchmark_report" if use_numpy else "benchmark_report_without_numpy"
+    spec = importlib.util.spec_from_file_location(name, SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+
+    argv = sys.argv
+    saved_numpy = sys.modules.get("numpy")
+    sys.argv = ["benchmark-report.py", "--no-cache", "-o", tempfile.mkdtemp(), "benchmark"]
+    os.environ.setdefault("SIMULATOR_HOME", DIST_DIR)
+    if not use_numpy:
+        # a None entry makes 'import numpy' raise an ImportError
+        sys.modules["numpy"] = None
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.argv = argv
+        if not use_numpy:
+            if saved_numpy is None:
+                del sys.modules["numpy"]
+            else:
+                sys.modules["numpy"] = saved_numpy
+    modules[use_numpy] = module
+    return module
+
+
+def resource(*names):
+    return os.path.join(RESOURCES_DIR, *names)
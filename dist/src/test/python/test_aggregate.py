@@ -0,0 +1,130 @@
+import math
+import unittest
+
+import report_module
+
+
+class AggregateTest(unittest.TestCase):
+    use_numpy = True
+
+    def setUp(self):
+        self.report = report_module.load(self.use_numpy)
+
+    def source(self, times, values):
+        return self.report.to_column(times), self.report.to_column(values)
+
+    def assertColumns(self, expected_times, expected_values, columns):
+        times, values = columns
+        self.assertEqual(expected_times, times.tolist())
+        self.assertEqual([None if value is None else round(value, 6) for value in expected_values],
+                         [None if math.isnan(value) else round(value, 6) for value in values.tolist()])
+
+    def test_sources_out_of_phase(self):
+        first = self.source([10.5, 11.5, 12.5, 13.5], [100.0] * 4)
+        second = self.source([10.0, 11.0, 12.0, 13.0, 14.0], [50.0] * 5)
+
+        # the first and the last second are only covered completely by the second source
+        self.assertColumns([9.0, 10.0, 11.0, 12.0, 13.0], [100.0, 150.0, 150.0, 150.0, 100.0],
+                           self.report.aggregate([first, second]))
+
+    def test_gap(self):
+        source = self.source([1.0, 2.0, 3.0, 4.0, 5.0, 20.0, 21.0, 22.0], [10.0] * 8)
+
+        # the sample after the gap only covers the usual interval of 1 second
+        self.assertColumns([float(time) for time in range(0, 22)],
+                           [10.0] * 5 + [None] * 14 + [10.0] * 3,
+                           self.report.aggregate([source]))
+
+    def test_missing_sample(self):
+        # the sample at 3 is missing; the sample at 4 covers 2 seconds
+        source = self.source([1.0, 2.0, 4.0, 5.0], [10.0, 10.0, 20.0, 10.0])
+
+        self.assertColumns([0.0, 1.0, 2.0, 3.0, 4.0], [10.0, 10.0, 20.0, 20.0, 10.0],
+                           self.report.aggregate([source]))
+
+    def test_nan_values_are_left_out(self):
+        source = self.source([1.0, 2.0, 3.0], [10.0, math.nan, 10.0])
+
+        # without the NaN the usual interval is 2 seconds, so the first sample covers 2 seconds as well
+        self.assertColumns([-1.0, 0.0, 1.0, 2.0], [10.0] * 4, self.report.aggregate([source]))
+
+    def test_amounts(self):
+        source = self.source([1.0, 2.0, 3.0], [5.0, 6.0, 7.0])
+
+        self.assertColumns([0.0, 1.0, 2.0], [5.0, 6.0, 7.0], self.report.aggregate([source], is_amount=True))
+
+    def test_amounts_without_gaps(self):
+        source = self.source([1.0, 2.0, 3.0, 30.0], [1.0, 1.0, 1.0, 27.0])
+
+        # with gaps, the last amount is all in its last second
+        self.assertColumns([0.0, 1.0, 2.0] + [float(time) for time in range(3, 30)],
+                           [1.0, 1.0, 1.0] + [None] * 26 + [27.0],
+                           self.report.aggregate([source], is_amount=True))
+        # without gaps, the last amount is spread over the time since the previous sample
+        self.assertColumns([float(time) for time in range(0, 30)], [1.0] * 30,
+                           self.report.aggregate([source], is_amount=True, gaps=False))
+
+    def test_mean(self):
+        first = self.source([1.0, 2.0, 3.0, 4.0], [10.0] * 4)
+        second = self.source([1.0, 2.0], [30.0] * 2)
+
+        # the mean only has the sources that cover the second
+        self.assertColumns([0.0, 1.0, 2.0, 3.0], [20.0, 20.0, 10.0, 10.0],
+                           self.report.aggregate([first, second], mean=True))
+
+    def test_bucket_seconds(self):
+        source = self.source([1.0, 2.0, 3.0, 4.0], [10.0, 20.0, 30.0, 40.0])
+
+        self.assertColumns([0.0, 2.0], [15.0, 35.0], self.report.aggregate([source], bucket_seconds=2))
+
+    def test_no_sources(self):
+        self.assertColumns([], [], self.report.aggregate([]))
+        self.assertColumns([], [], self.report.aggregate([self.source([], [])]))
+
+    def test_bucket_sum(self):
+        first = self.source([10.2, 10.7, 13.5], [1.0, 2.0, 3.0])
+        second = self.source([11.1], [4.0])
+
+        # the seconds without values in between are 0
+        self.assertColumns([10.0, 11.0, 12.0, 13.0], [3.0, 4.0, 0.0, 3.0], self.report.bucket_sum([first, second]))
+
+    def test_start_time(self):
+        first = self.source([float(time) + 0.5 for time in range(1, 60)], [100.0] * 59)
+        second = self.source([float(time) for time in range(1, 60, 2)], [float(time) for time in range(1, 60, 2)])
+        times, values = self.report.aggregate([first, second])
+
+        # from the start time on, the result is the end of the result over all samples
+        start = times.tolist().index(40.0)
+        self.assertColumns(times.tolist()[start:], values.tolist()[start:],
+                           self.report.aggregate([first, second], start_time=40.0))
+
+    def test_usual_interval(self):
+        # only the first intervals make the usual interval, so it doesn't change when samples are appended
+        times = [float(time) for time in range(0, 33)] + [float(time) for time in range(35, 1000, 3)]
+        source = self.source(times, [1.0] * len(times))
+
+        self.assertEqual(1.0, self.report.usual_interval(*source))
+
+    def test_bucket_sum_start_time(self):
+        source = self.source([10.2, 13.5, 14.1], [1.0, 3.0, 4.0])
+
+        # the result starts at the bucket of the start time
+        self.assertColumns([12.0, 13.0, 14.0], [0.0, 3.0, 4.0], self.report.bucket_sum([source], start_time=12.5))
+
+    def test_downsample(self):
+        values = [float((time * 7919) % 101) for time in range(1000)]
+        values[500:520] = [math.nan] * 20
+        times, values = self.report.downsample(*self.source(range(1000), values), 100)
+
+        # the buckets have 32 points, of which the minimum and the maximum are kept
+        self.assertLessEqual(len(times), 100)
+        self.assertEqual(0.0, times[0])
+        self.assertFalse(any(math.isnan(value) for value in values.tolist()))
+
+
+class AggregateWithoutNumpyTest(AggregateTest):
+    use_numpy = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import report_module
+
+WORKER_NAMES = ["A1_W1-10.0.0.1-member", "A1_W2-10.0.0.1-member"]
+PROBE = "test1-probe1"
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.report = report_module.load()
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = self.report.Cache(self.cache_dir, 1024 * 1024)
+
+    def tearDown(self):
+        self.report.cache = None
+        shutil.rmtree(self.cache_dir)
+
+    def test_store_and_load(self):
+        key = self.cache.key("test", report_module.SCRIPT_PATH, 1)
+        self.cache.store(key, {"rows": 3}, {"times": ('d', [1.0, 2.0, 3.0]), "counts": ('q', [4, 5, 6])})
+
+        meta, arrays = self.cache.load(key)
+
+        self.assertEqual({"rows": 3}, meta)
+        self.assertEqual([1.0, 2.0, 3.0], arrays["times"].tolist())
+        self.assertEqual([4, 5, 6], arrays["counts"].tolist())
+
+    def test_key(self):
+        self.assertNotEqual(self.cache.key("test", report_module.SCRIPT_PATH, 1),
+                            self.cache.key("test", report_module.SCRIPT_PATH, 2))
+        self.assertIsNone(self.cache.key("test", os.path.join(self.cache_dir, "missing")))
+        self.assertIsNone(self.cache.files_key("test", [report_module.SCRIPT_PATH,
+                                                        os.path.join(self.cache_dir, "missing")]))
+
+    def test_load_invalid_entry(self):
+        key = self.cache.key("test", report_module.SCRIPT_PATH)
+        with open(os.path.join(self.cache_dir, key + ".bin"), "wb") as f:
+            f.write(b"NOTCACHE" + bytes(64))
+
+        self.assertIsNone(self.cache.load(key))
+
+    def test_evict(self):
+        cache = self.report.Cache(self.cache_dir, 3000)
+        keys = [cache.key("test", report_module.SCRIPT_PATH, k) for k in range(4)]
+        for key in keys:
+            cache.store(key, {}, {"values": ('d', [0.0] * 128)})
+
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, file_name)) for file_name in os.listdir(self.cache_dir)]
+        self.assertLess(len(sizes), len(keys))
+        self.assertEqual(sum(sizes), cache.size)
+        self.assertLessEqual(cache.size, 3000)
+
+    def test_process_hdr_probe(self):
+        self.report.cache = self.cache
+        hdr_files = [report_module.resource("hdr", worker_name, PROBE + ".hdr") for worker_name in WORKER_NAMES]
+        rows = []
+        outputs = []
+        for run in range(2):
+            output_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, output_dir)
+            worker_output_paths = [os.path.join(output_dir, worker_name) for worker_name in WORKER_NAMES]
+            merged_path = os.path.join(output_dir, PROBE)
+            rows.append(self.report.process_hdr_probe("session", hdr_files, worker_output_paths, merged_path,
+                                                      1600000001689, 1600000008000))
+            output = {}
+            for path in worker_output_paths + [merged_path]:
+                for file_path in [path, path + ".hgrm"]:
+                    with open(file_path) as f:
+                        output[os.path.basename(file_path)] = f.read()
+            outputs.append(output)
+
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual(outputs[0], outputs[1])
+        # the processed probe is cached next to the decoded .hdr files
+        self.assertEqual(3, len(os.listdir(self.cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import report_module
+
+
+class CsvScanTest(unittest.TestCase):
+    use_numpy = True
+
+    def setUp(self):
+        self.report = report_module.load(self.use_numpy)
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.report.cache = None
+        shutil.rmtree(self.work_dir)
+
+    def csv_file(self, content):
+        path = os.path.join(self.work_dir, "performance.csv")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def scan(self, content, skip_lines=1):
+        return self.report.CsvScan(self.csv_file(content), skip_lines)
+
+    def test_columns(self):
+        scan = self.scan("time,operations,name\n1,10,a\n2,20,b\n3,30,c\n")
+
+        self.assertFalse(scan.ragged)
+        self.assertEqual(3, scan.width)
+        self.assertEqual([1.0, 2.0, 3.0], scan.column(0).tolist())
+        self.assertEqual([10.0, 20.0, 30.0], scan.column(1).tolist())
+
+    def test_skip_lines(self):
+        scan = self.scan("header\nsecond header\n1,10\n2,20\n", 2)
+
+        self.assertEqual([1.0, 2.0], scan.column(0).tolist())
+
+    def test_non_numeric_column(self):
+        scan = self.scan("time,operations,name\n1,10,a\n2,20,b\n")
+
+        self.assertRaises(ValueError, scan.column, 2)
+
+    def test_missing_column(self):
+        scan = self.scan("time,operations\n1,10\n2,20\n")
+
+        self.assertTrue(all(math.isnan(v) for v in scan.column(5).tolist()))
+        self.assertEqual(2, len(scan.column(5)))
+
+    def test_missing_file(self):
+        scan = self.report.CsvScan(os.path.join(self.work_dir, "missing.csv"), 1)
+
+        self.assertEqual(0, scan.width)
+        self.assertEqual([], scan.column(0).tolist())
+
+    def test_ragged_rows(self):
+        # the last line is partially written
+        scan = self.scan("time,operations\n1,10\n2,20\n3\n")
+
+        self.assertTrue(scan.ragged)
+        self.assertEqual([1.0, 2.0, 3.0], scan.column(0).tolist())
+        values = scan.column(1).tolist()
+        self.assertEqual([10.0, 20.0], values[:2])
+        self.assertTrue(math.isnan(values[2]))
+
+    def test_select_skips_short_rows(self):
+        scan = self.scan("time,operations\n1,10\n2\n3,30\n")
+
+        times, values = scan.select([0, 1])
+
+        self.assertEqual([1.0, 3.0], times.tolist())
+        self.assertEqual([10.0, 30.0], values.tolist())
+
+    def test_select_with_skip_value(self):
+        scan = self.scan("time,operations,throughput\n1,10,0\n2,20,5\n3,30,0\n4\n")
+
+        times, values = scan.select([0, 2], skip_value=0.0)
+
+        self.assertEqual([2.0], times.tolist())
+        self.assertEqual([5.0], values.tolist())
+
+    def test_select_without_skipped_rows(self):
+        scan = self.scan("time,operations\n1,10\n2,20\n")
+
+        times, values = scan.select([0, 1], skip_value=-1.0)
+
+        self.assertEqual([1.0, 2.0], times.tolist())
+        self.assertEqual([10.0, 20.0], values.tolist())
+
+    def test_cached_scan(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.report.cache = self.report.Cache(cache_dir, 1024 * 1024)
+        path = self.csv_file("time,operations,name\n1,10,a\n2,20,b\n3\n")
+
+        scanned = self.report.CsvScan(path, 1)
+        scanned_rows = scanned.select([0, 1])
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+        loaded = self.report.CsvScan(path, 1)
+
+        self.assertEqual((scanned.width, scanned.ragged), (loaded.width, loaded.ragged))
+        self.assertEqual([column.tolist() for column in scanned_rows],
+                         [column.tolist() for column in loaded.select([0, 1])])
+        self.assertRaises(ValueError, loaded.column, 2)
+
+    def test_tmp_files_are_not_cached(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.report.cache = self.report.Cache(cache_dir, 1024 * 1024)
+        tmp_dir = os.path.join(self.report.report_dir, "tmp", "1")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.addCleanup(shutil.rmtree, os.path.join(self.report.report_dir, "tmp"))
+        path = os.path.join(tmp_dir, "probe")
+        with open(path, "w") as f:
+            f.write("header\nheader\nheader\n1,2,3\n")
+
+        scan = self.report.CsvScan(path, 3)
+
+        self.assertEqual([3.0], scan.column(2).tolist())
+        self.assertEqual([], os.listdir(cache_dir))
+
+
+class CsvScanWithoutNumpyTest(CsvScanTest):
+    use_numpy = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import base64
+import math
+import struct
+import unittest
+
+import report_module
+
+
+class DownsampleTest(unittest.TestCase):
+    use_numpy = True
+
+    def setUp(self):
+        self.report = report_module.load(self.use_numpy)
+
+    def column(self, values):
+        return self.report.to_column(values)
+
+    def test_bucket_size(self):
+        self.assertEqual(1, self.report.downsample_bucket_size(100, 200))
+        self.assertEqual(2, self.report.downsample_bucket_size(100, 100))
+        # the bucket size is a power of 2 that makes at most max_points / 2 buckets
+        self.assertEqual(4, self.report.downsample_bucket_size(101, 100))
+        self.assertEqual(32, self.report.downsample_bucket_size(1000, 100))
+        self.assertEqual(1024, self.report.downsample_bucket_size(1000, 2))
+
+    def test_extreme_indices(self):
+        values = self.column([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0, 3.0])
+
+        self.assertEqual([(1, 2), (6, 5), (9, 8)], self.report.extreme_indices(values, 0, 10, 4))
+        # the last bucket is shorter
+        self.assertEqual([(3, 5), (9, 7)], self.report.extreme_indices(values, 3, 10, 4))
+        self.assertEqual([], self.report.extreme_indices(values, 5, 5, 4))
+
+    def test_extreme_indices_ties(self):
+        values = self.column([2.0, 2.0, 2.0, 2.0])
+
+        self.assertEqual([(0, 0), (2, 2)], self.report.extreme_indices(values, 0, 4, 2))
+
+    def test_extreme_indices_nan(self):
+        nan = math.nan
+        values = self.column([nan, 2.0, 1.0, nan, nan, nan])
+
+        # a NaN is only an extreme of a bucket without any other values
+        self.assertEqual([(2, 1), (3, 3)], self.report.extreme_indices(values, 0, 6, 3))
+
+    def test_merge_extreme_indices(self):
+        values = self.column([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0, 3.0])
+        buckets = self.report.extreme_indices(values, 0, 10, 2)
+
+        merged = self.report.merge_extreme_indices(values, buckets)
+
+        # merging pairs of buckets is the same as taking the extremes of buckets twice the size; the last bucket
+        # without a pair is left out
+        self.assertEqual(self.report.extreme_indices(values, 0, 8, 4), merged)
+
+    def test_merge_extreme_indices_nan(self):
+        nan = math.nan
+        values = self.column([nan, nan, 2.0, 1.0])
+
+        self.assertEqual([(3, 2)], self.report.merge_extreme_indices(values, [(0, 0), (3, 2)]))
+
+    def test_bucket_indices(self):
+        self.assertEqual([1, 2, 6, 9], self.report.bucket_indices([(1, 2), (6, 6), (9, 9)]))
+        # the indices of a bucket are sorted
+        self.assertEqual([4, 5], self.report.bucket_indices([(5, 4)]))
+
+    def test_downsample(self):
+        times = self.column([float(time) for time in range(1000)])
+        values = self.column([float((time * 7919) % 101) for time in range(1000)])
+
+        downsampled_times, downsampled_values = self.report.downsample(times, values, 100)
+
+        self.assertLessEqual(len(downsampled_times), 100)
+        self.assertEqual(len(downsampled_times), len(downsampled_values))
+        self.assertEqual(sorted(downsampled_times.tolist()), downsampled_times.tolist())
+        # the peaks are kept
+        self.assertEqual(max(values.tolist()), max(downsampled_values.tolist()))
+        self.assertEqual(min(values.tolist()), min(downsampled_values.tolist()))
+        for time, value in zip(downsampled_times.tolist(), downsampled_values.tolist()):
+            self.assertEqual(values[int(time)], value)
+
+    def test_downsample_short_series(self):
+        times = self.column([1.0, 2.0, 3.0])
+        values = self.column([4.0, 5.0, 6.0])
+
+        downsampled_times, downsampled_values = self.report.downsample(times, values, 3)
+
+        self.assertEqual([1.0, 2.0, 3.0], downsampled_times.tolist())
+        self.assertEqual([4.0, 5.0, 6.0], downsampled_values.tolist())
+
+    def test_float32_base64(self):
+        encoded = self.report.float32_base64(self.column([1.0, -2.5, 0.1]))
+
+        data = base64.b64decode(encoded)
+        # little endian, whatever the byte order of the platform
+        self.assertEqual(b"\x00\x00\x80\x3f", data[0:4])
+        self.assertEqual([1.0, -2.5, struct.unpack("<f", struct.pack("<f", 0.1))[0]],
+                         list(struct.unpack("<3f", data)))
+
+    def test_float32_base64_empty(self):
+        self.assertEqual("", self.report.float32_base64(self.column([])))
+
+
+class DownsampleWithoutNumpyTest(DownsampleTest):
+    use_numpy = False
+
+
+if __name__ == '__main__':
+    unittest.main()
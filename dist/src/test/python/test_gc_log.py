@@ -0,0 +1,91 @@
+# The expected files in resources/benchmark-report/gc/expected have a row for every pause of the gc.log with the
+# same name; the values are the repr of the parsed floats.
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import report_module
+
+GC_LOG_NAMES = ["jdk8-parallel", "jdk8-cms", "jdk8-g1", "unified-parallel", "unified-cms", "unified-g1", "unified-zgc"]
+
+
+class GcLogParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.report = report_module.load()
+
+    def parse(self, name):
+        parser = self.report.GcLogParser()
+        with open(report_module.resource("gc", name + ".log")) as f:
+            for line in f:
+                parser.parse_line(line)
+        parser.close()
+        return parser
+
+    def test_parse(self):
+        for name in GC_LOG_NAMES:
+            with self.subTest(name):
+                columns = self.parse(name).columns
+                rows = [",".join(self.report.GC_LOG_COLUMNS)]
+                for row in range(len(columns["time"])):
+                    rows.append(",".join(repr(columns[column][row]) for column in self.report.GC_LOG_COLUMNS))
+                with open(report_module.resource("gc", "expected", name + ".csv")) as f:
+                    self.assertEqual(f.read().splitlines(), rows)
+
+    def test_sizes_of_a_gc_without_pause_are_dropped(self):
+        parser = self.report.GcLogParser()
+        for line in ["[0.012s][info][gc,heap] Heap region size: 1M",
+                     "[1.000s][info][gc,heap] GC(0) Old regions: 5->5",
+                     "[1.000s][info][gc,heap] GC(1) Old regions: 2->3",
+                     "[1.000s][info][gc] GC(1) Pause Young (Normal) (G1 Evacuation Pause) 10M->4M(100M) 1.000ms",
+                     "[2.000s][info][gc,heap] GC(2) Old regions: 7->7",
+                     "[3.000s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 10M->4M(100M) 1.000ms"]:
+            parser.parse_line(line)
+        parser.close()
+        columns = parser.columns
+
+        # the old regions of gc 0 and 2 belong to gcs without a pause, so the old generation of gc 3 is unknown
+        self.assertEqual(2 * 1024 ** 2, columns["old_size_before_gc"][0])
+        self.assertEqual(3 * 1024 ** 2, columns["old_size_after_gc"][0])
+        self.assertTrue(math.isnan(columns["old_size_before_gc"][1]))
+        self.assertTrue(math.isnan(columns["old_size_after_gc"][1]))
+
+    def test_date_stamps(self):
+        self.assertTrue(self.parse("jdk8-parallel").has_date_stamps)
+        self.assertTrue(self.parse("unified-parallel").has_date_stamps)
+        self.assertFalse(self.parse("unified-g1").has_date_stamps)
+
+
+class GcLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.report = report_module.load()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_times_without_date_stamps(self):
+        path = os.path.join(self.directory, "gc.log")
+        shutil.copy(report_module.resource("gc", "unified-g1.log"), path)
+        # the last pause is at an uptime of 2.55 seconds
+        os.utime(path, (1600000010.55, 1600000010.55))
+
+        times, values = self.report.GcLog(path).select("pause_time")
+
+        self.assertEqual([1600000009.245, 1600000010.55], [round(time, 3) for time in times.tolist()])
+        self.assertEqual([0.011203, 0.05], values.tolist())
+
+    def test_times_with_date_stamps(self):
+        times, values = self.report.GcLog(report_module.resource("gc", "jdk8-parallel.log")).select("promotion")
+
+        # the full gc has no promotion
+        self.assertEqual([1622503154.123, 1622503155.123], times.tolist())
+        self.assertEqual([8 * 1024.0, 9256 * 1024.0], values.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
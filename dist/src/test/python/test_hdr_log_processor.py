@@ -0,0 +1,80 @@
+# The expected files in resources/benchmark-report/hdr/expected are the output of the HistogramTrimmer,
+# HistogramLogMerger, SimulatorHistogramLogProcessor and ReportCsv tools for the .hdr files of two workers, trimmed
+# to the window below. resources/benchmark-report/hdr/generate-expected.sh writes them with these Java tools; run it
+# with a built distribution as SIMULATOR_HOME when the inputs or the window change. The files that are checked in were
+# written by this script and checked against the HdrHistogram library, with the percentiles rounded up as
+# HdrHistogram 2.1.12 does, until they are regenerated with the Java tools.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import report_module
+
+WORKER_NAMES = ["A1_W1-10.0.0.1-member", "A1_W2-10.0.0.1-member"]
+PROBE = "test1-probe1"
+# the first interval of the second worker and the last interval of both workers are outside the window
+START_MILLIS = 1600000001689
+END_MILLIS = 1600000008000
+
+
+class HdrLogProcessorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.report = report_module.load()
+        self.output_dir = tempfile.mkdtemp()
+        self.report.report_dir = self.output_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def assertSameFile(self, expected_path, path):
+        with open(expected_path) as f:
+            expected = f.read()
+        with open(path) as f:
+            self.assertEqual(expected, f.read(), path)
+
+    def test_process_hdr_probe(self):
+        hdr_files = [report_module.resource("hdr", worker_name, PROBE + ".hdr") for worker_name in WORKER_NAMES]
+        worker_output_paths = []
+        for worker_name in WORKER_NAMES:
+            os.mkdir(os.path.join(self.output_dir, worker_name))
+            worker_output_paths.append(os.path.join(self.output_dir, worker_name, PROBE))
+        merged_path = os.path.join(self.output_dir, PROBE)
+
+        row = self.report.process_hdr_probe("session", hdr_files, worker_output_paths, merged_path,
+                                            START_MILLIS, END_MILLIS)
+        self.report.append_report_csv(row)
+
+        for path in worker_output_paths + [merged_path]:
+            relative_path = os.path.relpath(path, self.output_dir)
+            self.assertSameFile(report_module.resource("hdr", "expected", relative_path), path)
+            self.assertSameFile(report_module.resource("hdr", "expected", relative_path + ".hgrm"), path + ".hgrm")
+        self.assertSameFile(report_module.resource("hdr", "expected", "report.csv"),
+                            os.path.join(self.output_dir, "report.csv"))
+
+    def test_process_hdr_probe_without_intervals(self):
+        hdr_files = [report_module.resource("hdr", WORKER_NAMES[0], PROBE + ".hdr")]
+        worker_output_paths = [os.path.join(self.output_dir, "worker")]
+        merged_path = os.path.join(self.output_dir, PROBE)
+
+        row = self.report.process_hdr_probe("session", hdr_files, worker_output_paths, merged_path,
+                                            END_MILLIS, END_MILLIS)
+
+        self.assertIsNone(row)
+        self.assertTrue(os.path.exists(merged_path + ".hgrm"))
+
+    def test_java_double(self):
+        java_double = self.report.java_double
+        self.assertEqual("0.0", java_double(0.0))
+        self.assertEqual("12345.678", java_double(12345.678))
+        self.assertEqual("1.0E7", java_double(1e7))
+        self.assertEqual("1.2345678E7", java_double(12345678.0))
+        self.assertEqual("1.0E-4", java_double(0.0001))
+        self.assertEqual("NaN", java_double(float("nan")))
+        self.assertEqual("Infinity", java_double(float("inf")))
+
+
+if __name__ == '__main__':
+    unittest.main()
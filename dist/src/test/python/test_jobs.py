@@ -0,0 +1,56 @@
+import filecmp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import report_module
+
+PERF_SCRIPT_PATH = os.path.join(os.path.dirname(report_module.SCRIPT_PATH), "benchmark-report-perf.py")
+
+
+class JobsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.session_dir = os.path.join(self.work_dir, "session")
+        subprocess.run([sys.executable, PERF_SCRIPT_PATH, "session", "--workers", "4", "--agents", "2",
+                        "--duration", "60", "--tests", "2", self.session_dir],
+                       check=True, stdout=subprocess.DEVNULL)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    # Makes the report with the given number of jobs. The reports are written to the same directory, since the
+    # gnuplot scripts contain the paths of their files.
+    def report(self, jobs):
+        output_dir = os.path.join(self.work_dir, "report")
+        env = dict(os.environ, SIMULATOR_HOME=report_module.DIST_DIR)
+        subprocess.run([sys.executable, report_module.SCRIPT_PATH, self.session_dir, "-f", "--no-cache",
+                        "-j", str(jobs), "-o", output_dir],
+                       check=True, cwd=self.work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        target_dir = os.path.join(self.work_dir, "report-" + str(jobs))
+        os.rename(output_dir, target_dir)
+        return target_dir
+
+    def assertSameDirectory(self, expected_dir, actual_dir):
+        comparison = filecmp.dircmp(expected_dir, actual_dir)
+        self.assertEqual([], comparison.left_only + comparison.right_only, actual_dir)
+        for file_name in comparison.common_files:
+            self.assertTrue(filecmp.cmp(os.path.join(expected_dir, file_name), os.path.join(actual_dir, file_name),
+                                        shallow=False), os.path.join(actual_dir, file_name))
+        for directory in comparison.common_dirs:
+            self.assertSameDirectory(os.path.join(expected_dir, directory), os.path.join(actual_dir, directory))
+
+    def test_parallel_report_is_the_same_as_the_serial_report(self):
+        serial_dir = self.report(1)
+        parallel_dir = self.report(4)
+
+        self.assertTrue(os.path.exists(os.path.join(serial_dir, "report.csv")))
+        self.assertSameDirectory(serial_dir, parallel_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
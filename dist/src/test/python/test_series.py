@@ -0,0 +1,105 @@
+import pickle
+import unittest
+
+import report_module
+
+
+class SeriesTest(unittest.TestCase):
+    use_numpy = True
+
+    def setUp(self):
+        self.report = report_module.load(self.use_numpy)
+
+    def series(self, times, values):
+        return self.report.Series("test", "Operations/sec", False, False, times=times, values=values)
+
+    def test_columns(self):
+        series = self.series([1.0, 2.0, 3.0], ["4", "5.5", "6"])
+
+        self.assertEqual(3, series.length())
+        self.assertEqual([1.0, 2.0, 3.0], series.times.tolist())
+        self.assertEqual([4.0, 5.5, 6.0], series.values.tolist())
+        self.assertEqual(1.0, series.start_time())
+        self.assertEqual(3.0, series.end_time())
+
+    def test_min_max(self):
+        series = self.series([1.0, 2.0, 3.0, 4.0], [5.0, -2.5, 7.25, 0.0])
+
+        self.assertEqual(-2.5, series.min())
+        self.assertEqual(7.25, series.max())
+        self.assertIsInstance(series.min(), float)
+        self.assertIsInstance(series.max(), float)
+
+    def test_empty(self):
+        series = self.series(None, None)
+
+        self.assertTrue(series.is_empty())
+        self.assertEqual(0, series.length())
+        self.assertIsNone(series.start_time())
+        self.assertIsNone(series.end_time())
+        self.assertIsNone(series.min())
+        self.assertIsNone(series.max())
+        series.trim(1.0, 2.0)
+        self.assertTrue(series.is_empty())
+
+    def test_trim(self):
+        series = self.series([1.0, 2.0, 3.0, 4.0, 5.0], [10.0, 20.0, 30.0, 40.0, 50.0])
+
+        # both bounds are inclusive; the bounds may be strings, like the times of a period
+        series.trim("2", 4.0)
+
+        self.assertEqual([2.0, 3.0, 4.0], series.times.tolist())
+        self.assertEqual([20.0, 30.0, 40.0], series.values.tolist())
+
+    def test_trim_in_between_times(self):
+        series = self.series([1.0, 2.0, 3.0, 4.0], [10.0, 20.0, 30.0, 40.0])
+
+        series.trim(1.5, 3.5)
+
+        self.assertEqual([2.0, 3.0], series.times.tolist())
+        self.assertEqual([20.0, 30.0], series.values.tolist())
+
+    def test_trim_without_bounds(self):
+        series = self.series([1.0, 2.0, 3.0], [10.0, 20.0, 30.0])
+
+        series.trim(None, 2.0)
+        self.assertEqual([1.0, 2.0], series.times.tolist())
+        series.trim(2.0, None)
+        self.assertEqual([2.0], series.times.tolist())
+
+    def test_trim_outside_of_the_series(self):
+        before = self.series([1.0, 2.0], [10.0, 20.0])
+        before.trim(3.0, 4.0)
+        after = self.series([1.0, 2.0], [10.0, 20.0])
+        after.trim(-1.0, 0.5)
+
+        self.assertTrue(before.is_empty())
+        self.assertTrue(after.is_empty())
+        self.assertEqual([], after.values.tolist())
+
+    def test_pickle(self):
+        series = self.series([1.0, 2.0], [10.0, 20.0])
+        series.trim(2.0, None)
+
+        # the module is loaded from a path, so the state is restored like pickle would
+        copy = self.report.Series.__new__(self.report.Series)
+        copy.__setstate__(pickle.loads(pickle.dumps(series.__getstate__())))
+
+        self.assertEqual([2.0], copy.times.tolist())
+        self.assertEqual([20.0], copy.values.tolist())
+
+
+class SeriesWithoutNumpyTest(SeriesTest):
+    use_numpy = False
+
+    def test_columns_are_memoryviews(self):
+        series = self.series([1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
+        series.trim(2.0, 3.0)
+
+        self.assertIsInstance(series.times, memoryview)
+        self.assertIsInstance(series.values, memoryview)
+        self.assertEqual('d', series.values.format)
+
+
+if __name__ == '__main__':
+    unittest.main()
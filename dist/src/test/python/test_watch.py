@@ -0,0 +1,160 @@
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import report_module
+
+
+class WatchedSeriesTest(unittest.TestCase):
+    use_numpy = True
+
+    def setUp(self):
+        self.report = report_module.load(self.use_numpy)
+        self.inputs = []
+        for worker in range(3):
+            times = [1600000000.0 + second + 0.25 * worker for second in range(400)]
+            values = [float((second * 7919 + worker * 31) % 1000) for second in range(400)]
+            self.inputs.append((times, values))
+        self.handles = [self.report.SeriesHandle("throughput", "throughput_" + str(worker), "Throughput",
+                                                 "Operations/sec", self.load_input, args=[worker])
+                        for worker in range(3)]
+        self.handle = self.report.SeriesHandle("throughput", "throughput", "Throughput", "Operations/sec",
+                                               self.report.aggregate, inputs=self.handles,
+                                               start_time=1600000010.0)
+        self.lengths = [0] * 3
+
+    def load_input(self, worker):
+        times, values = self.inputs[worker]
+        return times[0:self.lengths[worker]], values[0:self.lengths[worker]]
+
+    def assertSameColumns(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for expected_value, value in zip(expected.tolist(), actual.tolist()):
+            if math.isnan(expected_value):
+                self.assertTrue(math.isnan(value))
+            else:
+                self.assertAlmostEqual(expected_value, value, delta=1e-9 * max(1.0, abs(expected_value)))
+
+    def test_refresh(self):
+        watched = self.report.WatchedSeries()
+        for worker in range(3):
+            self.handles[worker].watched = self.report.WatchedSeries()
+        # the workers are read up to different lengths on every refresh
+        for refresh in range(1, 40):
+            self.lengths = [min(400, refresh * 10 + worker * 3) for worker in range(3)]
+            inputs = [handle.watched.update(handle, handle.load_untrimmed()) for handle in self.handles]
+            watched.combine(self.handle, inputs)
+            trimmed = watched.trim(self.handle)
+
+            expected = self.handle.load()
+            self.assertSameColumns(expected.times, trimmed.times)
+            self.assertSameColumns(expected.values, trimmed.values)
+            self.assertEqual(expected.fingerprint(), trimmed.fingerprint())
+            self.assertEqual(expected.totals(), trimmed.totals())
+            for expected_column, column in zip(expected.downsample(60), trimmed.downsample(60)):
+                self.assertSameColumns(expected_column, column)
+        # once the usual intervals are known, only the end of the series is combined again
+        self.assertGreater(watched.stable, 0)
+
+
+class WatchedSeriesWithoutNumpyTest(WatchedSeriesTest):
+    use_numpy = False
+
+
+class TailedHdrProbeTest(unittest.TestCase):
+    worker_names = ["A1_W1-10.0.0.1-member", "A1_W2-10.0.0.1-member"]
+
+    def setUp(self):
+        self.report = report_module.load()
+        self.directory = tempfile.mkdtemp()
+        self.lines = []
+        self.hdr_files = []
+        for worker_name in self.worker_names:
+            with open(report_module.resource("hdr", worker_name, "test1-probe1.hdr")) as f:
+                self.lines.append(f.readlines())
+            self.hdr_files.append(os.path.join(self.directory, worker_name + ".hdr"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Writes the header and the given number of histograms of every worker.
+    def log(self, *counts):
+        for lines, hdr_file, count in zip(self.lines, self.hdr_files, counts):
+            with open(hdr_file, "w") as f:
+                f.writelines(lines[:4 + count])
+
+    def probe(self, name, idle_seconds):
+        output_dir = os.path.join(self.directory, name)
+        os.mkdir(output_dir)
+        return self.report.TailedHdrProbe(
+            "session", self.hdr_files, [os.path.join(output_dir, worker_name) for worker_name in self.worker_names],
+            os.path.join(output_dir, "merged"), 0, idle_seconds)
+
+    @staticmethod
+    def rows(processor):
+        with open(processor.path) as f:
+            return [line for line in f if not line.startswith("#") and not line.startswith('"')]
+
+    def test_merged_like_process_hdr_files(self):
+        self.log(7, 7)
+        os.mkdir(os.path.join(self.directory, "expected"))
+        self.report.process_hdr_files(
+            "session", self.hdr_files,
+            [os.path.join(self.directory, "expected", worker_name) for worker_name in self.worker_names],
+            os.path.join(self.directory, "expected", "merged"), 0, 2 ** 62)
+        with open(os.path.join(self.directory, "expected", "merged")) as f:
+            expected = [line for line in f if not line.startswith("#") and not line.startswith('"')]
+
+        probe = self.probe("tailed", 3600)
+        for count in range(8):
+            self.log(count, max(0, count - 1))
+            probe.refresh()
+
+        # the last interval is merged once the second worker has logged it
+        self.assertEqual(expected[:6], self.rows(probe.merged_processor))
+        self.log(7, 7)
+        probe.refresh()
+        self.assertEqual(expected, self.rows(probe.merged_processor))
+
+    def test_stalled_worker(self):
+        self.log(2, 2)
+        waiting = self.probe("waiting", 3600)
+        waiting.refresh()
+        self.log(7, 2)
+        waiting.refresh()
+        self.assertEqual(2, len(self.rows(waiting.merged_processor)))
+
+        self.log(2, 2)
+        stalled = self.probe("stalled", 0)
+        stalled.refresh()
+        self.log(7, 2)
+        stalled.refresh()
+        # the last interval of the first worker waits for a later interval
+        self.assertEqual(6, len(self.rows(stalled.merged_processor)))
+
+        # the stalled worker continues at the interval that isn't merged yet
+        self.log(7, 3)
+        stalled.refresh()
+        self.assertEqual(7, len(self.rows(stalled.merged_processor)))
+
+    def test_add_worker(self):
+        hdr_files = self.hdr_files
+        self.hdr_files = hdr_files[:1]
+        self.log(3)
+        probe = self.probe("tailed", 3600)
+        probe.refresh()
+        self.assertEqual(3, len(self.rows(probe.merged_processor)))
+
+        self.hdr_files = hdr_files
+        self.log(4, 1)
+        probe.add_worker(hdr_files[1], os.path.join(self.directory, "tailed", self.worker_names[1]))
+        probe.refresh()
+
+        self.assertEqual(4, len(self.rows(probe.merged_processor)))
+        self.assertEqual(1, len(self.rows(probe.worker_processors[1])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/bin/bash
+#
+# Writes the expected files of test_hdr_log_processor.py with the Java tools that benchmark-report used before it
+# processed the .hdr files itself: HistogramTrimmer, HistogramLogMerger, SimulatorHistogramLogProcessor and ReportCsv.
+# The steps are the ones of the former init_report_files.sh. SIMULATOR_HOME must be a built simulator distribution, so
+# its lib directory has the simulator and HdrHistogram jars.
+#
+#   SIMULATOR_HOME=... dist/src/test/resources/benchmark-report/hdr/generate-expected.sh
+
+# exit on failure
+set -e
+
+# the window of test_hdr_log_processor.py
+time_start_millis=1600000001689
+time_end_millis=1600000008000
+probe=test1-probe1
+
+resources_dir=$(cd "$(dirname "$0")" && pwd)
+work_dir=$(mktemp -d)
+trap 'rm -rf "$work_dir"' EXIT
+# the session column of report.csv is the name of the session directory
+session_dir=$work_dir/session
+report_dir=$work_dir/report
+expected_dir=$resources_dir/expected
+classpath="${SIMULATOR_HOME}/lib/*"
+
+mkdir -p "$session_dir" "$report_dir"
+worker_dir_names=(A1_W1-10.0.0.1-member A1_W2-10.0.0.1-member)
+hdr_files=()
+for worker_dir_name in "${worker_dir_names[@]}"
+do
+    mkdir -p "$session_dir/$worker_dir_name" "$report_dir/$worker_dir_name"
+    cp "$resources_dir/$worker_dir_name/$probe.hdr" "$report_dir/$worker_dir_name/"
+    hdr_file=$report_dir/$worker_dir_name/$probe.hdr
+    java -cp "$classpath" com.hazelcast.simulator.utils.HistogramTrimmer "$hdr_file" $time_start_millis $time_end_millis
+    hdr_files+=("$hdr_file")
+done
+
+java -cp "$classpath" com.hazelcast.simulator.utils.HistogramLogMerger "$report_dir/$probe.hdr" "${hdr_files[@]}"
+
+for hdr_file in "${hdr_files[@]}" "$report_dir/$probe.hdr"
+do
+    file_name="${hdr_file%.*}"
+    java -cp "$classpath" com.hazelcast.simulator.utils.SimulatorHistogramLogProcessor \
+            -i "$hdr_file" -o "$file_name" -outputValueUnitRatio 1000
+    mv "$file_name.hgrm" "$file_name.hgrm.bak"
+    java -cp "$classpath" com.hazelcast.simulator.utils.SimulatorHistogramLogProcessor \
+            -csv -i "$hdr_file" -o "$file_name" -outputValueUnitRatio 1000
+    mv "$file_name.hgrm.bak" "$file_name.hgrm"
+done
+
+java -cp "$classpath" com.hazelcast.simulator.utils.ReportCsv "$report_dir/$probe.hgrm" "$report_dir" "$session_dir"
+
+for worker_dir_name in "${worker_dir_names[@]}"
+do
+    cp "$report_dir/$worker_dir_name/$probe" "$report_dir/$worker_dir_name/$probe.hgrm" "$expected_dir/$worker_dir_name/"
+done
+cp "$report_dir/$probe" "$report_dir/$probe.hgrm" "$report_dir/report.csv" "$expected_dir/"
+echo "Wrote the expected files to $expected_dir"